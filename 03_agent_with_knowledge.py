@@ -2,13 +2,13 @@ from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.vectordb.lancedb import LanceDb
 from agno.embedder.google import GeminiEmbedder
-from agno.knowledge.wikipedia import WikipediaKnowledgeBase
+from shared.wikipedia import CachedWikipediaKnowledgeBase
 from dotenv import load_dotenv
 
 load_dotenv() 
 
 # Creating knowladge from Wikipedia pages 
-knowledge_base = WikipediaKnowledgeBase(
+knowledge_base = CachedWikipediaKnowledgeBase(
     topics=["Artificial Intelligence", "Large Language Model"],
    
     # Table name: wikipedia_documents
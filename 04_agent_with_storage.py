@@ -1,6 +1,7 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.storage.sqlite import SqliteStorage
+from shared.history import CompactingMemory
 from dotenv import load_dotenv
 
 load_dotenv() 
@@ -21,6 +22,8 @@ agent = Agent(
     ],
     show_tool_calls=True,
     storage=storage,
+    # Replays the history within per-role token budgets
+    memory=CompactingMemory(),
     # Add the chat history to the messages
     add_history_to_messages=True,
     # Number of history runs
@@ -1,7 +1,7 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.reasoning import ReasoningTools
+from shared.duckduckgo import CachedDuckDuckGoTools
+from shared.reasoning import BoundedReasoningTools
 from dotenv import load_dotenv
 
 load_dotenv() 
@@ -17,8 +17,9 @@ post_creator = Agent(
         "Make the tone informative and attention-grabbing."
     ],
     tools=[
-        DuckDuckGoTools(),
-        ReasoningTools(add_instructions=True),
+        CachedDuckDuckGoTools(),
+        # At most 6 reasoning steps or 60 seconds, fewer once a step is confident enough
+        BoundedReasoningTools(add_instructions=True),
     ],
     show_tool_calls=True,
     markdown=True
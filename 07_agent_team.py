@@ -1,9 +1,9 @@
 from agno.agent import Agent
 from agno.team.team import Team
-from agno.models.google import Gemini
-from agno.tools.wikipedia import WikipediaTools
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.reasoning import ReasoningTools
+from shared.model_clients import PooledGemini
+from shared.wikipedia import CachedWikipediaTools
+from shared.duckduckgo import CachedDuckDuckGoTools
+from shared.reasoning import BoundedReasoningTools
 from dotenv import load_dotenv
 
 load_dotenv() 
@@ -11,11 +11,11 @@ load_dotenv()
 wiki_agent = Agent(
     name="Wikipedia Science Searcher",
     role="Find and summarize scientific information from Wikipedia.",
-    model=Gemini(
+    model=PooledGemini(
         id="gemini-2.0-flash",
     ),
     tools=[
-        WikipediaTools()
+        CachedWikipediaTools()
     ],
     show_tool_calls=True,
     markdown=True
@@ -24,12 +24,12 @@ wiki_agent = Agent(
 web_agent = Agent(
     name="Scientific Article Searcher",
     role="Search the web for recent scientific articles, papers, and news based on the user’s",
-    model=Gemini(
+    model=PooledGemini(
         id="gemini-2.0-flash",
     ),
     tools=[
-        DuckDuckGoTools(),
-        ReasoningTools(add_instructions=True),
+        CachedDuckDuckGoTools(),
+        BoundedReasoningTools(add_instructions=True),
     ],
     show_tool_calls=True,
     markdown=True
@@ -37,7 +37,7 @@ web_agent = Agent(
 
 leader = Team(
     members=[wiki_agent, web_agent],
-    model=Gemini(
+    model=PooledGemini(
         id="gemini-2.0-flash",
     ),
     instructions=[
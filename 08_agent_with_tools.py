@@ -1,6 +1,6 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.duckduckgo import CachedDuckDuckGoTools
 from dotenv import load_dotenv
 
 load_dotenv() 
@@ -16,7 +16,7 @@ search_assistant = Agent(
         "- Summarize the key findings clearly and concisely",
         "- Provide sources or links if available."
     ],
-    tools=[DuckDuckGoTools()],
+    tools=[CachedDuckDuckGoTools()],
     show_tool_calls=True,
 )
 
@@ -7,17 +7,21 @@ from textwrap import dedent  # For formatting multi-line strings
 
 # agno-agent framework imports
 from agno.agent import Agent  # Main Agent class
-from agno.models.google import Gemini  # Google Gemini LLM model
+from shared.model_clients import PooledGemini  # Gemini sharing one pooled client per API key
+from shared.concurrency import BACKGROUND  # Priority of calls nobody waits on
 from agno.embedder.google import GeminiEmbedder  # Embedding model for vector DB
 from agno.storage.sqlite import SqliteStorage  # SQLite-based storage for agent sessions
-from agno.tools.reasoning import ReasoningTools  # Reasoning tools for the agent
+from shared.reasoning import BoundedReasoningTools  # Reasoning tools with a step, time and token budget
 from agno.vectordb.lancedb import LanceDb  # Vector DB for knowledge base
 from agno.tools.mcp import MCPTools  # Notion MCP tools for Notion integration
 from mcp import StdioServerParameters  # Parameters for MCP server connection
-from agno.tools.wikipedia import WikipediaTools, WikipediaKnowledgeBase  # Wikipedia tools and KB
-from agno.tools.arxiv import ArxivTools  # Arxiv research tool
-from agno.tools.pubmed import PubmedTools  # Pubmed research tool
+from shared.wikipedia import CachedWikipediaTools, CachedWikipediaKnowledgeBase  # Wikipedia tools and KB sharing a page cache
+from shared.papers import CachedArxivTools, CachedPubmedTools  # Arxiv and Pubmed tools with paced requests and a paper cache
+from shared.tool_router import ToolRouter  # Per-turn tool selection
+from shared.history import CompactingMemory  # History with compacted tool results
+from shared.prompt_cache import PrefixCachingGemini, memoize_system_message  # Static prompt prefixes built once and context-cached
 from dotenv import load_dotenv  # For loading environment variables from .env file
+from rich.prompt import Prompt  # Prompt used by the interactive session
 
 # ===================== Load Environment Variables =====================
 load_dotenv()  # Loads variables from a .env file into environment
@@ -60,7 +64,7 @@ async def run_agent():
 
     # --- Knowledge Base Setup ---
     # Preload Wikipedia knowledge base on key topics, backed by a vector DB
-    knowledge_base = WikipediaKnowledgeBase(
+    knowledge_base = CachedWikipediaKnowledgeBase(
         topics=["Artificial Intelligence", "Large Language Model"],
         # Table name: wikipedia_documents
         vector_db=LanceDb(
@@ -78,21 +82,30 @@ async def run_agent():
     # This includes the Notion MCP tools and all the research tools.
     async with MCPTools(server_params=server_params, timeout_seconds=20) as mcp_tools:
 
-        # Combine all tools into a single list for the agent
-        all_tools = [
-            mcp_tools,           # Notion integration tools
-            WikipediaTools(),    # Wikipedia search tool
-            ArxivTools(),        # Arxiv research tool
-            PubmedTools(),       # Pubmed research tool
-            ReasoningTools()     # General reasoning tools
-        ]
+        # Reasoning tools are small and useful on every turn, so they are always sent
+        reasoning_tools = BoundedReasoningTools(max_steps=4, max_seconds=30)
+
+        # Large tool results of earlier runs are replayed as summaries, the full results stay retrievable
+        memory = CompactingMemory(summarizer=PooledGemini(id="gemini-2.0-flash-lite", priority=BACKGROUND))
+        payload_tool = memory.get_payload_tool()
+
+        # Index the large toolsets so only the relevant tools are sent per turn
+        tool_router = ToolRouter(
+            toolkits=[
+                mcp_tools,           # Notion integration tools
+                CachedWikipediaTools(),  # Wikipedia search tool
+                CachedArxivTools(),  # Arxiv research tool
+                CachedPubmedTools(), # Pubmed research tool
+            ],
+            top_k=6,
+        )
 
         # --- Agent Definition ---
         # Define the agent's persona, capabilities, and instructions.
         agent = Agent(
             name="ResearchAssistantAgent",  # Agent's name
-            model=Gemini(id="gemini-2.0-flash"),  # LLM model to use
-            tools=all_tools,  # List of tools available to the agent
+            model=PrefixCachingGemini(id="gemini-2.0-flash"),  # LLM model, sends the static prefix from a context cache
+            tools=[reasoning_tools, payload_tool],  # Routed tools are added per turn
             description="An autonomous research analyst that delivers detailed reports to Notion.",
             instructions=dedent("""\
                 You are an autonomous, world-class research analyst. Your primary directive is to independently conduct comprehensive research and produce detailed, accurate, and well-structured reports with minimal user intervention.
@@ -117,22 +130,32 @@ async def run_agent():
             """),
             knowledge=knowledge_base,  # Preloaded knowledge base
             storage=storage,           # Persistent storage
+            memory=memory,             # Compacts the replayed history
             show_tool_calls=True,      # Show tool calls in output
             add_history_to_messages=True,  # Add conversation history to messages
             num_history_runs=3,        # Number of history runs to include
             markdown=True,             # Use markdown formatting
         )
 
+        # The system message only changes with the routed tools, so it is built once per tool set
+        memoize_system_message(agent)
+
         # --- Load Knowledge Base ---
         agent.knowledge.load(recreate=False)
 
         # --- Start Interactive Session ---
         # Begin the command-line interface for interacting with the agent.
-        await agent.acli_app(
-            message="Hello! I am your Research Assistant. How can I help you with your research today?",
+        # The tools are re-selected for each message before it is sent to the model.
+        await agent.aprint_response(
+            "Hello! I am your Research Assistant. How can I help you with your research today?",
             markdown=True,
-            exit_on=["exit", "quit"],
         )
+        while True:
+            message = Prompt.ask("[bold] :sunglasses: User [/bold]")
+            if message in ["exit", "quit"]:
+                break
+            agent.set_tools([reasoning_tools, payload_tool, *tool_router.select(message)])
+            await agent.aprint_response(message, markdown=True)
 
 # ===================== Script Entry Point =====================
 if __name__ == "__main__":
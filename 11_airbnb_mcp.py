@@ -2,7 +2,7 @@ import asyncio
 from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.tools.mcp import MCPTools
-from agno.tools.thinking import ThinkingTools
+from shared.reasoning import BoundedThinkingTools
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,7 +15,7 @@ async def run_agent(message: str) -> None:
         agent = Agent(
             description="You are an intelligent assistant connected to the Airbnb API. You help users find and book short-term rentals based on their preferences.",
             model=Gemini(id="gemini-2.0-flash"),
-            tools=[ThinkingTools(), mcp_tools],
+            tools=[BoundedThinkingTools(), mcp_tools],
             instructions=[
                 "1. Analyse user input.",
                 "2. Query the Airbnb API for matching listings.",
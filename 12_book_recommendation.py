@@ -1,6 +1,8 @@
 from agno.agent import Agent
+from agno.embedder.google import GeminiEmbedder
 from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.duckduckgo import CachedDuckDuckGoTools
+from shared.response_cache import ResponseCache
 from dotenv import load_dotenv
 from textwrap import dedent
 
@@ -18,10 +20,20 @@ lib_agent = Agent(
                - Genre  
                - Short Description or Summary """
     ),
-    tools=[DuckDuckGoTools()],
+    tools=[CachedDuckDuckGoTools()],
     show_tool_calls=True,
     markdown=True,
 )
 
+# Recommendations for the same (or a near-identical) request are reused for a day
+response_cache = ResponseCache(
+    ttl=24 * 60 * 60,
+    embedder=GeminiEmbedder(),
+    semantic_threshold=0.95,
+)
+
 if __name__ == "__main__":
-    lib_agent.print_response("I'm looking for some inspiring non-fiction books, something like *Atomic Habits* or *Deep Work*.")
\ No newline at end of file
+    response_cache.print_response(
+        lib_agent,
+        "I'm looking for some inspiring non-fiction books, something like *Atomic Habits* or *Deep Work*.",
+    )
\ No newline at end of file
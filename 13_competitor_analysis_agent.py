@@ -1,10 +1,12 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.duckduckgo import CachedDuckDuckGoTools
+from shared.tool_hooks import tool_timeout_hook
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 from textwrap import dedent
 from bs4 import BeautifulSoup
+import asyncio
 import httpx
 import json
 
@@ -63,6 +65,7 @@ agent = Agent(
 
             3. **Extract content**:
                - For the most relevant URLs, use `scrape_text_from_url` to extract main text content.
+               - Request all the URLs you want to scrape in the same turn, they are fetched concurrently.
                - Summarize key information (e.g., product features, pricing, positioning, strengths/weaknesses).
 
             4. **Deliver a detailed report**:
@@ -75,10 +78,16 @@ agent = Agent(
         """)
     ],
     tools=[scrape_text_from_url, 
-           DuckDuckGoTools(),
+           CachedDuckDuckGoTools(),
            ],
+    # Tool calls of a turn run concurrently, none of them may hold the turn for more than 15s
+    tool_hooks=[tool_timeout_hook(default_timeout=15)],
     show_tool_calls=True,
     markdown=True
 )
 
-agent.print_response("Analyze the competitive landscape for Stripe in the payments industry.", stream=True)
+if __name__ == "__main__":
+    # The async entry point runs the tool calls of each model turn concurrently
+    asyncio.run(
+        agent.aprint_response("Analyze the competitive landscape for Stripe in the payments industry.", stream=True)
+    )
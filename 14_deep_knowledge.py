@@ -2,20 +2,23 @@
 # agno-agent framework imports
 from agno.agent import Agent  # Main Agent class
 from agno.team.team import Team  # Team coordination class
-from agno.models.google import Gemini  # Google Gemini LLM model
 from agno.knowledge.url import UrlKnowledge  # Knowledge base from URLs
 from agno.knowledge.pdf_url import PDFUrlKnowledgeBase  # Knowledge base from PDF URLs
 from agno.knowledge.combined import CombinedKnowledgeBase  # Combined knowledge sources
-from agno.tools.visualization import VisualizationTools  # Chart creation tools
-from agno.tools.pandas import PandasTools  # Data analysis tools
 from agno.embedder.google import GeminiEmbedder  # Embedding model for vector DB
 from agno.storage.sqlite import SqliteStorage  # SQLite-based storage for sessions
-from agno.tools.duckdb import DuckDbTools  # Database query tools
 from agno.vectordb.lancedb import LanceDb, SearchType  # Vector DB with search types
 from agno.tools.file import FileTools  # File operations tools
 from dotenv import load_dotenv  # For loading environment variables
 from textwrap import dedent  # For formatting multi-line strings
 
+from shared.analysis import CompactDuckDbTools, CompactPandasTools  # Analysis tools returning compact results
+from shared.charts import BatchVisualizationTools  # Chart creation tools with batched, parallel rendering
+from shared.prompt_cache import PrefixCachingGemini, memoize_system_message  # Static prompt prefixes built once and context-cached
+from shared.data_catalog import DataCatalogTools  # Catalog of the local CSV/Parquet files
+from shared.tracing import instrument  # Per-run spans of the team and its members, written to tmp/traces
+from shared.token_budget import TokenBudget, track  # Token accounting per run and member, and token budgets
+
 # ===================== Load Environment Variables =====================
 load_dotenv()  # Loads variables from a .env file into environment
 
@@ -66,9 +69,10 @@ storage = SqliteStorage(
 # ===================== Knowledge Researcher Agent =====================
 # This agent specializes in synthesizing scientific and policy documents
 knowledge_researcher = Agent(
+    name="Knowledge Researcher",  # Name in the logs, traces and token ledger
     role="""Expert Knowledge Researcher specialized in synthesizing scientific and policy documents into comprehensive, 
             well-structured reports with clear sections and proper citations.""",
-    model=Gemini(id="gemini-2.0-flash"),  # LLM model to use
+    model=PrefixCachingGemini(id="gemini-2.0-flash"),  # LLM model to use
     description=dedent("""
         Retrieves and synthesizes high-quality scientific and policy-related information from vector databases
         Creates detailed, structured articles that are human-readable and evidence-based
@@ -103,18 +107,26 @@ knowledge_researcher.knowledge.load(recreate=False)
 
 # ===================== Data Analyst & Visualizer Agent =====================
 # This agent specializes in data analysis and chart creation
+# Query results stay in DuckDB and are shared with pandas, the model only sees schemas, row counts and first rows
+duckdb_tools = CompactDuckDbTools(memory_limit="4GB")
+pandas_tools = CompactPandasTools(duckdb_tools=duckdb_tools)
+# Indexes new or changed CSV/Parquet files once, dataset discovery is then a catalog lookup
+data_catalog_tools = DataCatalogTools(duckdb_tools=duckdb_tools)
+
 analyst_visualizer = Agent(
+    name="Data Analyst",  # Name in the logs, traces and token ledger
     role="""Senior Data Analyst & Visualization Specialist focused on creating compelling, publication-ready charts 
             that support climate research and policy analysis.""",
-    model=Gemini(id="gemini-2.0-flash"),  # LLM model to use
+    model=PrefixCachingGemini(id="gemini-2.0-flash"),  # LLM model to use
     instructions=dedent("""
         DATA ANALYSIS WORKFLOW:
-        1. **Data Discovery**: Use DuckDbTools to systematically search for all available CSV files with climate-related data
+        1. **Data Discovery**: Use `search_datasets` to find the available CSV files with climate-related data, then `open_dataset` to query them with DuckDbTools
         2. **Context Integration**: Carefully read the research context provided by the Knowledge Researcher
         3. **Data Selection**: Choose the most relevant datasets that directly support the research findings
         4. **Analysis & Visualization**: 
-           - Use PandasTools for thorough data analysis and preprocessing
-           - Create multiple complementary visualizations using VisualizationTools
+           - Run aggregations in SQL with DuckDbTools, query results are stored as tables you can query again
+           - Use `load_query_result` to load a stored result into PandasTools for further preprocessing
+           - Create all the complementary visualizations in a single `create_charts` call
            - Generate at least 2-3 different chart types (line charts for trends, bar charts for comparisons, etc.)
         
         CHART CREATION REQUIREMENTS:
@@ -139,7 +151,7 @@ analyst_visualizer = Agent(
         - Include a summary of how the visualizations support the research narrative
         - Provide data interpretation that connects charts to policy implications
         """),
-    tools=[DuckDbTools(), VisualizationTools(), PandasTools()],  # Data analysis and visualization tools
+    tools=[data_catalog_tools, duckdb_tools, BatchVisualizationTools(), pandas_tools],  # Data analysis and visualization tools
     show_tool_calls=True,  # Show tool calls in output
     markdown=True  # Use markdown formatting
 )
@@ -147,8 +159,9 @@ analyst_visualizer = Agent(
 # ===================== Team Leader Agent =====================
 # This agent coordinates the work between the knowledge researcher and data analyst
 leader_agent = Team(
+    name="Climate Report Team",  # Name in the logs, traces and token ledger
     members=[analyst_visualizer, knowledge_researcher],  # Team members
-    model=Gemini(id="gemini-2.0-flash"),  # LLM model for team coordination
+    model=PrefixCachingGemini(id="gemini-2.0-flash"),  # LLM model for team coordination
     description="""Executive Team Leader responsible for coordinating comprehensive climate analysis reports 
         that integrate research findings with data visualizations into professional, actionable documents.""",
     instructions=dedent("""
@@ -218,6 +231,18 @@ leader_agent = Team(
     markdown=True  # Use markdown formatting
 )
 
+# The instructions and tool schemas of every agent are static, so their system messages are built once
+for agent in (knowledge_researcher, analyst_visualizer, leader_agent):
+    memoize_system_message(agent)
+
+# Each team run is traced, show its critical path with: python -m shared.tracing
+instrument(leader_agent)
+
+# Tokens of every run are recorded per member in tmp/agent.db (python -m shared.token_budget),
+# a run stops calling tools past 300k tokens and long tool results are cut to 4k tokens
+track(leader_agent, TokenBudget(max_run_tokens=300_000, max_tool_result_tokens=4_000))
+
 # ===================== Execute Team Analysis =====================
 # Run the team analysis on climate change and CO₂ emissions
-leader_agent.print_response("Explain the main contributors to global CO₂ emissions and how they have changed since the industrial revolution. Base the explanation on scientific sources and policies. give a full report with visualisations.")
\ No newline at end of file
+if __name__ == "__main__":
+    leader_agent.print_response("Explain the main contributors to global CO₂ emissions and how they have changed since the industrial revolution. Base the explanation on scientific sources and policies. give a full report with visualisations.")
\ No newline at end of file
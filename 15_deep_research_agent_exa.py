@@ -1,14 +1,30 @@
+from typing import List
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.exa import ExaTools
+from pydantic import BaseModel, Field
+from shared.exa import CachedExaTools
+from shared.structured_output import StructuredGemini
 from dotenv import load_dotenv
 from textwrap import dedent
 
 load_dotenv()
 
+
+class Player(BaseModel):
+    name: str = Field(description="Name of the company")
+    role: str = Field(description="Its role in the industry")
+    contributions: str = Field(description="Its main contributions in 2024")
+
+
+class ResearchReport(BaseModel):
+    """Structured research output"""
+
+    major_players: List[Player] = Field(min_length=1)
+
+
 agent = Agent(
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[ExaTools(research=True)],
+    tools=[CachedExaTools(research=True)],
     instructions=dedent("""
         You are a structured research assistant focused on extracting factual information from Wikipedia and writing detailed articles.
 
@@ -24,8 +40,11 @@ agent = Agent(
 
         Format the result clearly and concisely.
     """),
+    # Gemini cannot call tools with a response schema, so the answer is parsed into the schema by a second model,
+    # which decodes it natively and re-asks only for the fields that fail validation
+    response_model=ResearchReport,
+    parser_model=StructuredGemini(id="gemini-2.0-flash"),
     show_tool_calls=True,
-    markdown=True
 )
 
 # Example call
@@ -33,24 +52,4 @@ agent = Agent(
 #    "Write a detailed article about the history and evolution of the Internet. Include key milestones, important figures, and major technological changes."
 #)
 
-# Define a JSON schema for structured research output
-research_schema = {
-    "type": "object",
-    "properties": {
-        "major_players": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                    "role": {"type": "string"},
-                    "contributions": {"type": "string"},
-                },
-            },
-        },
-    },
-    "required": ["major_players"],
-}
-agent.print_response(
-    f"Research the top 3 Semiconductor companies in 2024. Use this schema {research_schema}."
-)
+agent.print_response("Research the top 3 Semiconductor companies in 2024.")
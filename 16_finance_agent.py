@@ -1,13 +1,17 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.tools.yfinance import YFinanceTools
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.duckduckgo import CachedDuckDuckGoTools
+from shared.tool_hooks import tool_timeout_hook
+from shared.token_budget import TokenBudget, track
 from dotenv import load_dotenv
 from textwrap import dedent
+import asyncio
 
 load_dotenv()
 
 financial_analyst = Agent(
+    name="Financial Analyst",
     model=Gemini(id="gemini-2.0-flash"),
     description="You are a professional financial analyst providing in-depth, real-time market insights.",
     instructions=dedent(
@@ -36,6 +40,7 @@ financial_analyst = Agent(
         
         - Reports should be clear and well-structured.
         - Include charts or tables if helpful.
+        - Request all the data you need in the same turn, the tool calls run concurrently.
         """
     ),
     tools=[
@@ -50,9 +55,16 @@ financial_analyst = Agent(
             key_financial_ratios=True,
             technical_indicators=True
         ), 
-        DuckDuckGoTools()],
+        CachedDuckDuckGoTools()],
+    # Tool calls of a turn run concurrently, a slow endpoint can't hold the turn for more than 20s
+    tool_hooks=[tool_timeout_hook(default_timeout=20, timeouts={"get_historical_stock_prices": 30})],
     show_tool_calls=True,
     markdown=True
 )
 
-financial_analyst.print_response("Analyze Apple Inc. and write a full report using the latest data.")
\ No newline at end of file
+# Tokens of every run are recorded in tmp/agent.db, see python -m shared.token_budget
+track(financial_analyst, TokenBudget(max_run_tokens=100_000, max_tool_result_tokens=3_000))
+
+if __name__ == "__main__":
+    # The async entry point runs the tool calls of each model turn concurrently
+    asyncio.run(financial_analyst.aprint_response("Analyze Apple Inc. and write a full report using the latest data."))
@@ -1,21 +1,25 @@
 from agno.agent import Agent
-from agno.models.google import Gemini
+from shared.model_clients import PooledGemini
+from shared.concurrency import BACKGROUND
 from agno.tools.yfinance import YFinanceTools
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.duckduckgo import CachedDuckDuckGoTools
 from agno.memory.v2.db.sqlite import SqliteMemoryDb
 from agno.storage.sqlite import SqliteStorage
-from agno.memory.v2.memory import Memory
+from shared.history import CompactingMemory
 from agno.playground import Playground
 from dotenv import load_dotenv
 from textwrap import dedent
 
 load_dotenv()
 
-memory = Memory(
+# Large yfinance and search results of earlier runs are replayed as summaries
+memory = CompactingMemory(
     db=SqliteMemoryDb(table_name="agent_memory", db_file="tmp/agent.db"),
-    model=Gemini(id="gemini-2.0-flash"),
+    # Memory and summarization calls wait behind the analyst's own calls under load
+    model=PooledGemini(id="gemini-2.0-flash", priority=BACKGROUND),
     clear_memories=True,
     delete_memories=True,
+    summarizer=PooledGemini(id="gemini-2.0-flash-lite", priority=BACKGROUND),
 )
 
 storage = SqliteStorage(
@@ -24,7 +28,7 @@ storage = SqliteStorage(
 )
 
 financial_analyst = Agent(
-    model=Gemini(id="gemini-2.0-flash"),
+    model=PooledGemini(id="gemini-2.0-flash"),
     description="You are a professional financial analyst providing in-depth, real-time market insights.",
     instructions=dedent(
         """
@@ -71,7 +75,8 @@ financial_analyst = Agent(
             key_financial_ratios=True,
             technical_indicators=True
         ), 
-        DuckDuckGoTools()],
+        CachedDuckDuckGoTools(),
+        memory.get_payload_tool()],
     show_tool_calls=True,
     markdown=True
 )
@@ -1,8 +1,8 @@
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.exa import ExaTools
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.exa import CachedExaTools
+from shared.duckduckgo import CachedDuckDuckGoTools
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,8 +10,8 @@ load_dotenv()
 agent = Agent(
     model=Gemini(id="gemini-2.0-flash"),
     tools=[
-        ExaTools(type="keyword"),
-        DuckDuckGoTools(),
+        CachedExaTools(type="keyword"),
+        CachedDuckDuckGoTools(),
     ],
     description=dedent("""\
         You are an expert AI assistant that analyzes media content from news outlets, social media, and digital platforms
@@ -3,8 +3,8 @@ from textwrap import dedent
 from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.tools.cartesia import CartesiaTools
-from agno.tools.reasoning import ReasoningTools
 from agno.utils.media import download_file, save_base64_data
+from shared.reasoning import BoundedReasoningTools
 from dotenv import load_dotenv
 import requests
 import os
@@ -62,7 +62,7 @@ def speech_to_text(audio_file_path: str, api_key: str = api_key, language: str =
 
 meeting_agent: Agent = Agent(
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[ReasoningTools(), CartesiaTools(), speech_to_text],
+    tools=[BoundedReasoningTools(), CartesiaTools(), speech_to_text],
     description=dedent("""\
         An AI agent that processes audio recordings of meetings to:
         1. **Extract key information** (decisions, tasks, participants, insights).
@@ -1,14 +1,14 @@
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.exa import ExaTools
+from shared.exa import CachedExaTools
 from dotenv import load_dotenv
 
 load_dotenv()
 
 movie_recommendation_agent = Agent(
     name="PopcornPal",
-    tools=[ExaTools()],
+    tools=[CachedExaTools()],
     model=Gemini(id="gemini-2.0-flash"),
     description=dedent("""\
         You are an intelligent assistant designed to help users discover movies that match their **preferences**, **mood**, or **context**.  
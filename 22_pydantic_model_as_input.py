@@ -1,11 +1,13 @@
 from typing import List
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.hackernews import HackerNewsTools
 from pydantic import BaseModel, Field
 from textwrap import dedent
 from dotenv import load_dotenv
 
+from shared.hackernews import ConcurrentHackerNewsTools
+from shared.structured_output import StructuredGemini
+
 load_dotenv()
 
 class ResearchTopic(BaseModel):
@@ -16,22 +18,38 @@ class ResearchTopic(BaseModel):
     target_audience: str = Field(description="Who this research is for")
     sources_required: int = Field(description="Number of sources needed", default=5)
 
+class Story(BaseModel):
+    title: str
+    url: str
+    why_it_matters: str = Field(description="Why the story is worth attention, with its top comments")
+
+class HackerNewsDigest(BaseModel):
+    """Digest of the Hacker News stories on a research topic"""
+
+    stories: List[Story] = Field(min_length=1)
+    recurring_topics: List[str] = Field(description="Recurring topics or community sentiment shifts")
+
 # Define agents
 hackernews_agent = Agent(
     name="Hackernews Agent",
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[HackerNewsTools()],
+    # Fetches stories and comment trees concurrently, with a shared item cache
+    tools=[ConcurrentHackerNewsTools()],
     role="Extract key insights and content from Hackernews posts",
     instructions=dedent(
         """
         - Scan Hacker News front page, new posts, and high-ranking threads.
+        - Get the top comments of all the stories you pick with a single `get_story_comments` call.
         - Identify:
           - Posts gaining fast traction (based on score, velocity, and engagement)
           - Top-voted and most insightful comments
           - Recurring topics or community sentiment shifts
         - Summarize posts and threads in an engaging and **informative tone**, highlighting why each is worth attention.
         - Include links for easy exploration."""
-    )
+    ),
+    # The stories are parsed into the digest by a second model, as Gemini cannot call tools with a response schema
+    response_model=HackerNewsDigest,
+    parser_model=StructuredGemini(id="gemini-2.0-flash"),
 )
 
 hackernews_agent.print_response(
@@ -1,21 +1,25 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.github import GithubTools
 from agno.tools.local_file_system import LocalFileSystemTools
 from dotenv import load_dotenv
 
+from shared.github import SnapshotGithubTools
+from shared.tracing import instrument
+
 load_dotenv()
 
 readme_gen_agent = Agent(
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[GithubTools(), LocalFileSystemTools()],
+    # Serves the repository from a local snapshot keyed by commit SHA,
+    # an unchanged repository costs a single API call
+    tools=[SnapshotGithubTools(), LocalFileSystemTools()],
     markdown=True,
     debug_mode=True,
     description="You are an intelligent assistant that analyzes the contents of a GitHub repository and automatically generates a high-quality `README.md` file.",
     instructions=[
         "- Use get_repository to access to the given repo then:",
         "  - Fetch repo metadata (name, description, topics, license)",
-        "  - Analyze project structure (folders, files, tech stack)",
+        "  - Analyze project structure (folders, files, tech stack) with get_repository_tree",
         "  - Detect main entry points, usage patterns, and dependencies",
         "  - Extract key content from `package.json`, `pyproject.toml`, or config files",
         " - Organize the README using the following standard sections:",
@@ -31,6 +35,10 @@ readme_gen_agent = Agent(
     ],
 )
 
+# debug_mode prints the activity, the trace in tmp/traces breaks the run down into timed spans:
+# python -m shared.tracing
+instrument(readme_gen_agent)
+
 readme_gen_agent.print_response(
     "Get details of https://github.com/agno-agi/agno", markdown=True
 )
\ No newline at end of file
@@ -1,13 +1,16 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.reasoning import ReasoningTools
 from agno.tools.yfinance import YFinanceTools
+from shared.reasoning import BoundedReasoningTools
+from shared.response_cache import ResponseCache
+from shared.token_budget import TokenBudget, track
 from dotenv import load_dotenv
 from textwrap import dedent
 
 load_dotenv()
 
 agent = Agent(
+    name="Reasoning Finance Agent",
     model=Gemini(id="gemini-2.0-flash"),
     description="You are a professional financial analyst providing in-depth, real-time market insights.",
     instructions=dedent(
@@ -50,10 +53,20 @@ agent = Agent(
             key_financial_ratios=True,
             technical_indicators=True
         ), 
-        ReasoningTools(add_instructions=True)],
+        # Bounded reasoning keeps the report latency predictable, the steps stream as they are made
+        BoundedReasoningTools(max_steps=8, max_seconds=90, add_instructions=True)],
     markdown=True,
 )
-agent.print_response(
+
+# A run stops at its next tool call once it used 150k prompt and completion tokens, tool results are cut to 3k tokens
+track(agent, TokenBudget(max_run_tokens=150_000, max_tool_result_tokens=3_000))
+
+# Repeated report requests are served from the cache for 6 hours. Only exact repeats: prompts for
+# different tickers embed almost identically
+response_cache = ResponseCache(ttl=6 * 60 * 60)
+
+response_cache.print_response(
+    agent,
     "Write a report on NVDA",
     stream=True,
     show_full_reasoning=True,
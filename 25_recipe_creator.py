@@ -1,14 +1,14 @@
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
+from shared.duckduckgo import CachedDuckDuckGoTools
 from dotenv import load_dotenv
 
 load_dotenv()
 
 recipe_generator_agent = Agent(
     name="ChefGenius",
-    tools=[DuckDuckGoTools()],
+    tools=[CachedDuckDuckGoTools()],
     model=Gemini(id="gemini-2.0-flash"),
     description=dedent("""\
         You are an intelligent assistant that generates personalized recipes based on the user's **available ingredients** and optionally their **time constraints**.  
@@ -4,8 +4,8 @@ from agno.agent import Agent
 from agno.team.team import Team
 from agno.embedder.google import GeminiEmbedder
 from agno.knowledge.pdf_url import PDFUrlKnowledgeBase
-from agno.tools.thinking import ThinkingTools
-from agno.models.google import Gemini
+from shared.reasoning import BoundedThinkingTools
+from shared.model_clients import PooledGemini  # Gemini sharing one pooled client per API key
 from agno.utils.media import download_image
 from agno.vectordb.lancedb import LanceDb
 from dotenv import load_dotenv
@@ -87,7 +87,7 @@ knowledge_base.load()  # Load and process the PDF content
 
 RecipeVisualizerAgent = Agent(
     role="Take each of the five recipe steps and generate a vivid image description for it, then produce a realistic or stylized image using a replicate API.",
-    model=Gemini(id="gemini-2.0-flash"),
+    model=PooledGemini(id="gemini-2.0-flash"),
     tools=[generate_images_with_replicate],
     description="A visual content creator that takes textual cooking instructions and turns them into stunning, step-by-step image representations using generate_images_with_replicate.",
     instructions=dedent(
@@ -118,8 +118,8 @@ RecipeVisualizerAgent = Agent(
 # Main team agent that orchestrates recipe simplification and visualization
 RecipeSimplifierAgent = Team(
     members=[RecipeVisualizerAgent],                 # Include the visualizer agent as a team member
-    model=Gemini(id="gemini-2.0-flash"),            # Use Gemini for team coordination
-    tools=[ThinkingTools()],                         # Enable reasoning and analysis tools
+    model=PooledGemini(id="gemini-2.0-flash"),            # Use Gemini for team coordination
+    tools=[BoundedThinkingTools(max_steps=4)],       # Enable reasoning and analysis tools
     knowledge=knowledge_base,                        # Access to recipe database
     description="You are a world-class culinary assistant.",
     instructions=dedent(
@@ -1,16 +1,18 @@
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.newspaper4k import Newspaper4kTools
+from shared.duckduckgo import CachedDuckDuckGoTools
+from shared.newspaper import BatchNewspaper4kTools
+from shared.token_budget import TokenBudget, track
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Initialize the research agent with advanced journalistic capabilities
 research_agent = Agent(
+    name="Research Agent",
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[DuckDuckGoTools(), Newspaper4kTools()],
+    tools=[CachedDuckDuckGoTools(), BatchNewspaper4kTools()],
     description=dedent("""\
         You are a research-focused assistant capable of conducting deep, accurate, and professional investigations on any topic.  
         You search the web in real time, gather relevant and credible information, and write **high-quality analytical articles**.  
@@ -18,6 +20,7 @@ research_agent = Agent(
     """),
     instructions=dedent("""\
         - Search in the web to find **up-to-date**, **reliable**, and **diverse** sources of information and news.
+        - Read the most relevant sources together with `read_articles`, they are downloaded and parsed in parallel.
         - Extract key facts, perspectives, statistics, and quotes from those sources.
         - Organize the content logically, ensuring:
           - Clear introduction with context and framing
@@ -68,4 +71,8 @@ research_agent = Agent(
     add_datetime_to_instructions=True,
 )
 
-research_agent.print_response("Investigate advances in precision medicine")
\ No newline at end of file
+# Full articles are long, each tool result is cut to 6k tokens and a run stops calling tools past 200k tokens
+track(research_agent, TokenBudget(max_run_tokens=200_000, max_tool_result_tokens=6_000))
+
+if __name__ == "__main__":
+    research_agent.print_response("Investigate advances in precision medicine")
\ No newline at end of file
@@ -1,7 +1,7 @@
 from textwrap import dedent
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.exa import ExaTools
+from shared.exa import CachedExaTools
 from dotenv import load_dotenv
 from datetime import datetime
 
@@ -10,7 +10,7 @@ load_dotenv()
 # Initialize the research agent with advanced journalistic capabilities
 research_agent = Agent(
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[ExaTools(start_published_date=datetime.now().strftime("%Y-%m-%d"), type="keyword")],
+    tools=[CachedExaTools(start_published_date=datetime.now().strftime("%Y-%m-%d"), type="keyword")],
     description=dedent("""\
         You are a research-focused assistant capable of conducting deep, accurate, and professional investigations on any topic.  
         You search the web in real time, gather relevant and credible information, and write **high-quality analytical articles**.  
@@ -1,6 +1,6 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.exa import ExaTools
+from shared.exa import CachedExaTools
 from dotenv import load_dotenv
 from textwrap import dedent
 
@@ -28,7 +28,7 @@ agent = Agent(
         "- Avoid recommending outdated or unavailable items.",
         "- Write in a helpful, friendly tone that inspires confidence.",
     ],
-    tools=[ExaTools()],
+    tools=[CachedExaTools()],
     show_tool_calls=True,
 )
 agent.print_response(
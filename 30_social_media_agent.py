@@ -1,9 +1,10 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.x import XTools
 from dotenv import load_dotenv
 from textwrap import dedent
 
+from shared.x_monitoring import XMonitoringTools
+
 load_dotenv()
 
 # Create the social media analysis agent
@@ -11,18 +12,20 @@ social_media_agent = Agent(
     name="Social Media Analyst",
     model=Gemini(id="gemini-2.0-flash"),
     tools=[
-        XTools(
+        # Pages through the search results, only fetches posts newer than the stored ones
+        # and returns engagement aggregates instead of every raw post
+        XMonitoringTools(
             include_post_metrics=True,
-            #wait_on_rate_limit=True,
+            wait_on_rate_limit=True,
         )
     ],
     description="You are a senior Brand Intelligence Analyst with deep expertise in social media listening on the X (formerly Twitter) platform. Your mission is to turn raw tweet content and engagement data into sharp, executive-level intelligence that supports product, marketing, and support teams in making informed, strategic decisions.",
     instructions=dedent("""
         1. **Collect and Analyze Tweets**  
-           Use the tools available to you to retrieve relevant tweets and analyze both the textual content and engagement metrics (likes, retweets, replies).
+           Use the `monitor_posts` tool to collect the relevant tweets. It returns engagement distributions, velocities, pattern counts, top authors and the top tweets; analyze both the textual content of the top tweets and these engagement metrics (likes, retweets, replies).
 
         2. **Sentiment Classification**  
-           Classify each tweet as **Positive**, **Negative**, **Neutral**, or **Mixed** and explain the reasoning (e.g., praise for feature X, frustration with bugs, etc.).
+           Clear-cut tweets are already labeled locally (see `sentiment.local_labels`). Classify only the tweets in `sentiment.posts_to_classify` as **Positive**, **Negative**, **Neutral**, or **Mixed** and explain the reasoning (e.g., praise for feature X, frustration with bugs, etc.), then combine both into the overall sentiment distribution.
 
         3. **Engagement Pattern Analysis**  
            Identify underlying sentiment signals by detecting patterns in the engagement data:
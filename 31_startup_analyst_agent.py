@@ -1,14 +1,17 @@
 from textwrap import dedent
 from agno.agent import Agent
-from agno.models.google import Gemini
-from agno.tools.exa import ExaTools
+from shared.prompt_cache import PrefixCachingGemini, memoize_system_message
+from shared.exa import CachedExaTools
+from shared.token_budget import TokenBudget, track
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# The long description, instructions and tool schemas are a static prefix, built once and sent from the context cache
 startup_analyst = Agent(
-    model=Gemini(id="gemini-2.0-flash"),
-    tools=[ExaTools()],
+    name="Startup Analyst",
+    model=PrefixCachingGemini(id="gemini-2.0-flash"),
+    tools=[CachedExaTools()],
     description=dedent("""You are a world-class startup analyst specializing in investment due diligence. 
                    Your mission is to produce comprehensive, evidence-backed reports that guide million-dollar decisions. 
                    You combine internal tools and external research to assess a company’s fundamentals, financial health, market position, and risks."""),
@@ -56,6 +59,9 @@ startup_analyst = Agent(
     show_tool_calls=True,
     markdown=True,
 )
+memoize_system_message(startup_analyst)
+# Tokens of every run are recorded in tmp/agent.db, see python -m shared.token_budget
+track(startup_analyst, TokenBudget(max_run_tokens=150_000, max_tool_result_tokens=4_000))
 
 
 startup_analyst.print_response(
@@ -1,14 +1,19 @@
 from agno.agent import Agent
-from agno.models.google import Gemini
-from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.tools.youtube import YouTubeTools
+from shared.model_clients import PooledGemini
+from shared.duckduckgo import CachedDuckDuckGoTools
 from dotenv import load_dotenv
 
+from shared.youtube import ChunkedYouTubeTools
+
 load_dotenv()
 
 study_assistant = Agent(
-    model=Gemini(id="gemini-2.0-flash"),
-    tools=[DuckDuckGoTools(), YouTubeTools()],
+    model=PooledGemini(id="gemini-2.0-flash"),
+    tools=[
+        CachedDuckDuckGoTools(),
+        # Outlines of long lectures instead of their whole transcripts
+        ChunkedYouTubeTools(summarizer=PooledGemini(id="gemini-2.0-flash-lite")),
+    ],
     markdown=True,
     description=
         """You are a smart and organized study assistant who helps users build effective learning plans. 
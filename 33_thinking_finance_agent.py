@@ -1,15 +1,24 @@
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.tools.thinking import ThinkingTools
 from agno.tools.yfinance import YFinanceTools
+from shared.reasoning import BoundedThinkingTools
+from shared.tool_router import ToolRouter
+from shared.token_budget import TokenBudget, track
 from dotenv import load_dotenv
 from textwrap import dedent
 
 load_dotenv()
 
+# Bounded thinking keeps the report latency predictable
+thinking_tools = BoundedThinkingTools(max_steps=8, max_seconds=90, add_instructions=True)
+
+# Only the yfinance endpoints relevant to each request are sent to the model
+tool_router = ToolRouter(toolkits=[YFinanceTools(enable_all=True)], top_k=5)
+
 finance_agent = Agent(
+    name="Thinking Finance Agent",
     model=Gemini(id="gemini-2.0-flash"),
-    tools=[ThinkingTools(add_instructions=True), YFinanceTools(enable_all=True)],
+    tools=[thinking_tools],
     description="""You are a professional-grade financial analyst that delivers comprehensive market insights, 
                    leveraging real-time financial data, macroeconomic indicators, and company fundamentals. 
                    Your reports are trusted by executives, investors, and financial institutions.""",
@@ -53,10 +62,13 @@ finance_agent = Agent(
     stream_intermediate_steps=True,
 )
 
+# A run stops at its next tool call once it used 100k prompt and completion tokens, tool results are cut to 3k tokens
+track(finance_agent, TokenBudget(max_run_tokens=100_000, max_tool_result_tokens=3_000))
+
 # Example usage with detailed market analysis request
-finance_agent.print_response(
-    """Generate a full financial analysis for $TSLA.
+message = """Generate a full financial analysis for $TSLA.
         Include recent earnings highlights, current valuation metrics, sector comparison with other EV manufacturers, and forward-looking insights based on market sentiment.
-""", stream=True
-)
+"""
+finance_agent.set_tools([thinking_tools, *tool_router.select(message)])
+finance_agent.print_response(message, stream=True)
 
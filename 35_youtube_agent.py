@@ -1,16 +1,19 @@
 from textwrap import dedent
 from agno.agent import Agent
-from agno.models.google import Gemini
-from agno.tools.youtube import YouTubeTools
+from shared.model_clients import PooledGemini
 from dotenv import load_dotenv
 
+from shared.youtube import ChunkedYouTubeTools
+
 load_dotenv()
 
 youtube_agent = Agent(
     name="YouTube Agent",
-    model=Gemini(id="gemini-2.0-flash"),
-    tools=[YouTubeTools(
-        get_video_captions=True,
+    model=PooledGemini(id="gemini-2.0-flash"),
+    # Captions are cached per video and language, long transcripts come back as a
+    # timestamped outline summarized chunk by chunk, plus the chunks the agent asks for
+    tools=[ChunkedYouTubeTools(
+        summarizer=PooledGemini(id="gemini-2.0-flash-lite"),
         get_video_data=True,
         languages=['en']
     )],
@@ -23,13 +26,14 @@ You rely only on publicly available **metadata**, **captions**, and **timestamps
           Summarize the video’s title, channel name, publish date, view count, and tags if available.
         
         - **Segmented Breakdown**  
-          Use the timestamps and captions to:
+          Use the video outline (timestamped chunk summaries) to:
           - Identify key topics or sections
           - Provide a short description for each segment
           - Highlight any major transitions or moments
         
         - **Caption Overview**  
           Summarize the tone and main points of the spoken content based on the transcript (captions only).
+          Read the full captions of a few chunks with `get_transcript_chunks` only when the outline is not detailed enough.
         
         - **Video Purpose**  
           Deduce the general purpose: educational, entertainment, tutorial, commentary, etc.
@@ -0,0 +1 @@
+# Helpers shared by the example agents in this repository.
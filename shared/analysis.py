@@ -0,0 +1,225 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+import duckdb
+import pandas as pd
+from agno.tools.duckdb import DuckDbTools
+from agno.tools.pandas import PandasTools
+from agno.utils.log import log_debug, log_info, logger
+
+# Statements whose output is small metadata, returned as is instead of being stored as a result
+METADATA_STATEMENTS = ("show", "describe", "summarize", "explain", "pragma")
+RESULT_STATEMENTS = ("select", "with", "from", "table", "values", "pivot", "unpivot")
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def compact_frame(
+    df: pd.DataFrame, name: Optional[str] = None, row_count: Optional[int] = None, head_rows: int = 10
+) -> str:
+    """
+    Describe a DataFrame by its schema, row count and first rows instead of its full content.
+
+    Args:
+        df (pd.DataFrame): The DataFrame, or its first rows when `row_count` is given.
+        name (str, optional): Name under which the data can be used in later calls, if it is stored.
+        row_count (int, optional): Total number of rows, defaults to the length of `df`.
+        head_rows (int): Number of rows to include. Defaults to 10.
+
+    Returns:
+        str: The compact description.
+    """
+    row_count = len(df) if row_count is None else row_count
+    schema = ", ".join(f"{column} ({dtype})" for column, dtype in df.dtypes.astype(str).items())
+    shown = min(head_rows, row_count)
+    title = f"Result `{name}`: {row_count} rows" if name is not None else f"{row_count} rows"
+    return (
+        f"{title}\n"
+        f"Schema: {schema}\n"
+        f"First {shown} rows:\n{df.head(head_rows).to_csv(index=False)}"
+    )
+
+
+class CompactDuckDbTools(DuckDbTools):
+    """
+    DuckDbTools that keep query results server-side and only return a compact view of them.
+
+    Every result set is stored as a named temporary table, so it can be queried again or
+    handed to pandas (through Arrow) without going through the prompt, and the model only
+    sees its schema, row count and first rows. Running the same query again reuses the stored
+    result. Files are registered as views, so DuckDB scans them out-of-core on every query
+    instead of loading them into memory.
+
+    Args:
+        head_rows (int): Number of rows returned to the model per result. Defaults to 10.
+        memory_limit (str, optional): DuckDB memory limit, e.g. "4GB". DuckDB spills to disk beyond it.
+        **kwargs: Passed through to DuckDbTools.
+    """
+
+    def __init__(self, head_rows: int = 10, memory_limit: Optional[str] = None, **kwargs):
+        if memory_limit is not None:
+            kwargs["config"] = {**(kwargs.get("config") or {}), "memory_limit": memory_limit}
+        # These load whole files into memory, create_table_from_path registers views instead
+        kwargs.setdefault("exclude_tools", ["load_local_path_to_table", "load_local_csv_to_table"])
+        super().__init__(**kwargs)
+        self.head_rows = head_rows
+        # Result name -> query, and query -> result name for reuse
+        self.results: Dict[str, str] = {}
+        self._result_names: Dict[str, str] = {}
+        self.register(self.list_results)
+
+    def get_dataframe(self, name: str) -> pd.DataFrame:
+        """Stored result or table as a pandas DataFrame, handed over through Arrow without copying."""
+        relation = self.connection.sql(f"SELECT * FROM {quote_identifier(name)}")
+        return relation.arrow().to_pandas(types_mapper=pd.ArrowDtype)
+
+    def _store_result(self, sql: str, result_name: Optional[str]) -> str:
+        key = " ".join(sql.split())
+        name = self._result_names.get(key)
+        if name is not None and (result_name is None or result_name == name):
+            log_debug(f"Reusing result {name}")
+            return name
+
+        if result_name is not None and not result_name.isidentifier():
+            raise ValueError(f"Invalid result name {result_name!r}, use letters, digits and underscores")
+        name = result_name or f"result_{hashlib.sha256(key.encode()).hexdigest()[:8]}"
+        self.connection.execute(f"CREATE OR REPLACE TEMP TABLE {quote_identifier(name)} AS {sql}")
+        self.results[name] = key
+        self._result_names[key] = name
+        return name
+
+    def run_query(self, query: str, result_name: Optional[str] = None) -> str:
+        """Function that runs a query and returns a compact view of the result.
+        The result is stored as a table named `result_name` that later queries can select from,
+        so run aggregations in SQL instead of fetching raw rows.
+
+        :param query: SQL query to run
+        :param result_name: Optional name of the table storing the result
+        :return: Name, row count, schema and first rows of the result
+        """
+        # Remove backticks and only run the first statement
+        formatted_sql = query.replace("`", "").split(";")[0].strip()
+        statement = formatted_sql.split(None, 1)[0].lower() if formatted_sql else ""
+
+        try:
+            log_info(f"Running: {formatted_sql}")
+            if statement in METADATA_STATEMENTS:
+                relation = self.connection.sql(formatted_sql)
+                return compact_frame(relation.df(), head_rows=1000)
+            if statement not in RESULT_STATEMENTS:
+                self.connection.execute(formatted_sql)
+                # Data changed, stored results may be outdated
+                self._result_names.clear()
+                return "Query ran successfully"
+
+            name = self._store_result(formatted_sql, result_name)
+            relation = self.connection.sql(f"SELECT * FROM {quote_identifier(name)}")
+            row_count = relation.aggregate("count(*)").fetchone()[0]
+            return compact_frame(relation.limit(self.head_rows).df(), name, row_count=row_count, head_rows=self.head_rows)
+        except (duckdb.Error, ValueError) as e:
+            return str(e)
+        except Exception as e:
+            logger.error(f"Error running query: {e}")
+            return str(e)
+
+    def list_results(self) -> str:
+        """Function to list the stored query results and the queries that produced them.
+
+        :return: Stored result names with their queries
+        """
+        if not self.results:
+            return "No stored results"
+        return "\n".join(f"{name}: {query}" for name, query in self.results.items())
+
+    def create_table_from_path(self, path: str, table: Optional[str] = None, replace: bool = False) -> str:
+        """Creates a view over a CSV or Parquet file. The file is scanned by every query instead
+        of being loaded, so files larger than memory can be queried.
+
+        :param path: Path to load
+        :param table: Optional table name to use
+        :param replace: Whether to replace the view if it already exists
+        :return: Table name created
+        """
+        if table is None:
+            table = self.get_table_name_from_path(path)
+
+        log_debug(f"Creating view {table} over {path}")
+        create_statement = "CREATE OR REPLACE VIEW" if replace else "CREATE VIEW IF NOT EXISTS"
+        if path.lower().endswith(".csv"):
+            create_statement += f" {table} AS SELECT * FROM read_csv('{path}', auto_detect=true)"
+        else:
+            create_statement += f" {table} AS SELECT * FROM '{path}'"
+        self.run_query(create_statement)
+        return table
+
+
+class CompactPandasTools(PandasTools):
+    """
+    PandasTools that return a compact view of their results and can load DuckDB results.
+
+    `load_query_result` turns a stored DuckDB result into a DataFrame through Arrow, so the
+    data never passes through the prompt.
+
+    Args:
+        duckdb_tools (CompactDuckDbTools, optional): DuckDB tools whose stored results can be loaded.
+        head_rows (int): Number of rows returned to the model per result. Defaults to 10.
+        **kwargs: Passed through to PandasTools.
+    """
+
+    def __init__(self, duckdb_tools: Optional[CompactDuckDbTools] = None, head_rows: int = 10, **kwargs):
+        super().__init__(**kwargs)
+        self.duckdb_tools = duckdb_tools
+        self.head_rows = head_rows
+        if duckdb_tools is not None:
+            self.register(self.load_query_result)
+
+    def load_query_result(self, result_name: str, dataframe_name: Optional[str] = None) -> str:
+        """Loads a stored DuckDB query result or table into a pandas dataframe.
+
+        :param result_name: The name of the DuckDB result or table.
+        :param dataframe_name: The name of the dataframe to create, defaults to `result_name`.
+        :return: A compact view of the created dataframe, or an error message.
+        """
+        dataframe_name = dataframe_name or result_name
+        try:
+            self.dataframes[dataframe_name] = self.duckdb_tools.get_dataframe(result_name)  # type: ignore
+            return compact_frame(self.dataframes[dataframe_name], dataframe_name, head_rows=self.head_rows)
+        except Exception as e:
+            logger.error(f"Error loading query result: {e}")
+            return f"Error loading query result: {e}"
+
+    def run_dataframe_operation(self, dataframe_name: str, operation: str, operation_parameters: Dict[str, Any]) -> str:
+        """Runs an operation `operation` on a dataframe `dataframe_name` with the parameters `operation_parameters`.
+        A dataframe result is stored under the name `<dataframe_name>_<operation>` and only its schema, row count
+        and first rows are returned.
+
+        For Example:
+        - To get the first 5 rows of a dataframe `csv_data`, use: {"dataframe_name": "csv_data", "operation": "head", "operation_parameters": {"n": 5}}
+        - To get summary statistics of a dataframe `csv_data`, use: {"dataframe_name": "csv_data", "operation": "describe", "operation_parameters": {}}
+
+        :param dataframe_name: The name of the dataframe to run the operation on.
+        :param operation: The operation to run on the dataframe.
+        :param operation_parameters: The parameters to pass to the operation.
+        :return: The result of the operation if successful, otherwise an error message.
+        """
+        try:
+            log_debug(f"Running operation {operation} on dataframe {dataframe_name} with {operation_parameters}")
+            dataframe = self.dataframes.get(dataframe_name)
+            if dataframe is None:
+                return f"Dataframe not found: {dataframe_name}"
+
+            result = getattr(dataframe, operation)(**operation_parameters)
+            if isinstance(result, pd.Series):
+                result = result.to_frame().reset_index()
+            if isinstance(result, pd.DataFrame):
+                result_name = f"{dataframe_name}_{operation}"
+                self.dataframes[result_name] = result
+                return compact_frame(result, result_name, head_rows=self.head_rows)
+            return str(result)
+        except Exception as e:
+            logger.error(f"Error running operation: {e}")
+            return f"Error running operation: {e}"
+
@@ -0,0 +1,366 @@
+"""
+Offline benchmark of representative agents against the fake Gemini server and replayed tool fixtures.
+
+    python -m shared.benchmark --requests 40 --concurrency 8 --output tmp/benchmark.json
+    python -m shared.benchmark --baseline tmp/benchmark.json  # exits with 1 on a regression or failure
+    python -m shared.benchmark --record-fixtures  # calls the real tools and records their results
+
+Each scenario runs in its own process, so its peak RSS is its own. A scenario whose dependencies are
+not installed is skipped; any other failure of a scenario fails the run.
+"""
+
+import argparse
+import json
+import queue
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from google.genai.types import HttpOptions
+
+from shared.fake_gemini import FakeGeminiServer
+from shared.model_clients import PooledGemini
+from shared.tool_fixtures import ToolFixtures
+
+# Steps played by the fake model in each scenario, see FakeGeminiServer
+SCRIPTS: Dict[str, List[Dict[str, Any]]] = {
+    # Single agent with a search tool (e.g. 08, 16)
+    "single": [{"tool": "duckduckgo_search", "args": {"query": "agno agents", "max_results": 5}}],
+    # Agent answering from a knowledge base (03)
+    "rag": [{"tool": "search_knowledge_base", "args": {"query": "history of neural networks"}}],
+    # Team leader delegating to members that use their tools (07, 14)
+    "team": [
+        {
+            "tool": "transfer_task_to_member",
+            "args": {
+                "member_id": "wikipedia-science-searcher",
+                "task_description": "Explain the basics of CRISPR",
+                "expected_output": "A short summary",
+            },
+        },
+        {"tool": "search_wikipedia", "args": {"query": "CRISPR"}},
+        {"tool": "duckduckgo_search", "args": {"query": "CRISPR research 2025"}},
+    ],
+    # Agent with agentic memory, storage and history (05, 17)
+    "memory": [
+        {"tool": "update_user_memory", "args": {"task": "Remember that the user is benchmarking agents"}},
+        {"tool": "add_memory", "args": {"memory": "The user is benchmarking agents", "topics": ["work"]}},
+    ],
+}
+
+# Recorded results of the tools called by the scripts, replayed so the benchmark runs offline
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Events carrying answer tokens, the first one gives the time to first token
+CONTENT_EVENTS = ("RunResponseContent", "TeamRunResponseContent")
+
+DOCUMENTS = [
+    "Neural networks were first proposed in the 1940s by McCulloch and Pitts.",
+    "The perceptron was introduced by Frank Rosenblatt in 1958.",
+    "Backpropagation became popular in the 1980s and enabled training of multi-layer networks.",
+    "Deep learning took off in 2012 when AlexNet won the ImageNet competition.",
+    "Transformers, introduced in 2017, are the basis of large language models.",
+] * 20
+
+
+def _model(server_url: str) -> PooledGemini:
+    http_options = HttpOptions(base_url=server_url)
+    return PooledGemini(id="gemini-2.0-flash", api_key="fake", client_params={"http_options": http_options})
+
+
+def build_single(server_url: str, work_dir: str, fixtures: ToolFixtures) -> Callable[[], Any]:
+    from agno.agent import Agent
+
+    from shared.duckduckgo import CachedDuckDuckGoTools
+
+    def factory() -> Any:
+        return Agent(
+            model=_model(server_url),
+            tools=[CachedDuckDuckGoTools()],
+            tool_hooks=[fixtures.hook],
+            instructions=["Answer with the search results."],
+            markdown=True,
+        )
+
+    return factory
+
+
+def build_rag(server_url: str, work_dir: str, fixtures: ToolFixtures) -> Callable[[], Any]:
+    from agno.agent import Agent
+    from agno.document import Document
+    from agno.embedder.google import GeminiEmbedder
+    from agno.knowledge.document import DocumentKnowledgeBase
+    from agno.vectordb.lancedb import LanceDb
+
+    knowledge_base = DocumentKnowledgeBase(
+        documents=[Document(content=text, name=f"doc_{i}") for i, text in enumerate(DOCUMENTS)],
+        vector_db=LanceDb(
+            uri=f"{work_dir}/lancedb",
+            table_name="benchmark_documents",
+            embedder=GeminiEmbedder(api_key="fake", client_params={"http_options": HttpOptions(base_url=server_url)}),
+        ),
+    )
+    knowledge_base.load(recreate=True)
+
+    def factory() -> Any:
+        return Agent(model=_model(server_url), knowledge=knowledge_base, search_knowledge=True, markdown=True)
+
+    return factory
+
+
+def build_team(server_url: str, work_dir: str, fixtures: ToolFixtures) -> Callable[[], Any]:
+    from agno.agent import Agent
+    from agno.team.team import Team
+
+    from shared.duckduckgo import CachedDuckDuckGoTools
+    from shared.wikipedia import CachedWikipediaTools
+
+    def factory() -> Any:
+        wiki_agent = Agent(
+            name="Wikipedia Science Searcher",
+            role="Find and summarize scientific information from Wikipedia.",
+            model=_model(server_url),
+            tools=[CachedWikipediaTools()],
+            tool_hooks=[fixtures.hook],
+        )
+        web_agent = Agent(
+            name="Scientific Article Searcher",
+            role="Search the web for recent scientific articles.",
+            model=_model(server_url),
+            tools=[CachedDuckDuckGoTools()],
+            tool_hooks=[fixtures.hook],
+        )
+        return Team(
+            members=[wiki_agent, web_agent],
+            model=_model(server_url),
+            instructions=["Combine the results into a structured answer."],
+            markdown=True,
+        )
+
+    return factory
+
+
+def build_memory(server_url: str, work_dir: str, fixtures: ToolFixtures) -> Callable[[], Any]:
+    from agno.agent import Agent
+    from agno.memory.v2.db.sqlite import SqliteMemoryDb
+    from agno.memory.v2.memory import Memory
+    from agno.storage.sqlite import SqliteStorage
+
+    db_file = f"{work_dir}/benchmark.db"
+
+    def factory() -> Any:
+        return Agent(
+            model=_model(server_url),
+            memory=Memory(model=_model(server_url), db=SqliteMemoryDb(table_name="memories", db_file=db_file)),
+            storage=SqliteStorage(table_name="sessions", db_file=db_file),
+            enable_agentic_memory=True,
+            add_history_to_messages=True,
+            num_history_runs=3,
+            markdown=True,
+        )
+
+    return factory
+
+
+SCENARIOS = {"single": build_single, "rag": build_rag, "team": build_team, "memory": build_memory}
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 4)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class MissingDependency(Exception):
+    """A scenario cannot be built because an optional dependency is not installed."""
+
+
+def run_scenario(
+    name: str,
+    requests: int,
+    concurrency: int,
+    latency: float,
+    tokens_per_second: float,
+    fixtures_mode: str = "replay",
+) -> Dict[str, Any]:
+    """
+    Drive one scenario at a fixed concurrency, in this process.
+
+    Args:
+        name (str): Key of SCENARIOS.
+        requests (int): Number of runs.
+        concurrency (int): Runs in flight at any time, each on its own agent or team.
+        latency (float): Time to first token of the fake model in seconds.
+        tokens_per_second (float): Generation speed of the fake model.
+        fixtures_mode (str): "replay" the recorded tool results, or "record" them. Defaults to "replay".
+
+    Returns:
+        Dict[str, Any]: Throughput, latency and time-to-first-token percentiles, errors and peak RSS.
+
+    Raises:
+        MissingDependency: When a dependency of the scenario is not installed.
+    """
+    fixtures = ToolFixtures(str(FIXTURES_DIR), mode=fixtures_mode)
+    with tempfile.TemporaryDirectory() as work_dir, FakeGeminiServer(
+        script=SCRIPTS[name], latency=latency, tokens_per_second=tokens_per_second
+    ) as server:
+        # Agents are not safe to run concurrently, so each worker takes one from the pool
+        agents: "queue.Queue[Any]" = queue.Queue()
+        try:
+            factory = SCENARIOS[name](server.url, work_dir, fixtures)
+            for _ in range(concurrency):
+                agents.put(factory())
+        except ImportError as e:
+            raise MissingDependency(str(e)) from e
+
+        latencies: List[float] = []
+        first_tokens: List[float] = []
+        errors: List[str] = []
+
+        def run(i: int) -> None:
+            agent = agents.get()
+            try:
+                started = time.perf_counter()
+                first_token = None
+                # Runs of the same worker share a user and session, so history and memories build up
+                stream = agent.run(
+                    f"Request {i}", stream=True, user_id=f"user_{i % concurrency}", session_id=f"session_{i % concurrency}"
+                )
+                for event in stream:
+                    if first_token is None and getattr(event, "event", None) in CONTENT_EVENTS and event.content:
+                        first_token = time.perf_counter() - started
+                latencies.append(time.perf_counter() - started)
+                if first_token is not None:
+                    first_tokens.append(first_token)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            finally:
+                agents.put(agent)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput": round(len(latencies) / elapsed, 3),
+        "latency_p50": _percentile(latencies, 0.5),
+        "latency_p95": _percentile(latencies, 0.95),
+        "latency_p99": _percentile(latencies, 0.99),
+        "ttft_p50": _percentile(first_tokens, 0.5),
+        "ttft_p95": _percentile(first_tokens, 0.95),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Regressions of the results against a baseline: a failed scenario, a scenario of the baseline now skipped,
+    lower throughput, or higher p95 latency or peak RSS by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    previous = {result["scenario"]: result for result in baseline}
+    for result in results:
+        before = previous.get(result["scenario"])
+        if "failed" in result:
+            regressions.append(f"{result['scenario']}: failed ({result['failed']})")
+            continue
+        if before is None or "skipped" in before or "failed" in before:
+            continue
+        if "skipped" in result:
+            regressions.append(f"{result['scenario']}: skipped, it ran in the baseline ({result['skipped']})")
+            continue
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{result['scenario']}: throughput {before['throughput']} -> {result['throughput']}")
+        for metric in ("latency_p95", "peak_rss_mb"):
+            if before.get(metric) and result.get(metric) and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{result['scenario']}: {metric} {before[metric]} -> {result[metric]}")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{result['scenario']}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Time to first token of the fake model, in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression, as a fraction")
+    parser.add_argument(
+        "--record-fixtures", action="store_true", help=f"Run the real tools and record their results in {FIXTURES_DIR}"
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    settings = [
+        "--requests", str(args.requests),
+        "--concurrency", str(args.concurrency),
+        "--latency", str(args.latency),
+        "--tokens-per-second", str(args.tokens_per_second),
+        *(["--record-fixtures"] if args.record_fixtures else []),
+    ]  # fmt: skip
+
+    if args.worker:
+        try:
+            result = run_scenario(
+                args.worker,
+                args.requests,
+                args.concurrency,
+                args.latency,
+                args.tokens_per_second,
+                fixtures_mode="record" if args.record_fixtures else "replay",
+            )
+        except MissingDependency as e:
+            # The only failure reported as a skip, the parent process counts any other exit as a failure
+            result = {"scenario": args.worker, "skipped": f"Missing dependency: {e}"}
+        print(json.dumps(result))
+        return
+
+    results = []
+    for name in args.scenarios:
+        process = subprocess.run(
+            [sys.executable, "-m", "shared.benchmark", "--worker", name, *settings], capture_output=True, text=True
+        )
+        if process.returncode == 0:
+            result = json.loads(process.stdout.strip().splitlines()[-1])
+        else:
+            error = process.stderr.strip().splitlines()
+            result = {"scenario": name, "failed": error[-1] if error else f"exit code {process.returncode}"}
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+    else:
+        regressions = [f"{result['scenario']}: failed ({result['failed']})" for result in results if "failed" in result]
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
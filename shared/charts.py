@@ -0,0 +1,187 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+from agno.tools.visualization import VisualizationTools
+from agno.utils.log import log_debug, log_info, logger
+
+CHART_TYPES = ("bar", "line", "pie", "scatter", "histogram")
+FIGURE_SIZES = {"pie": (10, 8)}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# One figure per worker process, cleared and reused for every chart it renders
+_figure = None
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forked workers don't re-import the running script, spawned ones would run its setup again
+            fork = "fork" in multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork") if fork else None
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker, mp_context=context)
+        return _pool
+
+
+def _normalize(data: Union[Dict[str, Any], List[Any], str]) -> Dict[str, float]:
+    # Same formats as VisualizationTools: a mapping, a list of records (label, value) or a list of values
+    if isinstance(data, str):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        return {str(k): float(v) if isinstance(v, (int, float)) else 0 for k, v in data.items()}
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        result = {}
+        for item in data:
+            keys = list(item.keys())
+            if len(keys) >= 2:
+                value = item[keys[1]]
+                result[str(item[keys[0]])] = float(value) if isinstance(value, (int, float)) else 0
+        return result
+    if isinstance(data, list):
+        return {f"Item {i + 1}": float(v) if isinstance(v, (int, float)) else 0 for i, v in enumerate(data)}
+    return {"Data": 1.0}
+
+
+def render_chart(spec: Dict[str, Any], file_path: str, dpi: int) -> Dict[str, Any]:
+    """
+    Render one chart spec to a file, in a worker process.
+
+    Args:
+        spec (Dict[str, Any]): Chart spec with "chart_type", "data" and optional "title", "x_label", "y_label" and "bins".
+        file_path (str): Where to save the chart, the extension sets the format.
+        dpi (int): Resolution of the saved image.
+
+    Returns:
+        Dict[str, Any]: The chart information, as returned by the single-chart tools.
+    """
+    global _figure
+    from matplotlib.figure import Figure
+
+    chart_type = spec["chart_type"]
+    if _figure is None:
+        _figure = Figure()
+    figure = _figure
+    figure.clf()
+    figure.set_size_inches(*FIGURE_SIZES.get(chart_type, (10, 6)))
+    ax = figure.add_subplot()
+
+    data = spec.get("data")
+    if chart_type == "scatter":
+        points = data if isinstance(data, dict) else {"x": [p[0] for p in data], "y": [p[1] for p in data]}
+        ax.scatter(points["x"], points["y"], alpha=0.7, s=50)
+        data_points = len(points["x"])
+    elif chart_type == "histogram":
+        ax.hist(data, bins=spec.get("bins", 10), alpha=0.7, edgecolor="black")
+        data_points = len(data)
+    else:
+        normalized = _normalize(data)
+        labels, values = list(normalized.keys()), list(normalized.values())
+        if chart_type == "bar":
+            ax.bar(labels, values)
+        elif chart_type == "line":
+            ax.plot(labels, values, marker="o", linewidth=2, markersize=6)
+        else:
+            ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
+            ax.axis("equal")
+        data_points = len(normalized)
+
+    title = spec.get("title") or f"{chart_type.title()} Chart"
+    ax.set_title(title)
+    if chart_type != "pie":
+        ax.set_xlabel(spec.get("x_label", ""))
+        ax.set_ylabel(spec.get("y_label", ""))
+        if chart_type in ("bar", "line"):
+            ax.tick_params(axis="x", labelrotation=45)
+        if chart_type in ("line", "scatter"):
+            ax.grid(True, alpha=0.3)
+    figure.tight_layout()
+    figure.savefig(file_path, dpi=dpi, bbox_inches="tight")
+    return {"chart_type": chart_type, "title": title, "file_path": file_path, "data_points": data_points}
+
+
+class BatchVisualizationTools(VisualizationTools):
+    """
+    VisualizationTools with a `create_charts` tool that renders several charts in one call.
+
+    Charts are rendered in parallel in a process pool (one worker per core, Agg backend, one
+    reused figure per worker). A chart whose spec and data are unchanged since it was last
+    rendered to the same file is not rendered again.
+
+    Args:
+        dpi (int): Resolution of the batch-rendered charts. Defaults to 300.
+        **kwargs: Passed through to VisualizationTools.
+    """
+
+    def __init__(self, dpi: int = 300, **kwargs):
+        super().__init__(**kwargs)
+        self.dpi = dpi
+        self.manifest_file = os.path.join(self.output_dir, ".chart_hashes.json")
+        self.register(self.create_charts)
+
+    def _read_manifest(self) -> Dict[str, str]:
+        if not os.path.exists(self.manifest_file):
+            return {}
+        with open(self.manifest_file) as f:
+            return json.load(f)
+
+    def create_charts(self, charts: List[Dict[str, Any]]) -> str:
+        """
+        Create several charts at once. Prefer this over creating the charts one by one.
+
+        Args:
+            charts: List of chart specs. Each spec has:
+                - chart_type: One of "bar", "line", "pie", "scatter" or "histogram"
+                - data: For bar, line and pie charts a dictionary with categories as keys and numbers as values
+                  (or a list of dictionaries); for scatter plots {"x": [...], "y": [...]} or a list of [x, y] pairs;
+                  for histograms a list of numbers
+                - title, x_label, y_label (optional): Chart title and axis labels
+                - bins (optional): Number of bins of a histogram
+                - filename (optional): Custom filename, the extension sets the format (e.g. "chart_co2_trend.jpg").
+                  Defaults to a JPG named after the chart type and a digest of the spec
+
+        Returns:
+            str: JSON list with the information and file path of every chart
+        """
+        manifest = self._read_manifest()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(charts)
+        jobs = {}
+        for i, spec in enumerate(charts):
+            chart_type = str(spec.get("chart_type", "")).replace("_chart", "").replace("_plot", "")
+            if chart_type not in CHART_TYPES:
+                results[i] = {"chart_type": spec.get("chart_type"), "error": "Unknown chart type", "status": "error"}
+                continue
+            spec = {**spec, "chart_type": chart_type}
+            filename = spec.pop("filename", None)
+            digest = hashlib.sha256(json.dumps([spec, self.dpi], sort_keys=True, default=str).encode()).hexdigest()
+            # Named after the spec, so charts of later calls never overwrite the files of earlier ones
+            file_path = os.path.join(self.output_dir, filename or f"{chart_type}_chart_{digest[:12]}.jpg")
+            if manifest.get(file_path) == digest and os.path.exists(file_path):
+                log_debug(f"Chart unchanged, skipping: {file_path}")
+                results[i] = {"chart_type": chart_type, "title": spec.get("title"), "file_path": file_path, "status": "cached"}
+                continue
+            jobs[i] = (file_path, digest, _get_pool().submit(render_chart, spec, file_path, self.dpi))
+
+        for i, (file_path, digest, future) in jobs.items():
+            try:
+                results[i] = {**future.result(), "status": "success"}
+                manifest[file_path] = digest
+            except Exception as e:
+                logger.error(f"Error creating chart {file_path}: {e}")
+                results[i] = {"chart_type": charts[i].get("chart_type"), "file_path": file_path, "error": str(e), "status": "error"}
+
+        with open(self.manifest_file, "w") as f:
+            json.dump(manifest, f)
+        log_info(f"Rendered {len(jobs)} charts, {len(charts) - len(jobs)} unchanged or invalid")
+        return json.dumps(results)
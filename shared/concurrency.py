@@ -0,0 +1,457 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from agno.exceptions import ModelProviderError
+from agno.utils.log import log_debug, log_warning
+
+from shared.rate_limit import TokenBucket
+
+T = TypeVar("T")
+
+# Lower runs first: interactive turns are admitted before background memory and summarization calls
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Overload responses shrink the concurrency limit and are retried here, other transient errors
+# are retried by the client (see GeminiClientRegistry)
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+class _Waiter:
+    """A caller queued for a slot, notified from whichever thread frees it."""
+
+    __slots__ = ("notify", "granted")
+
+    def __init__(self, notify: Callable[[], None]):
+        self.notify = notify
+        # Set under the limiter lock when the slot is handed over, so a caller giving up can tell
+        # whether it holds a slot to give back
+        self.granted = False
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit of one model, adapted with AIMD (additive increase, multiplicative decrease).
+
+    Every successful call raises the limit by `increase / limit` (about `increase` per round of
+    calls), an overload response (429/503) multiplies it by `decrease`, at most once per
+    `cooldown` so a burst of rejections counts once. Callers above the limit wait in a priority
+    queue, threads on an event and coroutines on a future of their event loop, so waiting
+    coroutines hold no thread. An optional token bucket caps the request rate to the model quota.
+
+    Args:
+        model_id (str): The model the limiter applies to.
+        initial_limit (float): Starting concurrency limit. Defaults to 8.
+        min_limit (float): Lowest concurrency limit. Defaults to 1.
+        max_limit (float): Highest concurrency limit. Defaults to 64.
+        increase (float): Additive increase per round of successful calls. Defaults to 1.
+        decrease (float): Multiplicative decrease on overload. Defaults to 0.5.
+        cooldown (float): Minimum seconds between two decreases. Defaults to 1.
+        requests_per_minute (float, optional): Request quota of the model.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        requests_per_minute: Optional[float] = None,
+    ):
+        self.model_id = model_id
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        # Burst of one second of quota, so a full queue cannot flood the model after a pause
+        self.bucket = None
+        if requests_per_minute:
+            self.bucket = TokenBucket(requests_per_minute / 60, capacity=max(requests_per_minute / 60, 1.0))
+        self.in_flight = 0
+        self.stats = {"calls": 0, "overloads": 0, "retries": 0}
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, waiter = heapq.heappop(self._waiters)
+            self.in_flight += 1
+            waiter.granted = True
+            waiter.notify()
+
+    def _enqueue(self, priority: int, notify: Callable[[], None]) -> Optional[_Waiter]:
+        # None when a slot is free right away
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._waiters:
+                self.in_flight += 1
+                return None
+            waiter = _Waiter(notify)
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Take a waiter out of the queue. False when it was granted a slot meanwhile, which it then holds."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters = [entry for entry in self._waiters if entry[2] is not waiter]
+            heapq.heapify(self._waiters)
+            return True
+
+    def _give_back(self) -> None:
+        # Frees a slot that was granted but never used, without counting a call
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> None:
+        """
+        Wait for a slot under the concurrency limit and a quota token.
+
+        Args:
+            priority (int): Lower priorities are admitted first. Defaults to INTERACTIVE.
+            timeout (float, optional): Maximum seconds to wait.
+
+        Raises:
+            TimeoutError: When no slot was free within the timeout.
+        """
+        event = threading.Event()
+        waiter = self._enqueue(priority, event.set)
+        # The slot may have been granted right after the wait timed out
+        if waiter is not None and not event.wait(timeout) and self._abandon(waiter):
+            raise TimeoutError(f"No free slot for {self.model_id} within {timeout:.1f}s")
+        if self.bucket is not None:
+            self.bucket.acquire()
+
+    async def aacquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> None:
+        """
+        Async version of `acquire`. A cancelled caller leaves the queue, or gives back the slot it was granted.
+
+        Raises:
+            TimeoutError: When no slot was free within the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[None]" = loop.create_future()
+        # Slots are freed from any thread, the future is resolved on its own loop
+        waiter = self._enqueue(priority, lambda: loop.call_soon_threadsafe(_resolve, future))
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                if self._abandon(waiter):
+                    raise TimeoutError(f"No free slot for {self.model_id} within {timeout:.1f}s") from None
+            except asyncio.CancelledError:
+                if not self._abandon(waiter):
+                    self._give_back()
+                raise
+        if self.bucket is not None:
+            try:
+                await self.bucket.aacquire()
+            except asyncio.CancelledError:
+                self._give_back()
+                raise
+
+    def release(self, overloaded: bool = False, succeeded: bool = True) -> None:
+        """
+        Free a slot and adapt the limit to the outcome of the call.
+
+        Args:
+            overloaded (bool): The model rejected the call as overloaded.
+            succeeded (bool): The call succeeded. Other failures leave the limit unchanged.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.stats["calls"] += 1
+            now = time.monotonic()
+            if overloaded:
+                self.stats["overloads"] += 1
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+                    log_debug(f"Concurrency limit of {self.model_id} lowered to {self.limit:.1f}")
+            elif succeeded:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._wake()
+
+
+class ModelCallScheduler:
+    """
+    Admission control and coordinated retries for model calls, shared by every agent and team.
+
+    Each model id gets its own AdaptiveLimiter. A call waits for a slot in priority order, and
+    an overload response is retried with full-jitter exponential backoff, each retry
+    going back through admission, until the deadline of the call. Retries therefore slow down
+    together with the limit instead of piling onto an overloaded model.
+
+    Args:
+        quotas (Dict[str, float], optional): Request quota per model id, in requests per minute.
+        deadline (float): Seconds a call may take, queueing and retries included. Defaults to 120.
+        base_delay (float): Delay before the first retry in seconds. Defaults to 0.5.
+        max_delay (float): Upper bound of a single delay in seconds. Defaults to 20.
+        **limiter_settings: Passed through to each AdaptiveLimiter.
+    """
+
+    def __init__(
+        self,
+        quotas: Optional[Dict[str, float]] = None,
+        deadline: float = 120,
+        base_delay: float = 0.5,
+        max_delay: float = 20,
+        **limiter_settings: Any,
+    ):
+        self.quotas = quotas or {}
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limiter_settings = limiter_settings
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ModelCallScheduler":
+        # Copies of agents and models must keep sharing the scheduler
+        return self
+
+    def limiter(self, model_id: str) -> AdaptiveLimiter:
+        with self._lock:
+            if model_id not in self._limiters:
+                self._limiters[model_id] = AdaptiveLimiter(
+                    model_id, requests_per_minute=self.quotas.get(model_id), **self.limiter_settings
+                )
+            return self._limiters[model_id]
+
+    def _retry_delay(self, error: ModelProviderError, attempt: int, expires_at: float) -> Optional[float]:
+        # None when the error is not an overload or the retry would end after the deadline
+        if error.status_code not in OVERLOAD_STATUS_CODES:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if time.monotonic() + delay >= expires_at:
+            return None
+        log_warning(f"Model error {error.status_code}: retrying in {delay:.1f}s (attempt {attempt + 1})")
+        return delay
+
+    def call(self, model_id: str, func: Callable[[], T], priority: int = INTERACTIVE) -> T:
+        """
+        Run a model call under admission control, retrying overloads until the deadline.
+
+        Args:
+            model_id (str): The model called.
+            func (Callable[[], T]): The call.
+            priority (int): INTERACTIVE or BACKGROUND. Defaults to INTERACTIVE.
+
+        Returns:
+            T: The result of the call.
+        """
+        limiter = self.limiter(model_id)
+        expires_at = time.monotonic() + self.deadline
+        for attempt in itertools.count():
+            limiter.acquire(priority, timeout=max(expires_at - time.monotonic(), 0))
+            try:
+                result = func()
+            except ModelProviderError as e:
+                limiter.release(overloaded=e.status_code in OVERLOAD_STATUS_CODES, succeeded=False)
+                delay = self._retry_delay(e, attempt, expires_at)
+                if delay is None:
+                    raise
+                limiter.stats["retries"] += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                limiter.release(succeeded=False)
+                raise
+            limiter.release()
+            return result
+        raise AssertionError("unreachable")
+
+    async def acall(self, model_id: str, func: Callable[[], Awaitable[T]], priority: int = INTERACTIVE) -> T:
+        """Async version of `call`, waiting for admission on the event loop."""
+        limiter = self.limiter(model_id)
+        expires_at = time.monotonic() + self.deadline
+        for attempt in itertools.count():
+            await limiter.aacquire(priority, timeout=max(expires_at - time.monotonic(), 0))
+            try:
+                result = await func()
+            except ModelProviderError as e:
+                limiter.release(overloaded=e.status_code in OVERLOAD_STATUS_CODES, succeeded=False)
+                delay = self._retry_delay(e, attempt, expires_at)
+                if delay is None:
+                    raise
+                limiter.stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                limiter.release(succeeded=False)
+                raise
+            limiter.release()
+            return result
+        raise AssertionError("unreachable")
+
+    def stream(self, model_id: str, func: Callable[[], Iterator[T]], priority: int = INTERACTIVE) -> Iterator[T]:
+        """
+        Streaming version of `call`. The slot is held for the whole stream, and a call is only
+        retried when it failed before its first chunk.
+        """
+        limiter = self.limiter(model_id)
+        expires_at = time.monotonic() + self.deadline
+        for attempt in itertools.count():
+            limiter.acquire(priority, timeout=max(expires_at - time.monotonic(), 0))
+            started = False
+            try:
+                for chunk in func():
+                    started = True
+                    yield chunk
+            except ModelProviderError as e:
+                limiter.release(overloaded=e.status_code in OVERLOAD_STATUS_CODES, succeeded=False)
+                delay = None if started else self._retry_delay(e, attempt, expires_at)
+                if delay is None:
+                    raise
+                limiter.stats["retries"] += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                limiter.release(succeeded=False)
+                raise
+            limiter.release()
+            return
+
+    async def astream(
+        self, model_id: str, func: Callable[[], AsyncIterator[T]], priority: int = INTERACTIVE
+    ) -> AsyncIterator[T]:
+        """Async version of `stream`."""
+        limiter = self.limiter(model_id)
+        expires_at = time.monotonic() + self.deadline
+        for attempt in itertools.count():
+            await limiter.aacquire(priority, timeout=max(expires_at - time.monotonic(), 0))
+            started = False
+            try:
+                async for chunk in func():
+                    started = True
+                    yield chunk
+            except ModelProviderError as e:
+                limiter.release(overloaded=e.status_code in OVERLOAD_STATUS_CODES, succeeded=False)
+                delay = None if started else self._retry_delay(e, attempt, expires_at)
+                if delay is None:
+                    raise
+                limiter.stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                limiter.release(succeeded=False)
+                raise
+            limiter.release()
+            return
+
+
+# Shared by every PooledGemini, so all agents and teams of the process are coordinated
+model_scheduler = ModelCallScheduler()
+
+
+def load_test(
+    calls: int = 300,
+    workers: int = 48,
+    requests_per_minute: float = 1200,
+    capacity: int = 12,
+    latency: float = 0.2,
+    background_share: float = 0.3,
+) -> None:
+    """
+    Compare uncoordinated client retries with the scheduler against a local fake Gemini server.
+
+    Args:
+        calls (int): Model calls per run. Defaults to 300.
+        workers (int): Concurrent callers. Defaults to 48.
+        requests_per_minute (float): Quota of the fake server. Defaults to 1200.
+        capacity (int): Concurrent requests the fake server accepts. Defaults to 12.
+        latency (float): Latency of the fake server in seconds. Defaults to 0.2.
+        background_share (float): Share of the calls made with BACKGROUND priority. Defaults to 0.3.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from agno.models.message import Message
+    from google.genai.types import HttpOptions, HttpRetryOptions
+
+    from shared.fake_gemini import FakeGeminiServer
+    from shared.model_clients import PooledGemini
+
+    # Same mix of priorities in both runs
+    priorities = [random.Random(i).random() for i in range(calls)]
+
+    def run(label: str, scheduled: bool) -> None:
+        with FakeGeminiServer(requests_per_minute=requests_per_minute, capacity=capacity, latency=latency) as server:
+            # Without the scheduler, the client retries overloads on its own, as the plain Gemini client does
+            retry_codes = [408, 500, 502, 504] if scheduled else [408, 429, 500, 502, 503, 504]
+            http_options = HttpOptions(
+                base_url=server.url, retry_options=HttpRetryOptions(attempts=8, http_status_codes=retry_codes)
+            )
+            scheduler = None
+            if scheduled:
+                scheduler = ModelCallScheduler(quotas={"fake-flash": requests_per_minute}, deadline=300)
+            models = {
+                priority: PooledGemini(
+                    id="fake-flash",
+                    api_key="fake",
+                    client_params={"http_options": http_options},
+                    priority=priority,
+                    scheduler=scheduler,
+                )
+                for priority in (INTERACTIVE, BACKGROUND)
+            }
+            latencies: Dict[int, List[float]] = {INTERACTIVE: [], BACKGROUND: []}
+            failures = 0
+
+            def call(i: int) -> None:
+                nonlocal failures
+                priority = BACKGROUND if priorities[i] < background_share else INTERACTIVE
+                started = time.monotonic()
+                try:
+                    models[priority].response(messages=[Message(role="user", content=f"Request {i}")])
+                    latencies[priority].append(time.monotonic() - started)
+                except Exception:
+                    failures += 1
+
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(call, range(calls)))
+            elapsed = time.monotonic() - started
+
+        def percentile(values: List[float], q: float) -> float:
+            return sorted(values)[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+        print(f"\n{label}")
+        print(
+            f"  {calls} calls in {elapsed:.1f}s: {len(server.accepted) / elapsed:.1f} accepted requests/s "
+            f"(quota {requests_per_minute / 60:.1f}/s), {failures} failed"
+        )
+        print(f"  Rejected by the server: {server.rejected[429]} x 429, {server.rejected[503]} x 503")
+        for priority, name in ((INTERACTIVE, "interactive"), (BACKGROUND, "background")):
+            values = latencies[priority]
+            print(
+                f"  {name:<12} p50 {percentile(values, 0.5):.2f}s  p95 {percentile(values, 0.95):.2f}s "
+                f"({len(values)} calls)"
+            )
+        if scheduler is not None:
+            limiter = scheduler.limiter("fake-flash")
+            print(f"  Final concurrency limit {limiter.limit:.1f}, {limiter.stats['retries']} coordinated retries")
+
+    run("Uncoordinated client retries", scheduled=False)
+    run("ModelCallScheduler", scheduled=True)
+
+
+if __name__ == "__main__":
+    load_test()
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+from agno.tools import Toolkit
+from agno.utils.log import log_debug, log_info, logger
+
+from shared.analysis import CompactDuckDbTools
+
+DATA_EXTENSIONS = (".csv", ".parquet")
+SKIP_DIRS = {".git", ".venv", "venv", "node_modules", "__pycache__", "lancedb"}
+
+
+def _scan_expression(path: str) -> str:
+    if path.lower().endswith(".csv"):
+        return f"read_csv('{path}', auto_detect=true)"
+    return f"read_parquet('{path}')"
+
+
+class DataCatalog:
+    """
+    Persistent catalog of the local CSV and Parquet files, stored in SQLite.
+
+    Every file is indexed once with its schema, row count and column statistics (computed by
+    DuckDB in a single out-of-core scan) and re-indexed only when its size or mtime changes.
+    CSV files that are opened often can be converted to Parquet, which later opens transparently.
+    """
+
+    def __init__(
+        self,
+        db_file: str = "tmp/agent.db",
+        table_name: str = "data_catalog",
+        parquet_dir: str = "tmp/data_catalog",
+        hot_after: Optional[int] = 3,
+    ):
+        """
+        Args:
+            db_file (str): SQLite database file. Defaults to the shared agent database.
+            table_name (str): Table holding the catalog.
+            parquet_dir (str): Directory for the Parquet copies of hot CSV files.
+            hot_after (int, optional): Convert a CSV file to Parquet once it was opened this many times. None disables it.
+        """
+        self.table_name = table_name
+        self.parquet_dir = Path(parquet_dir)
+        self.hot_after = hot_after
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name} (
+                path TEXT PRIMARY KEY,
+                format TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                row_count INTEGER,
+                columns TEXT,
+                error TEXT,
+                parquet_path TEXT,
+                opens INTEGER NOT NULL DEFAULT 0,
+                indexed_at REAL NOT NULL
+            )"""
+        )
+        self.connection.commit()
+
+    def _index_file(self, path: str) -> Dict[str, Any]:
+        # SUMMARIZE computes the type, min, max, approx_unique, null percentage and count of every column in one scan
+        summary = duckdb.sql(f"SUMMARIZE SELECT * FROM {_scan_expression(path)}").fetchall()
+        columns = [
+            {
+                "name": row[0],
+                "type": row[1],
+                "min": row[2],
+                "max": row[3],
+                "approx_unique": row[4],
+                "null_percentage": float(row[-1]) if row[-1] is not None else None,
+            }
+            for row in summary
+        ]
+        row_count = summary[0][-2] if summary else 0
+        return {"row_count": row_count, "columns": columns}
+
+    def _walk(self, roots: Sequence[str]) -> Dict[str, os.stat_result]:
+        files: Dict[str, os.stat_result] = {}
+        parquet_dir = self.parquet_dir.resolve()
+        for root in roots:
+            for directory, dirnames, filenames in os.walk(root):
+                dirnames[:] = [
+                    name
+                    for name in dirnames
+                    if name not in SKIP_DIRS and not name.startswith(".") and Path(directory, name).resolve() != parquet_dir
+                ]
+                for filename in filenames:
+                    if filename.lower().endswith(DATA_EXTENSIONS):
+                        path = os.path.join(directory, filename)
+                        files[os.path.normpath(path)] = os.stat(path)
+        return files
+
+    def _index(self, path: str, stat: os.stat_result, parquet_path: Optional[str] = None) -> None:
+        log_debug(f"Indexing {path}")
+        # The Parquet copy of a changed file is outdated
+        if parquet_path:
+            Path(parquet_path).unlink(missing_ok=True)
+        try:
+            entry, error = self._index_file(path), None
+        except duckdb.Error as e:
+            entry, error = {"row_count": None, "columns": []}, str(e)
+        with self._lock:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO {self.table_name} VALUES (?, ?, ?, ?, ?, ?, ?, NULL, 0, ?)",
+                (
+                    path,
+                    Path(path).suffix.lstrip(".").lower(),
+                    stat.st_size,
+                    stat.st_mtime,
+                    entry["row_count"],
+                    json.dumps(entry["columns"], default=str),
+                    error,
+                    time.time(),
+                ),
+            )
+            self.connection.commit()
+
+    def refresh(self, roots: Sequence[str] = (".",)) -> Dict[str, int]:
+        """
+        Bring the catalog up to date with the files under the roots, indexing only new or changed files.
+
+        Args:
+            roots (Sequence[str]): Directories to scan. Defaults to the current directory.
+
+        Returns:
+            Dict[str, int]: Number of "indexed", "unchanged" and "removed" files.
+        """
+        files = self._walk(roots)
+        with self._lock:
+            rows = self.connection.execute(f"SELECT path, size, mtime, parquet_path FROM {self.table_name}").fetchall()
+        known = {path: (size, mtime) for path, size, mtime, _ in rows}
+        parquet_paths = {path: parquet_path for path, _, _, parquet_path in rows if parquet_path}
+        stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+        for path, stat in files.items():
+            if known.get(path) == (stat.st_size, stat.st_mtime):
+                stats["unchanged"] += 1
+                continue
+
+            self._index(path, stat, parquet_paths.get(path))
+            stats["indexed"] += 1
+
+        removed = [path for path in known if path not in files and not os.path.exists(path)]
+        with self._lock:
+            self.connection.executemany(f"DELETE FROM {self.table_name} WHERE path = ?", [(path,) for path in removed])
+            self.connection.commit()
+        stats["removed"] = len(removed)
+        log_info(f"Data catalog refreshed: {stats}")
+        return stats
+
+    def _row(self, row: tuple) -> Dict[str, Any]:
+        path, file_format, size, mtime, row_count, columns, error, parquet_path, opens, _ = row
+        return {
+            "path": path,
+            "format": file_format,
+            "size": size,
+            "modified": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)),
+            "row_count": row_count,
+            "columns": json.loads(columns or "[]"),
+            "error": error,
+            "parquet_path": parquet_path,
+            "opens": opens,
+        }
+
+    def search(self, keywords: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Find datasets whose path or column names contain any of the keywords.
+
+        Args:
+            keywords (List[str], optional): Keywords to match, case-insensitively. Lists every dataset when empty.
+
+        Returns:
+            List[Dict[str, Any]]: The matching catalog entries.
+        """
+        with self._lock:
+            rows = self.connection.execute(f"SELECT * FROM {self.table_name} ORDER BY path").fetchall()
+        entries = [self._row(row) for row in rows]
+        if not keywords:
+            return entries
+        keywords = [keyword.lower() for keyword in keywords]
+        return [
+            entry
+            for entry in entries
+            if any(
+                keyword in entry["path"].lower() or any(keyword in column["name"].lower() for column in entry["columns"])
+                for keyword in keywords
+            )
+        ]
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT * FROM {self.table_name} WHERE path = ?", (os.path.normpath(path),)
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def open(self, path: str) -> str:
+        """
+        Record that a dataset is used and return the file to query, the Parquet copy when there is one.
+
+        A file whose size or mtime no longer matches its entry is re-indexed first, which drops its Parquet copy.
+
+        Args:
+            path (str): Path of a cataloged file.
+
+        Returns:
+            str: Path of the file to query.
+        """
+        path = os.path.normpath(path)
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT size, mtime, parquet_path FROM {self.table_name} WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None or not os.path.exists(path):
+            return path
+        stat = os.stat(path)
+        if (stat.st_size, stat.st_mtime) != (row[0], row[1]):
+            self._index(path, stat, row[2])
+        entry = self.get(path)
+        opens = entry["opens"] + 1
+        parquet_path = entry["parquet_path"]
+        if (
+            parquet_path is None
+            and entry["format"] == "csv"
+            and not entry["error"]
+            and self.hot_after is not None
+            and opens >= self.hot_after
+        ):
+            self.parquet_dir.mkdir(parents=True, exist_ok=True)
+            digest = hashlib.sha256(f"{entry['path']}:{entry['size']}:{entry['modified']}".encode()).hexdigest()[:16]
+            parquet_path = str(self.parquet_dir / f"{Path(entry['path']).stem}_{digest}.parquet")
+            log_info(f"Converting hot CSV {entry['path']} to {parquet_path}")
+            duckdb.sql(f"COPY (SELECT * FROM {_scan_expression(entry['path'])}) TO '{parquet_path}' (FORMAT PARQUET)")
+        with self._lock:
+            self.connection.execute(
+                f"UPDATE {self.table_name} SET opens = ?, parquet_path = ? WHERE path = ?",
+                (opens, parquet_path, entry["path"]),
+            )
+            self.connection.commit()
+        return parquet_path or entry["path"]
+
+
+class DataCatalogTools(Toolkit):
+    """
+    Dataset discovery through the data catalog instead of directory scans.
+
+    Args:
+        catalog (DataCatalog, optional): The catalog. Defaults to a DataCatalog in the shared agent database.
+        duckdb_tools (CompactDuckDbTools, optional): DuckDB tools in which `open_dataset` registers datasets.
+        roots (Sequence[str]): Directories the catalog covers. Defaults to the current directory.
+        refresh_on_init (bool): Refresh the catalog when the toolkit is created. Defaults to True.
+        **kwargs: Passed through to Toolkit.
+    """
+
+    def __init__(
+        self,
+        catalog: Optional[DataCatalog] = None,
+        duckdb_tools: Optional[CompactDuckDbTools] = None,
+        roots: Sequence[str] = (".",),
+        refresh_on_init: bool = True,
+        **kwargs,
+    ):
+        self.catalog = catalog or DataCatalog()
+        self.duckdb_tools = duckdb_tools
+        self.roots = roots
+        if refresh_on_init:
+            self.catalog.refresh(self.roots)
+
+        tools: List[Any] = [self.search_datasets, self.refresh_catalog]
+        if duckdb_tools is not None:
+            tools.append(self.open_dataset)
+        super().__init__(name="data_catalog_tools", tools=tools, **kwargs)
+
+    def search_datasets(self, keywords: Optional[List[str]] = None) -> str:
+        """Use this function to find the available CSV and Parquet datasets.
+        Searches the data catalog by file path and column names, without reading any file.
+
+        Args:
+            keywords (List[str], optional): Keywords to look for, e.g. ["co2", "emissions"]. Lists every dataset when empty.
+
+        Returns:
+            str: JSON list of the matching datasets with their path, row count, columns and column statistics.
+        """
+        entries = self.catalog.search(keywords)
+        log_debug(f"Found {len(entries)} datasets for {keywords}")
+        return json.dumps(entries, indent=2, default=str)
+
+    def refresh_catalog(self) -> str:
+        """Use this function to update the data catalog after files were added or changed.
+
+        Returns:
+            str: JSON with the number of indexed, unchanged and removed files.
+        """
+        return json.dumps(self.catalog.refresh(self.roots))
+
+    def open_dataset(self, path: str, table: Optional[str] = None) -> str:
+        """Use this function to make a cataloged dataset queryable with DuckDbTools.
+
+        Args:
+            path (str): The dataset path from `search_datasets`.
+            table (str, optional): The table name to use. Defaults to the file name.
+
+        Returns:
+            str: The table name to query.
+        """
+        try:
+            table = table or self.duckdb_tools.get_table_name_from_path(path)  # type: ignore
+            return self.duckdb_tools.create_table_from_path(self.catalog.open(path), table=table, replace=True)  # type: ignore
+        except duckdb.Error as e:
+            logger.error(f"Error opening dataset: {e}")
+            return f"Error opening dataset: {e}"
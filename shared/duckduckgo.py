@@ -0,0 +1,78 @@
+import json
+from typing import Any, Optional
+
+from agno.tools.duckduckgo import DuckDuckGoTools
+from agno.utils.log import log_debug
+from duckduckgo_search import DDGS
+from duckduckgo_search.exceptions import RatelimitException
+
+from shared.caching import TTLCache
+from shared.rate_limit import TokenBucket, retry_with_backoff
+
+# Shared by every agent and team member in the process
+search_cache = TTLCache(ttl=60 * 60, max_size=2048)
+search_rate_limiter = TokenBucket(rate=1.0, capacity=3)
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class CachedDuckDuckGoTools(DuckDuckGoTools):
+    """
+    DuckDuckGoTools with a shared result cache, request coalescing and rate limiting.
+
+    Identical queries are answered from a process-wide TTL cache, and concurrent identical
+    queries share a single upstream request. Upstream requests go through a token bucket and
+    are retried with jittered backoff when DuckDuckGo rate-limits them.
+
+    Args:
+        cache (TTLCache, optional): Result cache. Defaults to the process-wide `search_cache`.
+        rate_limiter (TokenBucket, optional): Request limiter. Defaults to the process-wide `search_rate_limiter`.
+        **kwargs: Passed through to DuckDuckGoTools.
+    """
+
+    def __init__(self, cache: Optional[TTLCache] = None, rate_limiter: Optional[TokenBucket] = None, **kwargs):
+        self.cache = cache or search_cache
+        self.rate_limiter = rate_limiter or search_rate_limiter
+        super().__init__(**kwargs)
+
+    def _search(self, kind: str, query: str, max_results: int) -> str:
+        def fetch() -> Any:
+            self.rate_limiter.acquire()
+            ddgs = DDGS(
+                headers=self.headers, proxy=self.proxy, proxies=self.proxies, timeout=self.timeout, verify=self.verify_ssl
+            )
+            search = ddgs.text if kind == "text" else ddgs.news
+            return search(keywords=query, max_results=max_results)
+
+        key = (kind, _normalize(query), max_results)
+        results = self.cache.get_or_load(key, lambda: retry_with_backoff(fetch, retry_on=(RatelimitException,)))
+        return json.dumps(results, indent=2)
+
+    def duckduckgo_search(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search DuckDuckGo for a query.
+
+        Args:
+            query(str): The query to search for.
+            max_results (optional, default=5): The maximum number of results to return.
+
+        Returns:
+            The result from DuckDuckGo.
+        """
+        search_query = f"{self.modifier} {query}" if self.modifier else query
+        log_debug(f"Searching DDG for: {search_query}")
+        return self._search("text", search_query, self.fixed_max_results or max_results)
+
+    def duckduckgo_news(self, query: str, max_results: int = 5) -> str:
+        """Use this function to get the latest news from DuckDuckGo.
+
+        Args:
+            query(str): The query to search for.
+            max_results (optional, default=5): The maximum number of results to return.
+
+        Returns:
+            The latest news from DuckDuckGo.
+        """
+        log_debug(f"Searching DDG news for: {query}")
+        return self._search("news", query, self.fixed_max_results or max_results)
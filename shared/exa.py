@@ -0,0 +1,215 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import agno.tools.exa
+from agno.tools.exa import ExaTools
+from agno.utils.log import logger
+from exa_py import Exa
+
+from shared.caching import TTLCache
+
+# One client per API key, shared by every ExaTools instance in the process
+_clients: Dict[Optional[str], Exa] = {}
+_clients_lock = threading.Lock()
+
+# Shared by every agent in the process, keyed by normalized query and search options
+exa_cache = TTLCache(ttl=6 * 60 * 60, max_size=4096)
+
+EXA_INSTRUCTIONS = (
+    "Exa search results already include the most relevant highlights of every page. "
+    "Only use `get_contents` for pages you need in more detail, and pass all of their URLs in a single call."
+)
+
+
+def get_exa_client(api_key: Optional[str]) -> Exa:
+    """Return the shared Exa client for the API key, creating it on first use."""
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = Exa(api_key)
+        return _clients[api_key]
+
+
+# ExaTools.__init__ builds its client with the `Exa` of its module: resolve it to the shared client instead,
+# so that no instance constructs (and then discards) a client of its own
+agno.tools.exa.Exa = get_exa_client
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class _ExaError(Exception):
+    """Wraps the error strings returned by ExaTools so they reach the model but are never cached."""
+
+
+def _is_error(result: str) -> bool:
+    if result.startswith("Error"):
+        return True
+    try:
+        parsed = json.loads(result)
+    except ValueError:
+        return False
+    return isinstance(parsed, dict) and "error" in parsed
+
+
+class CachedExaTools(ExaTools):
+    """
+    ExaTools backed by a shared client and a shared result cache.
+
+    Searches return highlights instead of full page text by default, which keeps the results
+    small in the prompt. `get_contents` is the way to read a page in detail, so it always returns
+    the page text, up to `text_length_limit` characters. Results are cached by normalized query and
+    options, and `get_contents` only requests the URLs that are not cached yet, in a single call.
+
+    Args:
+        text (bool): Retrieve the full text of every search result. Defaults to False, highlights are returned
+            instead.
+        highlights (bool): Include highlighted snippets. Defaults to True.
+        cache (TTLCache, optional): Result cache. Defaults to the process-wide `exa_cache`.
+        **kwargs: Passed through to ExaTools.
+    """
+
+    def __init__(self, text: bool = False, highlights: bool = True, cache: Optional[TTLCache] = None, **kwargs):
+        kwargs.setdefault("instructions", EXA_INSTRUCTIONS)
+        kwargs.setdefault("add_instructions", True)
+        super().__init__(text=text, highlights=highlights, **kwargs)
+        self.cache = cache or exa_cache
+
+    def _options(self) -> tuple:
+        return (
+            self.text,
+            self.text_length_limit,
+            self.highlights,
+            self.summary,
+            self.num_results,
+            self.livecrawl,
+            self.start_crawl_date,
+            self.end_crawl_date,
+            self.start_published_date,
+            self.end_published_date,
+            self.use_autoprompt,
+            self.type,
+            self.category,
+            tuple(self.include_domains or ()),
+            tuple(self.exclude_domains or ()),
+        )
+
+    def _contents_options(self) -> tuple:
+        return (self.text_length_limit, self.highlights, self.summary)
+
+    def _fetch_contents(self, urls: List[str]) -> str:
+        # Unlike ExaTools.get_contents, the text is always requested, whatever `text` is for searches
+        text = {"max_characters": self.text_length_limit} if self.text_length_limit else True
+        try:
+            results = self._execute_with_timeout(
+                self.exa.get_contents, urls=urls, text=text, highlights=self.highlights, summary=self.summary
+            )
+            return self._parse_results(results)
+        except Exception as e:
+            logger.error(f"Failed to get contents from Exa: {e}")
+            return f"Error: {e}"
+
+    def _cached(self, key: tuple, call: Callable[[], str]) -> str:
+        def load() -> str:
+            result = call()
+            if _is_error(result):
+                raise _ExaError(result)
+            return result
+
+        try:
+            return self.cache.get_or_load(key, load)
+        except _ExaError as e:
+            return str(e)
+
+    def search_exa(self, query: str, num_results: int = 5, category: Optional[str] = None) -> str:
+        """Use this function to search Exa (a web search engine) for a query.
+
+        Args:
+            query (str): The query to search for.
+            num_results (int): Number of results to return. Defaults to 5.
+            category (Optional[str]): The category to filter search results.
+                Options are "company", "research paper", "news", "pdf", "github",
+                "tweet", "personal site", "linkedin profile", "financial report".
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        search = super().search_exa
+        key = ("search", _normalize(query), num_results, category, self._options())
+        return self._cached(key, lambda: search(query, num_results=num_results, category=category))
+
+    def get_contents(self, urls: list[str]) -> str:
+        """
+        Retrieve detailed content from specific URLs using the Exa API.
+
+        Args:
+            urls (list(str)): A list of URLs from which to fetch content.
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        options = self._contents_options()
+        missing = [url for url in dict.fromkeys(urls) if ("contents", url, options) not in self.cache]
+        unmatched: List[Dict[str, Any]] = []
+        if missing:
+            # One request for every URL that isn't cached yet
+            result = self._fetch_contents(missing)
+            if _is_error(result):
+                return result
+            for item in json.loads(result):
+                if item.get("url") in missing:
+                    self.cache.set(("contents", item["url"], options), item)
+                else:
+                    # Exa may answer with the redirected URL, keep the result anyway
+                    unmatched.append(item)
+
+        contents = [self.cache.get(("contents", url, options)) for url in dict.fromkeys(urls)]
+        return json.dumps([item for item in contents if item is not None] + unmatched, indent=4, ensure_ascii=False)
+
+    def find_similar(self, url: str, num_results: int = 5) -> str:
+        """
+        Find similar links to a given URL using the Exa API.
+
+        Args:
+            url (str): The URL for which to find similar links.
+            num_results (int, optional): The number of similar links to return. Defaults to 5.
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        find_similar = super().find_similar
+        key = ("similar", url, num_results, self._options())
+        return self._cached(key, lambda: find_similar(url, num_results=num_results))
+
+    def exa_answer(self, query: str, text: bool = False) -> str:
+        """
+        Get an LLM answer to a question informed by Exa search results.
+
+        Args:
+            query (str): The question or query to answer.
+            text (bool): Include full text from citation. Default is False.
+        Returns:
+            str: The answer results in JSON format with both generated answer and sources.
+        """
+        exa_answer = super().exa_answer
+        key = ("answer", _normalize(query), text, self.model)
+        return self._cached(key, lambda: exa_answer(query, text=text))
+
+    def research(
+        self,
+        instructions: str,
+        output_schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Perform deep research on a topic.
+
+        Args:
+            instructions (str): Research instructions.
+            output_schema (Optional[Dict[str, Any]]): JSON schema for structured output. If not provided, the API will auto-infer an appropriate schema.
+        Returns:
+            str: JSON formatted research results including data and citations.
+        """
+        research = super().research
+        key = ("research", _normalize(instructions), json.dumps(output_schema, sort_keys=True), self.research_model)
+        return self._cached(key, lambda: research(instructions, output_schema=output_schema))
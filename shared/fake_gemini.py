@@ -0,0 +1,220 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+from shared.rate_limit import TokenBucket
+
+WORDS = (
+    "the model answers with a deterministic text so that every benchmark run sends and receives exactly the same "
+    "number of tokens across agents teams and tools while latency and throughput depend only on the code under test"
+).split()
+
+
+def fake_text(tokens: int, seed: str = "") -> str:
+    """Deterministic text of about `tokens` tokens (one word per token)."""
+    offset = int(hashlib.sha256(seed.encode()).hexdigest(), 16) % len(WORDS)
+    return " ".join(WORDS[(offset + i) % len(WORDS)] for i in range(tokens))
+
+
+def fake_embedding(text: str, dimensions: int = 768) -> List[float]:
+    """Deterministic unit vector for a text, identical texts get identical vectors."""
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+    norm = sum(value * value for value in vector) ** 0.5
+    return [value / norm for value in vector]
+
+
+class FakeGeminiServer:
+    """
+    Local HTTP server answering like the Gemini API, for offline benchmarks and load tests.
+
+    `generateContent` and `streamGenerateContent` follow a script: each step is a tool call
+    (`{"tool": name, "args": {...}}`) or an answer (`{"text": ...}`). Steps calling tools the
+    request does not declare are skipped, so one script can drive a team leader and its members.
+    The n-th model turn of a run plays the n-th remaining step, and turns past the script answer
+    with `output_tokens` tokens of deterministic text. The first token comes after `latency`
+    seconds, the others at `tokens_per_second`. `embedContent` and `batchEmbedContents` return
+    deterministic vectors.
+
+    The server can also enforce a request quota (429 beyond it) and a concurrency capacity (503
+    beyond it). Point a model at it with `client_params={"http_options": HttpOptions(base_url=server.url)}`.
+
+    Args:
+        script (List[Dict[str, Any]], optional): Steps of every run.
+        output_tokens (int): Tokens of an answer not given by the script. Defaults to 50.
+        latency (float): Seconds before the first token. Defaults to 0.2.
+        tokens_per_second (float, optional): Generation speed after the first token. Defaults to instant.
+        requests_per_minute (float, optional): Request quota, answered with 429 once exhausted.
+        capacity (int, optional): Maximum concurrent requests, answered with 503 beyond it.
+    """
+
+    def __init__(
+        self,
+        script: Optional[List[Dict[str, Any]]] = None,
+        output_tokens: int = 50,
+        latency: float = 0.2,
+        tokens_per_second: Optional[float] = None,
+        requests_per_minute: Optional[float] = None,
+        capacity: Optional[int] = None,
+    ):
+        self.script = script or []
+        self.output_tokens = output_tokens
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.bucket = TokenBucket(requests_per_minute / 60) if requests_per_minute else None
+        self.capacity = capacity
+        self.accepted: List[float] = []
+        self.rejected = {429: 0, 503: 0}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def admit(self) -> int:
+        """Status code of a new request: 200, or 429/503 when it is rejected."""
+        with self._lock:
+            if self.capacity is not None and self._in_flight >= self.capacity:
+                status = 503
+            elif self.bucket is not None and not self.bucket.try_acquire():
+                status = 429
+            else:
+                self._in_flight += 1
+                self.accepted.append(time.monotonic())
+                return 200
+            self.rejected[status] += 1
+            return status
+
+    def next_step(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The script step answering a generateContent request."""
+        contents = request.get("contents", [])
+        # Model turns since the last user message
+        turn = 0
+        for content in reversed(contents):
+            parts = content.get("parts") or [{}]
+            if content.get("role") == "user" and any("text" in part for part in parts):
+                break
+            if content.get("role") == "model":
+                turn += 1
+
+        declared = {
+            declaration["name"]
+            for tool in request.get("tools") or []
+            for declaration in tool.get("functionDeclarations") or []
+        }
+        steps = [step for step in self.script if "tool" not in step or step["tool"] in declared]
+        if turn < len(steps):
+            return steps[turn]
+        return {"text": fake_text(self.output_tokens, seed=json.dumps(contents[-1:]))}
+
+    def _usage(self, request: Dict[str, Any], output_tokens: int) -> Dict[str, int]:
+        prompt_tokens = len(json.dumps(request)) // 4
+        return {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        }
+
+    def respond(self, request: Dict[str, Any], stream: bool = False) -> Iterator[Dict[str, Any]]:
+        """The generateContent responses to a request, one per streamed chunk, pacing the tokens."""
+        time.sleep(self.latency)
+        step = self.next_step(request)
+        if "tool" in step:
+            part = {"functionCall": {"name": step["tool"], "args": step.get("args", {})}}
+            yield {
+                "candidates": [{"content": {"role": "model", "parts": [part]}, "finishReason": "STOP", "index": 0}],
+                "usageMetadata": self._usage(request, 10),
+            }
+            return
+
+        words = step["text"].split(" ")
+        chunk_size = 8 if stream else len(words)
+        for start in range(0, len(words), chunk_size):
+            chunk = words[start : start + chunk_size]
+            if self.tokens_per_second and start > 0:
+                time.sleep(len(chunk) / self.tokens_per_second)
+            text = " ".join(chunk) + (" " if start + chunk_size < len(words) else "")
+            last = start + chunk_size >= len(words)
+            yield {
+                "candidates": [
+                    {
+                        "content": {"role": "model", "parts": [{"text": text}]},
+                        **({"finishReason": "STOP"} if last else {}),
+                        "index": 0,
+                    }
+                ],
+                "usageMetadata": self._usage(request, len(words) if last else start + len(chunk)),
+            }
+
+    def embed(self, path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The embedContent or batchEmbedContents response to a request."""
+
+        def vector(item: Dict[str, Any]) -> Dict[str, List[float]]:
+            text = " ".join(part.get("text", "") for part in item.get("content", {}).get("parts", []))
+            return {"values": fake_embedding(text, item.get("outputDimensionality") or 768)}
+
+        if ":batchEmbedContents" in path:
+            return {"embeddings": [vector(item) for item in request.get("requests", [])]}
+        return {"embedding": vector(request)}
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if "mbedContent" in self.path:
+                    self._send(200, json.dumps(server.embed(self.path, request)).encode())
+                    return
+
+                status = server.admit()
+                if status != 200:
+                    reason = "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"
+                    error = {"code": status, "message": "Fake overload", "status": reason}
+                    self._send(status, json.dumps({"error": error}).encode())
+                    return
+                try:
+                    if ":streamGenerateContent" not in self.path:
+                        (response,) = server.respond(request)
+                        self._send(200, json.dumps(response).encode())
+                        return
+                    # Server-sent events, flushed chunk by chunk so the first token arrives first
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for chunk in server.respond(request, stream=True):
+                        self.wfile.write(f"data: {json.dumps(chunk)}\r\n\r\n".encode())
+                        self.wfile.flush()
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+        return Handler
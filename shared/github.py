@@ -0,0 +1,267 @@
+import json
+import shutil
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+from agno.tools.github import GithubTools
+from agno.utils.log import log_debug, logger
+from github import GithubException
+
+from shared.caching import TTLCache
+
+# Commit SHA of each repository's default branch, resolved at most once per TTL
+head_cache = TTLCache(ttl=5 * 60, max_size=256)
+
+
+def _is_binary(content: bytes) -> bool:
+    return b"\x00" in content[:8000]
+
+
+class SnapshotGithubTools(GithubTools):
+    """
+    GithubTools that read a repository from a local snapshot keyed by commit SHA.
+
+    The first look at a repository resolves the SHA of its default branch (one API call). An
+    unknown SHA is snapshotted once: the repository metadata and languages are stored and the
+    tarball of that commit is extracted to disk. Repository details, the file tree, directory
+    listings and file contents are then served locally, so re-running on an unchanged repository
+    costs a single API call.
+
+    Args:
+        snapshot_dir (str): Directory holding the snapshots. Defaults to "tmp/github_snapshots".
+        **kwargs: Passed through to GithubTools.
+    """
+
+    def __init__(self, snapshot_dir: str = "tmp/github_snapshots", **kwargs):
+        for tool in ("get_repository", "get_repository_languages", "get_directory_content", "get_file_content"):
+            kwargs.setdefault(tool, True)
+        kwargs.setdefault("update_file", False)
+        super().__init__(**kwargs)
+        self.snapshot_dir = Path(snapshot_dir)
+        self._lock = threading.Lock()
+        self.register(self.get_repository_tree)
+
+    def head_sha(self, repo_name: str) -> str:
+        return head_cache.get_or_load(
+            repo_name.lower(), lambda: self.g.get_repo(repo_name, lazy=True).get_commit("HEAD").sha
+        )
+
+    def snapshot(self, repo_name: str) -> Path:
+        """
+        Local snapshot of the current default branch of the repository, created if needed.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            Path: The snapshot directory, holding `meta.json` and the repository `files`.
+        """
+        sha = self.head_sha(repo_name)
+        path = self.snapshot_dir / repo_name.lower().replace("/", "__") / sha
+        with self._lock:
+            # meta.json is written last, so it marks a complete snapshot
+            if (path / "meta.json").exists():
+                return path
+
+            log_debug(f"Creating snapshot of {repo_name} at {sha}")
+            repo = self.g.get_repo(repo_name)
+            meta = {
+                "name": repo.full_name,
+                "description": repo.description,
+                "url": repo.html_url,
+                "stars": repo.stargazers_count,
+                "forks": repo.forks_count,
+                "open_issues": repo.open_issues_count,
+                "language": repo.language,
+                "license": repo.license.name if repo.license else None,
+                "default_branch": repo.default_branch,
+                "topics": repo.topics,
+                "languages": repo.get_languages(),
+                "sha": sha,
+            }
+
+            shutil.rmtree(path, ignore_errors=True)
+            path.mkdir(parents=True)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                archive = Path(tmp_dir) / "repo.tar.gz"
+                archive_url = repo.get_archive_link("tarball", ref=sha)
+                with httpx.stream("GET", archive_url, follow_redirects=True, timeout=120) as response:
+                    response.raise_for_status()
+                    with archive.open("wb") as f:
+                        for chunk in response.iter_bytes():
+                            f.write(chunk)
+                with tarfile.open(archive) as tar:
+                    tar.extractall(Path(tmp_dir) / "extracted", filter="data")
+                # The tarball has a single "<owner>-<repo>-<sha>" top-level directory
+                (top_level,) = (Path(tmp_dir) / "extracted").iterdir()
+                shutil.move(str(top_level), path / "files")
+
+            (path / "meta.json").write_text(json.dumps(meta, indent=2))
+            return path
+
+    def _local_path(self, snapshot: Path, path: str) -> Optional[Path]:
+        root = (snapshot / "files").resolve()
+        local = (root / path.strip("/")).resolve()
+        return local if local == root or root in local.parents else None
+
+    def _is_snapshot_ref(self, repo_name: str, ref: Optional[str]) -> bool:
+        return ref is None or ref == self.head_sha(repo_name)
+
+    def get_repository(self, repo_name: str) -> str:
+        """Get details of a specific repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing repository details.
+        """
+        log_debug(f"Getting repository: {repo_name}")
+        try:
+            meta = json.loads((self.snapshot(repo_name) / "meta.json").read_text())
+            return json.dumps({key: value for key, value in meta.items() if key != "languages"}, indent=2)
+        except (GithubException, httpx.HTTPError) as e:
+            logger.error(f"Error getting repository: {e}")
+            return json.dumps({"error": str(e)})
+
+    def get_repository_languages(self, repo_name: str) -> str:
+        """Get the languages used in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing the list of languages.
+        """
+        log_debug(f"Getting languages for repository: {repo_name}")
+        try:
+            meta = json.loads((self.snapshot(repo_name) / "meta.json").read_text())
+            return json.dumps(meta["languages"], indent=2)
+        except (GithubException, httpx.HTTPError) as e:
+            logger.error(f"Error getting repository languages: {e}")
+            return json.dumps({"error": str(e)})
+
+    def get_repository_tree(self, repo_name: str, path: str = "", max_depth: int = 3, max_entries: int = 500) -> str:
+        """Get the file tree of a repository in one call. Use this to analyze the project structure.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str, optional): The directory to start from. Defaults to the root.
+            max_depth (int, optional): How many directory levels to list. Defaults to 3.
+            max_entries (int, optional): Maximum number of entries to list. Defaults to 500.
+
+        Returns:
+            The tree as indented lines, directories end with "/".
+        """
+        log_debug(f"Getting tree of {path or 'root'} in repository: {repo_name}")
+        try:
+            root = self._local_path(self.snapshot(repo_name), path)
+            if root is None or not root.is_dir():
+                return json.dumps({"error": f"{path} is not a directory"})
+
+            lines: List[str] = []
+
+            def walk(directory: Path, depth: int) -> None:
+                entries = sorted(directory.iterdir(), key=lambda entry: (not entry.is_dir(), entry.name.lower()))
+                for entry in entries:
+                    if len(lines) >= max_entries:
+                        return
+                    lines.append("  " * depth + entry.name + ("/" if entry.is_dir() else ""))
+                    if entry.is_dir() and depth + 1 < max_depth:
+                        walk(entry, depth + 1)
+
+            walk(root, 0)
+            if len(lines) >= max_entries:
+                lines.append(f"... (truncated at {max_entries} entries)")
+            return "\n".join(lines)
+        except (GithubException, httpx.HTTPError) as e:
+            logger.error(f"Error getting repository tree: {e}")
+            return json.dumps({"error": str(e)})
+
+    def get_directory_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the contents of a directory in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the directory in the repository. Use empty string for root.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to repository's default branch.
+
+        Returns:
+            A JSON-formatted string containing a list of directory contents.
+        """
+        try:
+            if not self._is_snapshot_ref(repo_name, ref):
+                return super().get_directory_content(repo_name, path, ref=ref)
+
+            log_debug(f"Getting contents of directory {path} in repository: {repo_name}")
+            snapshot = self.snapshot(repo_name)
+            directory = self._local_path(snapshot, path)
+            if directory is None or not directory.exists():
+                return json.dumps({"error": f"{path} not found"})
+            if not directory.is_dir():
+                return json.dumps({"error": f"{path} is a file, not a directory"})
+
+            root = (snapshot / "files").resolve()
+            items: List[Dict[str, Any]] = [
+                {
+                    "name": entry.name,
+                    "path": entry.relative_to(root).as_posix(),
+                    "type": "dir" if entry.is_dir() else "file",
+                    "size": 0 if entry.is_dir() else entry.stat().st_size,
+                }
+                for entry in directory.iterdir()
+            ]
+            # Sort by type (directories first) and then by name
+            items.sort(key=lambda x: (x["type"] != "dir", x["name"].lower()))
+            return json.dumps(items, indent=2)
+        except (GithubException, httpx.HTTPError) as e:
+            logger.error(f"Error getting directory contents: {e}")
+            return json.dumps({"error": str(e)})
+
+    def get_file_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the content of a file in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the file in the repository.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to the repository's default branch.
+
+        Returns:
+            A JSON-formatted string containing the file content and metadata.
+        """
+        try:
+            if not self._is_snapshot_ref(repo_name, ref):
+                return super().get_file_content(repo_name, path, ref=ref)
+
+            log_debug(f"Getting content of file {path} in repository: {repo_name}")
+            snapshot = self.snapshot(repo_name)
+            file = self._local_path(snapshot, path)
+            if file is None or not file.exists():
+                return json.dumps({"error": f"{path} not found"})
+            if file.is_dir():
+                return json.dumps({"error": f"{path} is a directory, not a file"})
+
+            content = file.read_bytes()
+            try:
+                decoded_content = "Binary file (content not displayed)" if _is_binary(content) else content.decode("utf-8")
+            except UnicodeDecodeError:
+                decoded_content = "Binary file (content not displayed)"
+
+            meta = json.loads((snapshot / "meta.json").read_text())
+            content_info = {
+                "name": file.name,
+                "path": path.strip("/"),
+                "commit": meta["sha"],
+                "size": len(content),
+                "type": "file",
+                "url": f"{meta['url']}/blob/{meta['sha']}/{path.strip('/')}",
+                "content": decoded_content,
+            }
+            return json.dumps(content_info, indent=2)
+        except (GithubException, httpx.HTTPError) as e:
+            logger.error(f"Error getting file content: {e}")
+            return json.dumps({"error": str(e)})
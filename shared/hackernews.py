@@ -0,0 +1,171 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import httpx
+from agno.tools.hackernews import HackerNewsTools
+from agno.utils.log import log_debug
+
+from shared.caching import TTLCache
+
+API_URL = "https://hacker-news.firebaseio.com/v0"
+
+# One pooled client for every HackerNews request of the process
+http_client = httpx.Client(
+    base_url=API_URL, timeout=15, limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+)
+# Items change slowly (scores and new replies), story lists quickly
+item_cache = TTLCache(ttl=5 * 60, max_size=20_000)
+list_cache = TTLCache(ttl=60, max_size=16)
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hackernews")
+
+
+def _get(path: str) -> Any:
+    response = http_client.get(path)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_item(item_id: int) -> Optional[Dict[str, Any]]:
+    return item_cache.get_or_load(item_id, lambda: _get(f"/item/{item_id}.json"))
+
+
+def get_items(item_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Fetch items concurrently, serving cached ones from memory.
+
+    Args:
+        item_ids (List[int]): The item ids.
+
+    Returns:
+        List[Dict[str, Any]]: The items in the order of the ids, without deleted or dead ones.
+    """
+    items = _executor.map(get_item, item_ids)
+    return [item for item in items if item and not item.get("deleted") and not item.get("dead")]
+
+
+def get_story_ids(kind: str = "top") -> List[int]:
+    return list_cache.get_or_load(kind, lambda: _get(f"/{kind}stories.json"))
+
+
+def get_comment_trees(items: List[Dict[str, Any]], comments_per_item: int = 5, depth: int = 2) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Prefetch the top comments of several items breadth-first, one concurrent wave per level.
+
+    HackerNews lists the children of an item in ranking order, so the first `comments_per_item`
+    children of every item are its top comments.
+
+    Args:
+        items (List[Dict[str, Any]]): Stories or comments.
+        comments_per_item (int): Number of children to follow per item. Defaults to 5.
+        depth (int): Number of comment levels. Defaults to 2.
+
+    Returns:
+        Dict[int, List[Dict[str, Any]]]: For every item id, its comments with nested "replies".
+    """
+    roots = {item["id"]: [] for item in items}
+    frontier = [(item, roots[item["id"]]) for item in items]
+    for level in range(depth):
+        wanted = [(kid, replies) for item, replies in frontier for kid in item.get("kids", [])[:comments_per_item]]
+        if not wanted:
+            break
+        log_debug(f"Fetching {len(wanted)} HackerNews comments at depth {level + 1}")
+        comments = _executor.map(get_item, [kid for kid, _ in wanted])
+        frontier = []
+        for (_, replies), comment in zip(wanted, comments):
+            if not comment or comment.get("deleted") or comment.get("dead"):
+                continue
+            node = {"id": comment["id"], "by": comment.get("by"), "text": comment.get("text", ""), "replies": []}
+            replies.append(node)
+            frontier.append((comment, node["replies"]))
+    return roots
+
+
+def _story(story: Dict[str, Any], now: float) -> Dict[str, Any]:
+    age_hours = max((now - story.get("time", now)) / 3600, 1 / 60)
+    return {
+        **story,
+        "username": story.get("by"),
+        "age_hours": round(age_hours, 2),
+        "points_per_hour": round(story.get("score", 0) / age_hours, 2),
+    }
+
+
+class ConcurrentHackerNewsTools(HackerNewsTools):
+    """
+    HackerNewsTools that fetch items concurrently over a pooled client and cache them.
+
+    Adds `get_new_hackernews_stories` and `get_story_comments`, which walks the top comments of
+    several stories breadth-first, so the front page with its top comments takes a few parallel
+    waves instead of hundreds of sequential requests.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.register(self.get_new_hackernews_stories)
+        self.register(self.get_story_comments)
+
+    def _stories(self, kind: str, num_stories: int) -> str:
+        log_debug(f"Getting {num_stories} {kind} stories from Hacker News")
+        now = time.time()
+        stories = get_items(get_story_ids(kind)[:num_stories])
+        return json.dumps([_story(story, now) for story in stories])
+
+    def get_top_hackernews_stories(self, num_stories: int = 10) -> str:
+        """Use this function to get top stories from Hacker News.
+
+        Args:
+            num_stories (int): Number of stories to return. Defaults to 10.
+
+        Returns:
+            str: JSON string of top stories.
+        """
+        return self._stories("top", num_stories)
+
+    def get_new_hackernews_stories(self, num_stories: int = 10) -> str:
+        """Use this function to get the newest stories from Hacker News.
+
+        Args:
+            num_stories (int): Number of stories to return. Defaults to 10.
+
+        Returns:
+            str: JSON string of new stories, with their age in hours and points per hour.
+        """
+        return self._stories("new", num_stories)
+
+    def get_story_comments(self, story_ids: List[int], comments_per_item: int = 5, depth: int = 2) -> str:
+        """Use this function to get the top comments of one or more Hacker News stories at once.
+
+        Args:
+            story_ids (List[int]): Ids of the stories.
+            comments_per_item (int): Number of top comments per story, and of top replies per comment. Defaults to 5.
+            depth (int): Number of comment levels, 1 for top-level comments only. Defaults to 2.
+
+        Returns:
+            str: JSON string mapping every story id to its top comments with nested replies.
+        """
+        stories = get_items(story_ids)
+        return json.dumps(get_comment_trees(stories, comments_per_item=comments_per_item, depth=depth))
+
+    def get_user_details(self, username: str) -> str:
+        """Use this function to get the details of a Hacker News user using their username.
+
+        Args:
+            username (str): Username of the user to get details for.
+
+        Returns:
+            str: JSON string of the user details.
+        """
+        try:
+            log_debug(f"Getting details for user: {username}")
+            user = item_cache.get_or_load(("user", username), lambda: _get(f"/user/{username}.json")) or {}
+            user_details = {
+                "id": user.get("id"),
+                "karma": user.get("karma"),
+                "about": user.get("about"),
+                "total_items_submitted": len(user.get("submitted", [])),
+            }
+            return json.dumps(user_details)
+        except Exception as e:
+            return f"Error getting user details: {e}"
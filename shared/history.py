@@ -0,0 +1,197 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from copy import deepcopy
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from agno.memory.v2.memory import Memory
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.utils.log import log_debug, logger
+
+# Token budgets of the history, per message class, and the size above which a single tool result is compacted
+DEFAULT_BUDGETS = {"system": 2_000, "user": 1_500, "assistant": 3_000, "tool": 1_500}
+TOOL_RESULT_TOKENS = 300
+
+SUMMARY_PROMPT = """Summarize this result of the `{tool_name}` tool in at most {words} words.
+Keep the key figures, names and conclusions. Reply with the summary only.
+
+{content}"""
+
+
+def estimate_tokens(text: str) -> int:
+    # About 4 characters per token, good enough to enforce budgets
+    return len(text) // 4 + 1
+
+
+def _text(message: Message) -> str:
+    if isinstance(message.content, str):
+        return message.content
+    return json.dumps(message.content, default=str) if message.content is not None else ""
+
+
+class PayloadStore:
+    """
+    SQLite store of full tool results and their summaries, keyed by the hash of the result.
+    """
+
+    def __init__(self, db_file: str = "tmp/agent.db", table_name: str = "tool_payloads"):
+        """
+        Args:
+            db_file (str): SQLite database file. Defaults to the shared agent database.
+            table_name (str): Table holding the payloads.
+        """
+        self.table_name = table_name
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name} (
+                ref TEXT PRIMARY KEY,
+                tool_name TEXT,
+                content TEXT NOT NULL,
+                summary TEXT
+            )"""
+        )
+        self.connection.commit()
+
+    def put(self, tool_name: Optional[str], content: str) -> str:
+        ref = hashlib.sha256(content.encode()).hexdigest()[:16]
+        with self._lock:
+            self.connection.execute(
+                f"INSERT OR IGNORE INTO {self.table_name} (ref, tool_name, content) VALUES (?, ?, ?)",
+                (ref, tool_name, content),
+            )
+            self.connection.commit()
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        with self._lock:
+            row = self.connection.execute(f"SELECT content FROM {self.table_name} WHERE ref = ?", (ref,)).fetchone()
+        return row[0] if row else None
+
+    def get_summary(self, ref: str) -> Optional[str]:
+        with self._lock:
+            row = self.connection.execute(f"SELECT summary FROM {self.table_name} WHERE ref = ?", (ref,)).fetchone()
+        return row[0] if row else None
+
+    def set_summary(self, ref: str, summary: str) -> None:
+        with self._lock:
+            self.connection.execute(f"UPDATE {self.table_name} SET summary = ? WHERE ref = ?", (summary, ref))
+            self.connection.commit()
+
+
+class CompactingMemory(Memory):
+    """
+    Memory whose history messages are compacted before they are replayed to the model.
+
+    Tool results larger than `tool_result_tokens` are replaced with a summary and a reference;
+    the full result stays retrievable with the tool from `get_payload_tool`. Summaries are made
+    once per result (by the summarizer model when given, else from the start of the result) and
+    cached. The history then has to fit a token budget per message class: walking back from the
+    latest message, messages over their class budget are reduced to a one-line reference, so the
+    prompt stays the same size however verbose earlier tool outputs were. Stored runs are left
+    untouched.
+
+    Args:
+        payload_store (PayloadStore, optional): Store of the full tool results. Defaults to a PayloadStore in the shared agent database.
+        budgets (Dict[str, int], optional): Token budget of the history per role ("system", "user", "assistant", "tool").
+        tool_result_tokens (int): Tool results above this many tokens are compacted. Defaults to 300.
+        summarizer (Model, optional): Model used to summarize compacted tool results.
+        summary_words (int): Maximum length of a summary in words. Defaults to 60.
+        **kwargs: Passed through to Memory.
+    """
+
+    def __init__(
+        self,
+        payload_store: Optional[PayloadStore] = None,
+        budgets: Optional[Dict[str, int]] = None,
+        tool_result_tokens: int = TOOL_RESULT_TOKENS,
+        summarizer: Optional[Model] = None,
+        summary_words: int = 60,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.payload_store = payload_store or PayloadStore()
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.tool_result_tokens = tool_result_tokens
+        self.summarizer = summarizer
+        self.summary_words = summary_words
+
+    def _summarize(self, ref: str, tool_name: Optional[str], content: str) -> str:
+        summary = self.payload_store.get_summary(ref)
+        if summary is not None:
+            return summary
+        summary = " ".join(content.split()[: self.summary_words]) + " ..."
+        if self.summarizer is not None:
+            prompt = SUMMARY_PROMPT.format(tool_name=tool_name, words=self.summary_words, content=content[:20_000])
+            try:
+                summary = (self.summarizer.response(messages=[Message(role="user", content=prompt)]).content or summary).strip()
+            except Exception as e:
+                logger.warning(f"Error summarizing tool result: {e}")
+        self.payload_store.set_summary(ref, summary)
+        return summary
+
+    def _reference(self, message: Message, text: str, summary: bool) -> str:
+        ref = self.payload_store.put(message.tool_name, text)
+        if message.role != "tool":
+            return f"[Earlier {message.role} message of {estimate_tokens(text)} tokens omitted, ref {ref}]"
+        if summary:
+            return (
+                f"[Compacted result of {message.tool_name}: {self._summarize(ref, message.tool_name, text)} "
+                f"Full result: get_tool_payload('{ref}')]"
+            )
+        return f"[Result of {message.tool_name} omitted, full result: get_tool_payload('{ref}')]"
+
+    def compact(self, messages: List[Message]) -> List[Message]:
+        """
+        Compact a list of history messages, returning copies.
+
+        Args:
+            messages (List[Message]): History messages, oldest first.
+
+        Returns:
+            List[Message]: The compacted messages.
+        """
+        compacted = [deepcopy(message) for message in messages]
+        used = {role: 0 for role in self.budgets}
+        for message in reversed(compacted):
+            text = _text(message)
+            if message.role == "tool" and estimate_tokens(text) > self.tool_result_tokens:
+                message.content = self._reference(message, text, summary=True)
+                text = message.content
+
+            budget = self.budgets.get(message.role)
+            if budget is None:
+                continue
+            tokens = estimate_tokens(text)
+            # A system message is never dropped, the latest messages of each class are kept first
+            if used[message.role] + tokens > budget and message.role != "system":
+                message.content = self._reference(message, _text(message), summary=False)
+                tokens = estimate_tokens(message.content)
+            used[message.role] += tokens
+        log_debug(f"History tokens per class after compaction: {used}")
+        return compacted
+
+    def get_messages_from_last_n_runs(self, *args, **kwargs) -> List[Message]:
+        return self.compact(super().get_messages_from_last_n_runs(*args, **kwargs))
+
+    def get_payload_tool(self) -> Callable[[str], str]:
+        """Tool to read the full content of a compacted history message."""
+        payload_store = self.payload_store
+
+        def get_tool_payload(ref: str) -> str:
+            """Use this function to read the full result of an earlier tool call that was compacted in the chat history.
+
+            Args:
+                ref (str): The reference given in the compacted message.
+
+            Returns:
+                str: The full tool result.
+            """
+            content = payload_store.get(ref)
+            return content if content is not None else f"No payload found for reference: {ref}"
+
+        return get_tool_payload
@@ -0,0 +1,172 @@
+import importlib.util
+import threading
+from dataclasses import dataclass
+from os import getenv
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+import httpx
+from agno.models.google import Gemini
+from agno.utils.log import log_debug, log_error
+from google import genai
+from google.genai.types import HttpOptions, HttpRetryOptions
+
+from shared.concurrency import INTERACTIVE, ModelCallScheduler, model_scheduler
+
+# HTTP/2 multiplexes concurrent calls over one connection, it needs the optional `h2` package (pip install httpx[http2])
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+class GeminiClientRegistry:
+    """
+    Process-wide registry of Gemini API clients, one per set of credentials.
+
+    Every model using the same credentials shares one client, so its connection pool, TLS
+    sessions, auth and retry settings are reused by all agents and team members instead of
+    each model opening its own connections. `max_connections` caps the concurrent requests
+    per client, further calls wait for a free connection.
+
+    Args:
+        max_connections (int): Maximum number of concurrent connections per client. Defaults to 32.
+        max_keepalive_connections (int): Idle connections kept open per client. Defaults to 16.
+        timeout (float): Request timeout in seconds. Defaults to 120.
+        retry_attempts (int): Attempts per request, including the first one. Defaults to 3.
+        retry_status_codes (Sequence[int]): HTTP status codes retried by the client. Overloads (429, 503) are left to
+            the shared ModelCallScheduler, which retries them in coordination with the other calls.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        timeout: float = 120,
+        retry_attempts: int = 3,
+        retry_status_codes: Sequence[int] = (408, 500, 502, 504),
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.timeout = timeout
+        self.retry_attempts = retry_attempts
+        self.retry_status_codes = list(retry_status_codes)
+        self._clients: Dict[Hashable, genai.Client] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings: Any) -> None:
+        """Change the settings, e.g. `max_connections`. Clients created afterwards use them."""
+        with self._lock:
+            for name, value in settings.items():
+                if not hasattr(self, name) or name.startswith("_"):
+                    raise ValueError(f"Unknown client setting: {name}")
+                setattr(self, name, value)
+            self._clients.clear()
+
+    def _http_options(self) -> HttpOptions:
+        client_args = {
+            "http2": HTTP2,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive_connections
+            ),
+        }
+        return HttpOptions(
+            # The Gemini API expects the timeout in milliseconds
+            timeout=int(self.timeout * 1000),
+            client_args=client_args,
+            async_client_args=dict(client_args),
+            retry_options=HttpRetryOptions(attempts=self.retry_attempts, http_status_codes=self.retry_status_codes),
+        )
+
+    def get(
+        self,
+        api_key: Optional[str] = None,
+        vertexai: bool = False,
+        project: Optional[str] = None,
+        location: Optional[str] = None,
+        **client_params: Any,
+    ) -> genai.Client:
+        """
+        Shared client for the credentials, created on first use.
+
+        Args:
+            api_key (str, optional): Gemini API key, for the Gemini API.
+            vertexai (bool): Use Vertex AI. Defaults to False.
+            project (str, optional): Google Cloud project, for Vertex AI.
+            location (str, optional): Google Cloud location, for Vertex AI.
+            **client_params: Other genai.Client arguments.
+
+        Returns:
+            genai.Client: The shared client.
+        """
+        params: Dict[str, Any] = {"api_key": api_key}
+        if vertexai:
+            params = {"vertexai": True, "project": project, "location": location}
+        params = {key: value for key, value in {**params, **client_params}.items() if value is not None}
+        key = tuple(sorted((name, repr(value)) for name, value in params.items()))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                log_debug(f"Creating shared Gemini client (HTTP/2: {HTTP2}, max connections: {self.max_connections})")
+                params.setdefault("http_options", self._http_options())
+                client = self._clients[key] = genai.Client(**params)
+            return client
+
+
+gemini_clients = GeminiClientRegistry()
+
+
+@dataclass
+class PooledGemini(Gemini):
+    """
+    Gemini that takes its client from the shared registry instead of creating its own, and runs
+    its calls through the shared ModelCallScheduler. Set `priority` to BACKGROUND for memory and
+    summarization models, so interactive turns are admitted first.
+    """
+
+    priority: int = INTERACTIVE
+    scheduler: Optional[ModelCallScheduler] = model_scheduler
+
+    def get_client(self) -> genai.Client:
+        # A client passed explicitly is used as is
+        if self.client:
+            return self.client
+
+        vertexai = self.vertexai or getenv("GOOGLE_GENAI_USE_VERTEXAI", "false").lower() == "true"
+        if not vertexai:
+            self.api_key = self.api_key or getenv("GOOGLE_API_KEY")
+            if not self.api_key:
+                log_error("GOOGLE_API_KEY not set. Please set the GOOGLE_API_KEY environment variable.")
+            return gemini_clients.get(api_key=self.api_key, **(self.client_params or {}))
+        return gemini_clients.get(
+            vertexai=True,
+            project=self.project_id or getenv("GOOGLE_CLOUD_PROJECT"),
+            location=self.location or getenv("GOOGLE_CLOUD_LOCATION"),
+            **(self.client_params or {}),
+        )
+
+    def invoke(self, *args, **kwargs):
+        if self.scheduler is None:
+            return super().invoke(*args, **kwargs)
+        return self.scheduler.call(self.id, lambda: super(PooledGemini, self).invoke(*args, **kwargs), self.priority)
+
+    async def ainvoke(self, *args, **kwargs):
+        if self.scheduler is None:
+            return await super().ainvoke(*args, **kwargs)
+        return await self.scheduler.acall(
+            self.id, lambda: super(PooledGemini, self).ainvoke(*args, **kwargs), self.priority
+        )
+
+    def invoke_stream(self, *args, **kwargs):
+        if self.scheduler is None:
+            yield from super().invoke_stream(*args, **kwargs)
+            return
+        yield from self.scheduler.stream(
+            self.id, lambda: super(PooledGemini, self).invoke_stream(*args, **kwargs), self.priority
+        )
+
+    async def ainvoke_stream(self, *args, **kwargs):
+        if self.scheduler is None:
+            async for chunk in super().ainvoke_stream(*args, **kwargs):
+                yield chunk
+            return
+        async for chunk in self.scheduler.astream(
+            self.id, lambda: super(PooledGemini, self).ainvoke_stream(*args, **kwargs), self.priority
+        ):
+            yield chunk
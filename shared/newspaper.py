@@ -0,0 +1,157 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import httpx
+import newspaper
+from agno.tools.newspaper4k import Newspaper4kTools
+from agno.utils.log import log_debug, logger
+
+from shared.caching import TTLCache
+
+# Extracted articles keyed by URL and extraction options, shared by every agent in the process
+article_cache = TTLCache(ttl=24 * 60 * 60, max_size=512)
+
+# Pooled HTTP client used for every download
+http_client = httpx.Client(
+    headers={"User-Agent": "Mozilla/5.0 (compatible; AgentBot/1.0)"},
+    follow_redirects=True,
+    timeout=15,
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+)
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # Forked workers don't re-import the running script, spawned ones would run its setup again
+            fork = "fork" in multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork") if fork else None
+            _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+        return _parse_pool
+
+
+def _parse_article(url: str, html: str, include_summary: bool) -> Optional[Dict[str, Any]]:
+    # Runs in a worker process, parsing is CPU-bound
+    try:
+        article = newspaper.Article(url)
+        article.download(input_html=html)
+        article.parse()
+        article_data: Dict[str, Any] = {}
+        if article.title:
+            article_data["title"] = article.title
+        if article.authors:
+            article_data["authors"] = article.authors
+        if article.text:
+            article_data["text"] = article.text
+        if include_summary:
+            article.nlp()
+            if article.summary:
+                article_data["summary"] = article.summary
+        if article.publish_date:
+            article_data["publish_date"] = article.publish_date.isoformat()
+        return article_data
+    except Exception:
+        return None
+
+
+class BatchNewspaper4kTools(Newspaper4kTools):
+    """
+    Newspaper4kTools that can read several articles at once.
+
+    `read_articles` downloads every URL concurrently over a pooled HTTP client and parses the pages
+    in a process pool, so reading ten articles takes about as long as the slowest one. Extracted
+    articles are kept in a cache shared with `read_article`, keyed by URL and `include_summary`.
+
+    Args:
+        read_articles (bool): Whether to read several articles from a list of URLs.
+        cache (TTLCache, optional): Article cache. Defaults to the process-wide `article_cache`.
+        **kwargs: Passed through to Newspaper4kTools.
+    """
+
+    def __init__(self, read_articles: bool = True, cache: Optional[TTLCache] = None, **kwargs):
+        self.cache = cache or article_cache
+        if read_articles:
+            kwargs.setdefault(
+                "instructions", "To read several articles, pass all of their URLs to `read_articles` in a single call."
+            )
+            kwargs.setdefault("add_instructions", True)
+        super().__init__(**kwargs)
+        if read_articles:
+            self.register(self.read_articles)
+
+    def _download(self, url: str) -> Optional[str]:
+        try:
+            response = http_client.get(url)
+            response.raise_for_status()
+            return response.text
+        except httpx.HTTPError as e:
+            logger.warning(f"Error downloading article from {url}: {e}")
+            return None
+
+    def _key(self, url: str) -> tuple:
+        # Articles extracted without a summary don't answer a request for one
+        return (url, self.include_summary)
+
+    def _load_articles(self, urls: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        articles: Dict[str, Optional[Dict[str, Any]]] = {url: self.cache.get(self._key(url)) for url in urls}
+        missing = [url for url, article in articles.items() if article is None]
+        if not missing:
+            return articles
+
+        log_debug(f"Downloading {len(missing)} articles")
+        with ThreadPoolExecutor(max_workers=min(len(missing), 20)) as executor:
+            pages = list(executor.map(self._download, missing))
+
+        downloaded = [(url, html) for url, html in zip(missing, pages) if html is not None]
+        pool = _get_parse_pool()
+        futures = [(url, pool.submit(_parse_article, url, html, self.include_summary)) for url, html in downloaded]
+        for url, future in futures:
+            article = future.result()
+            if article:
+                self.cache.set(self._key(url), article)
+            articles[url] = article
+        return articles
+
+    def _format(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        if self.article_length and "text" in article:
+            return {**article, "text": article["text"][: self.article_length]}
+        return article
+
+    def get_article_data(self, url: str) -> Optional[Dict[str, Any]]:
+        """Read and get article data from a URL.
+
+        Args:
+            url (str): The URL of the article.
+
+        Returns:
+            Dict[str, Any]: The article data.
+        """
+        article = self._load_articles([url])[url]
+        # A copy, the inherited read_article truncates the text in place and the cached article is shared
+        return dict(article) if article is not None else None
+
+    def read_articles(self, urls: List[str]) -> str:
+        """Use this function to read several articles at once.
+
+        Args:
+            urls (List[str]): The URLs of the articles.
+
+        Returns:
+            str: JSON mapping each URL to the article author, publish date, and text, or to an error.
+        """
+        articles = self._load_articles(list(dict.fromkeys(urls)))
+        return json.dumps(
+            {
+                url: self._format(article) if article else {"error": f"Error reading article from {url}: No data found."}
+                for url, article in articles.items()
+            },
+            indent=2,
+        )
@@ -0,0 +1,216 @@
+import io
+import json
+import threading
+from os import getenv
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from xml.etree import ElementTree
+
+import arxiv
+import httpx
+from agno.tools.arxiv import ArxivTools
+from agno.tools.pubmed import PubmedTools
+from agno.utils.log import log_debug, logger
+from pypdf import PdfReader
+
+from shared.caching import TTLCache
+from shared.rate_limit import TokenBucket
+
+# NCBI E-utilities allow 3 requests per second, or 10 with an API key
+NCBI_API_KEY = getenv("NCBI_API_KEY")
+ncbi_rate_limiter = TokenBucket(rate=10 if NCBI_API_KEY else 3, capacity=1)
+
+# arXiv asks for no more than one request every 3 seconds
+arxiv_rate_limiter = TokenBucket(rate=1 / 3, capacity=1)
+# One client for the whole process, so its built-in request spacing covers every agent
+arxiv_client = arxiv.Client(delay_seconds=3, num_retries=3)
+_arxiv_lock = threading.Lock()
+
+http_client = httpx.Client(follow_redirects=True, timeout=60)
+
+# Search results keyed by query, the papers themselves are cached on disk
+search_cache = TTLCache(ttl=24 * 60 * 60, max_size=1024)
+
+PAPERS_CACHE_DIR = Path("tmp/papers_cache")
+# PubMed allows up to 200 ids per efetch request over GET
+EFETCH_BATCH_SIZE = 200
+
+
+def _paper_file(provider: str, paper_id: str) -> Path:
+    return PAPERS_CACHE_DIR / provider / f"{paper_id.replace('/', '_')}.json"
+
+
+def _read_paper(provider: str, paper_id: str) -> Optional[Dict[str, Any]]:
+    paper_file = _paper_file(provider, paper_id)
+    return json.loads(paper_file.read_text()) if paper_file.exists() else None
+
+
+def _write_paper(provider: str, paper_id: str, paper: Dict[str, Any]) -> None:
+    paper_file = _paper_file(provider, paper_id)
+    paper_file.parent.mkdir(parents=True, exist_ok=True)
+    paper_file.write_text(json.dumps(paper))
+
+
+def _ncbi_get(endpoint: str, params: Dict[str, Any]) -> bytes:
+    if NCBI_API_KEY:
+        params = {**params, "api_key": NCBI_API_KEY}
+    ncbi_rate_limiter.acquire()
+    response = http_client.get(f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/{endpoint}", params=params)
+    response.raise_for_status()
+    return response.content
+
+
+class CachedPubmedTools(PubmedTools):
+    """
+    PubmedTools that stay within the NCBI request rate and cache abstracts locally.
+
+    Search results are cached per query. Article records are stored on disk by PMID, and only
+    the PMIDs that aren't cached yet are fetched, in batched efetch requests.
+    """
+
+    def fetch_pubmed_ids(self, query: str, max_results: int, email: str) -> List[str]:
+        def search() -> List[str]:
+            params = {"db": "pubmed", "term": query, "retmax": max_results, "email": email}
+            root = ElementTree.fromstring(_ncbi_get("esearch.fcgi", params))
+            return [id_elem.text for id_elem in root.findall(".//Id") if id_elem.text is not None]
+
+        return search_cache.get_or_load(("pubmed", " ".join(query.lower().split()), max_results), search)
+
+    def fetch_details(self, pubmed_ids: List[str]) -> ElementTree.Element:
+        records: Dict[str, str] = {}
+        for pmid in pubmed_ids:
+            cached = _read_paper("pubmed", pmid)
+            if cached is not None:
+                records[pmid] = cached["xml"]
+
+        missing = [pmid for pmid in pubmed_ids if pmid not in records]
+        for start in range(0, len(missing), EFETCH_BATCH_SIZE):
+            batch = missing[start : start + EFETCH_BATCH_SIZE]
+            log_debug(f"Fetching {len(batch)} PubMed records")
+            params = {"db": "pubmed", "id": ",".join(batch), "retmode": "xml", "email": self.email}
+            for article in ElementTree.fromstring(_ncbi_get("efetch.fcgi", params)).findall(".//PubmedArticle"):
+                pmid = article.findtext(".//PMID")
+                if pmid:
+                    records[pmid] = ElementTree.tostring(article, encoding="unicode")
+                    _write_paper("pubmed", pmid, {"xml": records[pmid]})
+
+        # Rebuild an efetch-like document in the order of the search results
+        root = ElementTree.Element("PubmedArticleSet")
+        for pmid in pubmed_ids:
+            if pmid in records:
+                root.append(ElementTree.fromstring(records[pmid]))
+        return root
+
+
+def _arxiv_article(result: arxiv.Result) -> Dict[str, Any]:
+    return {
+        "title": result.title,
+        "id": result.get_short_id(),
+        "entry_id": result.entry_id,
+        "authors": [author.name for author in result.authors],
+        "primary_category": result.primary_category,
+        "categories": result.categories,
+        "published": result.published.isoformat() if result.published else None,
+        "pdf_url": result.pdf_url,
+        "links": [link.href for link in result.links],
+        "summary": result.summary,
+        "comment": result.comment,
+    }
+
+
+class CachedArxivTools(ArxivTools):
+    """
+    ArxivTools that share one paced client and cache papers locally.
+
+    Every instance goes through the same arXiv client and rate limiter. Paper metadata and the
+    extracted PDF text are stored on disk by arXiv id, and `read_arxiv_papers` looks up all
+    uncached ids in a single `id_list` query.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.client = arxiv_client
+
+    def _results(self, search: arxiv.Search) -> List[arxiv.Result]:
+        with _arxiv_lock:
+            return list(self.client.results(search=search))
+
+    def search_arxiv_and_return_articles(self, query: str, num_articles: int = 10) -> str:
+        """Use this function to search arXiv for a query and return the top articles.
+
+        Args:
+            query (str): The query to search arXiv for.
+            num_articles (int, optional): The number of articles to return. Defaults to 10.
+        Returns:
+            str: A JSON of the articles with title, id, authors, pdf_url and summary.
+        """
+
+        def search() -> List[Dict[str, Any]]:
+            log_debug(f"Searching arxiv for: {query}")
+            articles = []
+            for result in self._results(
+                arxiv.Search(
+                    query=query,
+                    max_results=num_articles,
+                    sort_by=arxiv.SortCriterion.Relevance,
+                    sort_order=arxiv.SortOrder.Descending,
+                )
+            ):
+                article = _arxiv_article(result)
+                if _read_paper("arxiv", article["id"]) is None:
+                    _write_paper("arxiv", article["id"], article)
+                articles.append(article)
+            return articles
+
+        articles = search_cache.get_or_load(("arxiv", " ".join(query.lower().split()), num_articles), search)
+        return json.dumps(articles, indent=4)
+
+    def _read_pdf(self, pdf_url: str) -> List[Dict[str, Any]]:
+        log_debug(f"Downloading: {pdf_url}")
+        arxiv_rate_limiter.acquire()
+        response = http_client.get(pdf_url)
+        response.raise_for_status()
+        pdf_reader = PdfReader(io.BytesIO(response.content))
+        return [{"page": number, "text": page.extract_text()} for number, page in enumerate(pdf_reader.pages, start=1)]
+
+    def read_arxiv_papers(self, id_list: List[str], pages_to_read: Optional[int] = None) -> str:
+        """Use this function to read a list of arxiv papers and return the content.
+
+        Args:
+            id_list (list, str): The list of `id` of the papers to add to the knowledge base.
+                    Should be of the format: ["2103.03404v1", "2103.03404v2"]
+            pages_to_read (int, optional): The number of pages to read from the paper.
+                    None means read all pages. Defaults to None.
+        Returns:
+            str: JSON of the papers.
+        """
+        papers: Dict[str, Dict[str, Any]] = {}
+        for paper_id in id_list:
+            cached = _read_paper("arxiv", paper_id)
+            if cached is not None:
+                papers[paper_id] = cached
+
+        # One id_list query for the metadata of every uncached paper
+        missing = [paper_id for paper_id in id_list if paper_id not in papers]
+        if missing:
+            log_debug(f"Searching arxiv for: {missing}")
+            for result in self._results(arxiv.Search(id_list=missing)):
+                article = _arxiv_article(result)
+                requested = next((paper_id for paper_id in missing if article["id"].startswith(paper_id)), article["id"])
+                papers[requested] = article
+
+        articles = []
+        for paper_id in id_list:
+            article = papers.get(paper_id)
+            if article is None:
+                continue
+            try:
+                if "content" not in article and article.get("pdf_url"):
+                    article["content"] = self._read_pdf(article["pdf_url"])
+                    _write_paper("arxiv", paper_id, article)
+            except Exception as e:
+                logger.error(f"Error processing article: {e}")
+            if pages_to_read and "content" in article:
+                article = {**article, "content": article["content"][:pages_to_read]}
+            articles.append(article)
+        return json.dumps(articles, indent=4)
@@ -0,0 +1,213 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+
+from agno.models.google import Gemini
+from agno.models.message import Message
+from agno.utils.gemini import format_function_definitions
+from agno.utils.log import log_debug, log_info, logger
+from google.genai.types import CreateCachedContentConfig, GenerateContentConfig
+from pydantic import BaseModel
+
+from shared.caching import TTLCache
+from shared.model_clients import PooledGemini
+
+# Formatted tool declarations, keyed by the digest of the tool definitions
+tool_declarations_cache = TTLCache(ttl=24 * 3600, max_size=256)
+
+# Settings that make the system message change between runs, it is rebuilt every time when one is on
+DYNAMIC_PROMPT_SETTINGS = (
+    "add_datetime_to_instructions",
+    "add_location_to_instructions",
+    "add_state_in_messages",
+    "add_memory_references",
+    "add_session_summary_references",
+    "enable_agentic_memory",
+    "enable_agentic_context",
+    # These change the output, knowledge and filter instructions of the system message
+    "response_model",
+    "enable_agentic_knowledge_filters",
+    "add_references",
+)
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ContextCache(ABC):
+    """
+    Registry of provider-side caches of static prompt prefixes (system instruction and tools).
+
+    Each distinct prefix is cached once per model and reused until shortly before its TTL runs
+    out. Prefixes shorter than `min_tokens` are not cached, as providers reject or do not
+    discount them. Subclasses implement `create` for a provider, or as a stub in tests.
+
+    Args:
+        ttl (int): Lifetime of a cached prefix in seconds. Defaults to 3600.
+        min_tokens (int): Smallest prefix to cache, in estimated tokens. Defaults to 4096.
+    """
+
+    def __init__(self, ttl: int = 3600, min_tokens: int = 4096):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        # Refresh a minute before the provider expires the cache
+        self.registry = TTLCache(ttl=max(ttl - 60, 1), max_size=1024)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "ContextCache":
+        # Copies of agents and models must keep sharing the registry
+        return self
+
+    @abstractmethod
+    def create(self, model: Gemini, system_instruction: str, tools: Optional[List[Any]]) -> str:
+        """
+        Create a provider-side cache of the prefix.
+
+        Args:
+            model (Gemini): The model the prefix is sent to.
+            system_instruction (str): The system instruction.
+            tools (List[Any], optional): The formatted tool declarations.
+
+        Returns:
+            str: The name of the cache, passed as `cached_content` in the requests.
+        """
+
+    def get_or_create(self, model: Gemini, system_instruction: str, tools: Optional[List[Any]], key: str) -> Optional[str]:
+        """
+        Name of the cache of the prefix, created on first use. None when the prefix is not cached.
+
+        Args:
+            model (Gemini): The model the prefix is sent to.
+            system_instruction (str): The system instruction.
+            tools (List[Any], optional): The formatted tool declarations.
+            key (str): Digest identifying the prefix.
+
+        Returns:
+            Optional[str]: The name of the cache.
+        """
+        size = len(system_instruction) + sum(len(str(tool)) for tool in tools or [])
+        if size // 4 < self.min_tokens:
+            return None
+
+        def load() -> Optional[str]:
+            try:
+                name = self.create(model, system_instruction, tools)
+                log_info(f"Cached prompt prefix of ~{size // 4} tokens as {name}")
+                return name
+            except Exception as e:
+                # Not retried before the entry expires, the prefix is sent in full meanwhile
+                logger.warning(f"Could not cache prompt prefix: {e}")
+                return None
+
+        return self.registry.get_or_load((model.id, key), load)
+
+
+class GeminiContextCache(ContextCache):
+    """ContextCache backed by the Gemini API context caching (`client.caches`)."""
+
+    def create(self, model: Gemini, system_instruction: str, tools: Optional[List[Any]]) -> str:
+        cache = model.get_client().caches.create(
+            model=model.id,
+            config=CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                tools=tools,
+                ttl=f"{self.ttl}s",
+                display_name=f"agno-prefix-{_digest(system_instruction, str(tools))[:12]}",
+            ),
+        )
+        return cache.name  # type: ignore
+
+
+# Shared by every PrefixCachingGemini, so agents with the same configuration share the cached prefix
+gemini_context_cache = GeminiContextCache()
+
+
+@dataclass
+class PrefixCachingGemini(PooledGemini):
+    """
+    Gemini that memoizes the tool declarations and sends static prompt prefixes from a context cache.
+
+    The tool declarations are formatted once per distinct tool set. When the system instruction
+    and tools are large enough, they are cached provider-side on first use and later requests
+    only reference the cache, so the static prefix is no longer processed and billed in full.
+    Set `context_cache` to None to only memoize, or to a stub ContextCache in tests. The client
+    comes from the shared registry, like PooledGemini.
+    """
+
+    context_cache: Optional[ContextCache] = gemini_context_cache
+
+    def get_request_params(
+        self,
+        system_message: Optional[str] = None,
+        response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        if not tools or self.grounding or self.search:
+            return super().get_request_params(system_message, response_format=response_format, tools=tools)
+
+        tools_key = _digest(tools)
+        declarations = [tool_declarations_cache.get_or_load(tools_key, lambda: format_function_definitions(tools))]
+        request_params = super().get_request_params(system_message, response_format=response_format, tools=None)
+        # Without any generation setting, the base model sends no config
+        config = request_params.get("config") or GenerateContentConfig()
+
+        cache_name = None
+        if self.context_cache is not None and system_message is not None and self.cached_content is None:
+            cache_name = self.context_cache.get_or_create(
+                self, system_message, declarations, key=_digest(system_message, tools_key)
+            )
+        if cache_name is not None:
+            # A request using a cache cannot set the system instruction or tools again
+            log_debug(f"Using cached prompt prefix {cache_name}")
+            request_params["config"] = config.model_copy(
+                update={"cached_content": cache_name, "system_instruction": None, "tools": None}
+            )
+        else:
+            request_params["config"] = config.model_copy(update={"tools": declarations})
+        return request_params
+
+
+def memoize_system_message(owner: Any) -> Any:
+    """
+    Build the system message of an agent or team once per configuration instead of on every run.
+
+    The message is rebuilt when the instructions, description, expected output, tools, name, role or
+    markdown setting change, and always when a setting that makes it dynamic (date, session state,
+    memories, response model, knowledge references or filters) is on.
+
+    Args:
+        owner (Agent or Team): The agent or team.
+
+    Returns:
+        The same agent or team.
+    """
+    build: Callable[..., Optional[Message]] = owner.get_system_message
+    messages: Dict[Any, Optional[Message]] = {}
+
+    def get_system_message(session_id: str, user_id: Optional[str] = None, **kwargs) -> Optional[Message]:
+        if any(kwargs.values()) or any(getattr(owner, setting, False) for setting in DYNAMIC_PROMPT_SETTINGS):
+            return build(session_id, user_id=user_id, **kwargs)
+
+        key = (
+            session_id,
+            user_id,
+            _digest(
+                owner.description,
+                owner.instructions if not callable(owner.instructions) else id(owner.instructions),
+                owner.expected_output,
+                owner.additional_context,
+                # Settings that add their own lines to the system message
+                [getattr(owner, setting, None) for setting in ("markdown", "role", "name", "add_name_to_instructions")],
+                [tool["function"]["name"] if isinstance(tool, dict) else str(tool) for tool in owner._tools_for_model or []],
+            ),
+        )
+        if key not in messages:
+            messages[key] = build(session_id, user_id=user_id, **kwargs)
+        message = messages[key]
+        # Runs store their messages, so each run gets its own copy
+        return message.model_copy() if message is not None else None
+
+    owner.get_system_message = get_system_message
+    return owner
@@ -0,0 +1,98 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple, Type, TypeVar
+
+from agno.utils.log import log_warning
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of `capacity` requests and `rate` requests per second on average.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float, optional): Maximum number of stored tokens. Defaults to `rate` (one second of burst).
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take `tokens` tokens if they are available, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` tokens are available, then take them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def _wait(self, tokens: float) -> float:
+        # Seconds to wait for the tokens, 0 once they are taken
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    async def aacquire(self, tokens: float = 1.0) -> None:
+        """Async version of `acquire`, waiting on the event loop instead of blocking a thread."""
+        while (wait := self._wait(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+
+def retry_with_backoff(
+    func: Callable[[], T],
+    retry_on: Tuple[Type[BaseException], ...],
+    max_retries: int = 4,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+) -> T:
+    """
+    Call `func`, retrying with exponential backoff and full jitter when it raises one of `retry_on`.
+
+    Args:
+        func (Callable[[], T]): The call to make.
+        retry_on (Tuple[Type[BaseException], ...]): Exceptions that trigger a retry, e.g. rate-limit errors.
+        max_retries (int): Maximum number of retries. Defaults to 4.
+        base_delay (float): Delay before the first retry in seconds. Defaults to 1.0.
+        max_delay (float): Upper bound of a single delay in seconds. Defaults to 30.0.
+
+    Returns:
+        T: The result of `func`.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except retry_on as e:
+            if attempt == max_retries:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            log_warning(f"{type(e).__name__}: retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from agno.agent import Agent
+from agno.exceptions import StopAgentRun
+from agno.team.team import Team
+from agno.tools.reasoning import ReasoningTools
+from agno.tools.thinking import ThinkingTools
+from agno.utils.log import log_debug
+
+from shared.history import estimate_tokens
+
+BUDGET_INSTRUCTIONS = """\
+Your reasoning is bounded to {max_steps} steps, {max_seconds:g} seconds and {max_tokens} tokens per request.
+When a reasoning tool tells you to answer, stop calling it and write the final answer right away."""
+
+
+@dataclass
+class _RunBudget:
+    started: float = field(default_factory=time.monotonic)
+    steps: int = 0
+    tokens: int = 0
+    # Set once the run was told to answer
+    exit_reason: Optional[str] = None
+    # Reasoning calls made after that
+    overruns: int = 0
+
+
+class ReasoningBudget:
+    """
+    Step, time and token budget of the reasoning steps of each run.
+
+    Args:
+        max_steps (int): Reasoning steps per run. Defaults to 6.
+        max_seconds (float): Seconds from the first reasoning step of a run. Defaults to 60.
+        max_tokens (int): Tokens of the thoughts written per run. Defaults to 3000.
+        confidence_threshold (float, optional): Confidence at which reasoning stops early. Defaults to 0.9.
+        max_overruns (int): Reasoning calls tolerated after the run was told to answer, the next one stops the
+            run. Defaults to 2.
+    """
+
+    def __init__(
+        self,
+        max_steps: int = 6,
+        max_seconds: float = 60,
+        max_tokens: int = 3000,
+        confidence_threshold: Optional[float] = 0.9,
+        max_overruns: int = 2,
+    ):
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.confidence_threshold = confidence_threshold
+        self.max_overruns = max_overruns
+        self._runs: "OrderedDict[str, _RunBudget]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def instructions(self) -> str:
+        return BUDGET_INSTRUCTIONS.format(
+            max_steps=self.max_steps, max_seconds=self.max_seconds, max_tokens=self.max_tokens
+        )
+
+    def _run(self, owner: Union[Agent, Team]) -> _RunBudget:
+        run_id = owner.run_id or ""
+        with self._lock:
+            if run_id not in self._runs:
+                self._runs[run_id] = _RunBudget()
+                # Only the budgets of recent runs are kept
+                while len(self._runs) > 64:
+                    self._runs.popitem(last=False)
+            return self._runs[run_id]
+
+    def step(
+        self, owner: Union[Agent, Team], text: str, confidence: Optional[float] = None, final: bool = False
+    ) -> str:
+        """
+        Record a reasoning step and tell the model whether to go on.
+
+        Args:
+            owner (Agent | Team): The agent or team reasoning.
+            text (str): Text written in the step.
+            confidence (float, optional): Confidence of the step.
+            final (bool): The model decided to give the final answer.
+
+        Returns:
+            str: Tool result, the remaining budget or an instruction to answer now.
+
+        Raises:
+            StopAgentRun: When the model keeps reasoning more than `max_overruns` times after it was told to answer.
+        """
+        run = self._run(owner)
+        if run.exit_reason is not None:
+            # The step is not recorded, the model already had its budget
+            run.overruns += 1
+            if run.overruns > self.max_overruns:
+                log_debug(f"Reasoning of run {owner.run_id} ignored {self.max_overruns} requests to answer")
+                raise StopAgentRun(
+                    f"Reasoning budget exceeded: {run.exit_reason}",
+                    agent_message=f"I stopped here because my reasoning budget is used up. {run.exit_reason}",
+                )
+            return f"{run.exit_reason} Do not call the reasoning tools again, write the final answer now."
+
+        run.steps += 1
+        run.tokens += estimate_tokens(text)
+        elapsed = time.monotonic() - run.started
+        confident = confidence is not None and self.confidence_threshold is not None
+        if final:
+            run.exit_reason = "Reasoning is complete."
+        elif confident and confidence >= self.confidence_threshold:
+            run.exit_reason = f"Confidence {confidence:g} reached the {self.confidence_threshold:g} threshold."
+        elif run.steps >= self.max_steps:
+            run.exit_reason = f"The reasoning budget of {self.max_steps} steps is used up."
+        elif elapsed >= self.max_seconds:
+            run.exit_reason = f"The reasoning budget of {self.max_seconds:g} seconds is used up."
+        elif run.tokens >= self.max_tokens:
+            run.exit_reason = f"The reasoning budget of {self.max_tokens} tokens is used up."
+
+        if run.exit_reason is not None:
+            log_debug(f"Reasoning of run {owner.run_id} stops after {run.steps} steps: {run.exit_reason}")
+            return f"Step {run.steps} recorded. {run.exit_reason} Write the final answer now."
+        return (
+            f"Step {run.steps} recorded. Budget left: {self.max_steps - run.steps} more step(s), "
+            f"{self.max_seconds - elapsed:.0f} seconds, {self.max_tokens - run.tokens} tokens."
+        )
+
+
+class BoundedReasoningTools(ReasoningTools):
+    """
+    ReasoningTools with a step, time and token budget per run and an early exit once a step reaches
+    `confidence_threshold` or `analyze` decides on the final answer.
+
+    Each step returns the remaining budget instead of the log of all previous steps, which the model
+    already has in its context, so a run of n steps costs n short tool results instead of O(n²) tokens.
+    The tools keep their names and arguments, so agno still streams the steps as reasoning events with
+    `stream_intermediate_steps=True`.
+
+    Args:
+        max_steps (int): `think` and `analyze` calls per run. Defaults to 6.
+        max_seconds (float): Seconds from the first step of a run. Defaults to 60.
+        max_tokens (int): Tokens of the thoughts and analyses per run. Defaults to 3000.
+        confidence_threshold (float, optional): Confidence at which reasoning stops. Defaults to 0.9.
+        max_overruns (int): Steps tolerated after the model was told to answer, the next one stops the run.
+            Defaults to 2.
+        **kwargs: ReasoningTools arguments.
+    """
+
+    def __init__(
+        self,
+        max_steps: int = 6,
+        max_seconds: float = 60,
+        max_tokens: int = 3000,
+        confidence_threshold: Optional[float] = 0.9,
+        max_overruns: int = 2,
+        **kwargs: Any,
+    ):
+        self.budget = ReasoningBudget(max_steps, max_seconds, max_tokens, confidence_threshold, max_overruns)
+        super().__init__(**kwargs)
+        self.instructions = f"{self.instructions}\n{self.budget.instructions}\n"
+
+    def think(
+        self, agent: Union[Agent, Team], title: str, thought: str, action: Optional[str] = None, confidence: float = 0.8
+    ) -> str:
+        """Use this tool as a scratchpad to reason about the question and work through it step-by-step.
+        This tool will help you break down complex problems into logical steps and track the reasoning process.
+        Your reasoning steps are limited; when this tool tells you to answer, write the final answer.
+        These internal thoughts are never revealed to the user.
+
+        Args:
+            title: A concise title for this step
+            thought: Your detailed thought for this step
+            action: What you'll do based on this thought
+            confidence: How confident you are about this thought (0.0 to 1.0)
+
+        Returns:
+            The remaining reasoning budget, or an instruction to answer now
+        """
+        log_debug(f"Thought about {title}")
+        return self.budget.step(agent, f"{title} {thought} {action or ''}", confidence)
+
+    def analyze(
+        self,
+        agent: Union[Agent, Team],
+        title: str,
+        result: str,
+        analysis: str,
+        next_action: str = "continue",
+        confidence: float = 0.8,
+    ) -> str:
+        """Use this tool to analyze results from a reasoning step and determine next actions.
+
+        Args:
+            title: A concise title for this analysis step
+            result: The outcome of the previous action
+            analysis: Your analysis of the results
+            next_action: What to do next ("continue", "validate", or "final_answer")
+            confidence: How confident you are in this analysis (0.0 to 1.0)
+
+        Returns:
+            The remaining reasoning budget, or an instruction to answer now
+        """
+        log_debug(f"Analyzed {title}")
+        final = next_action.lower() in ("final", "final_answer", "finalize")
+        return self.budget.step(agent, f"{title} {result} {analysis}", confidence, final=final)
+
+
+class BoundedThinkingTools(ThinkingTools):
+    """
+    ThinkingTools with a step, time and token budget per run.
+
+    Thoughts are kept per run rather than appended to the session state for the whole session,
+    and each call returns the remaining budget instead of the log of every previous thought.
+
+    Args:
+        max_steps (int): `think` calls per run. Defaults to 6.
+        max_seconds (float): Seconds from the first thought of a run. Defaults to 60.
+        max_tokens (int): Tokens of the thoughts per run. Defaults to 3000.
+        max_overruns (int): Thoughts tolerated after the model was told to answer, the next one stops the run.
+            Defaults to 2.
+        **kwargs: ThinkingTools arguments.
+    """
+
+    def __init__(
+        self, max_steps: int = 6, max_seconds: float = 60, max_tokens: int = 3000, max_overruns: int = 2, **kwargs: Any
+    ):
+        # Thoughts carry no confidence, so only the budget ends them
+        self.budget = ReasoningBudget(
+            max_steps, max_seconds, max_tokens, confidence_threshold=None, max_overruns=max_overruns
+        )
+        super().__init__(**kwargs)
+        self.instructions = f"{self.instructions}\n{self.budget.instructions}\n"
+
+    def think(self, agent: Union[Agent, Team], thought: str) -> str:
+        """Use the tool to think about something.
+        It will not obtain new information or take any actions, but just log the thought.
+        Use it when complex reasoning or a scratchpad is needed. Your thoughts are limited;
+        when this tool tells you to answer, write the final answer.
+
+        :param thought: A thought to think about and log.
+        :return: The remaining thinking budget, or an instruction to answer now.
+        """
+        log_debug(f"Thought: {thought}")
+        return self.budget.step(agent, thought)
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Set, Union
+
+from agno.agent import Agent
+from agno.embedder.base import Embedder
+from agno.memory.agent import AgentMemory
+from agno.memory.v2.memory import Memory
+from agno.run.response import (
+    RunResponse,
+    RunResponseCompletedEvent,
+    RunResponseContentEvent,
+    RunResponseEvent,
+    RunResponseStartedEvent,
+)
+from agno.tools.function import Function
+from agno.tools.toolkit import Toolkit
+from agno.utils.pprint import pprint_run_response
+from pydantic import BaseModel
+
+from shared.similarity import cosine_similarity
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _tool_names(agent: Agent) -> List[str]:
+    names: List[str] = []
+    for tool in agent.tools or []:
+        if isinstance(tool, Toolkit):
+            names.extend(tool.functions.keys())
+        elif isinstance(tool, Function):
+            names.append(tool.name)
+        elif callable(tool):
+            names.append(tool.__name__)
+        else:
+            names.append(str(tool))
+    return sorted(names)
+
+
+def _message_text(message: Union[str, BaseModel]) -> str:
+    if isinstance(message, BaseModel):
+        return message.model_dump_json()
+    return message.strip()
+
+
+# Tickers and acronyms, numbers and capitalized words within a sentence
+_ENTITY = re.compile(r"\b[A-Z][A-Z0-9.\-]+\b|\b\d[\d.,:/\-]*\b|(?<![.!?:]\s)(?<!^)\b[A-Z][a-z]+\b")
+
+
+def _entities(text: str) -> Set[str]:
+    """Names, tickers and numbers of a message, which a near match must share exactly."""
+    return {match.group().rstrip(".,") for match in _ENTITY.finditer(text.strip())}
+
+
+def _history(agent: Agent) -> List[List[str]]:
+    # The history agno adds to the next run of the session, so answers given in a conversation are not reused
+    # in another one
+    if not agent.add_history_to_messages:
+        return []
+    if agent.storage is not None and agent.session_id is not None:
+        agent.read_from_storage(session_id=agent.session_id)
+    messages = []
+    if isinstance(agent.memory, AgentMemory):
+        messages = agent.memory.get_messages_from_last_n_runs(
+            last_n=agent.num_history_runs, skip_role=agent.system_message_role
+        )
+    elif isinstance(agent.memory, Memory) and agent.session_id is not None:
+        messages = agent.memory.get_messages_from_last_n_runs(
+            session_id=agent.session_id, last_n=agent.num_history_runs, skip_role=agent.system_message_role
+        )
+    return [[message.role, message.get_content_string()] for message in messages]
+
+
+class ResponseCache:
+    """
+    Opt-in cache of final agent responses, stored in SQLite.
+
+    Entries are keyed by (model id, instructions hash, tools hash, session history, message). When an
+    embedder and a `semantic_threshold` are given, a message that is close enough to a cached message
+    for the same agent configuration and history is served from the cache as well, provided both
+    messages name the same entities (tickers, numbers, proper names): "Write a report on NVDA" and
+    "Write a report on AMD" embed almost identically but never match.
+    """
+
+    def __init__(
+        self,
+        db_file: str = "tmp/agent.db",
+        table_name: str = "response_cache",
+        ttl: int = 3600,
+        embedder: Optional[Embedder] = None,
+        semantic_threshold: Optional[float] = None,
+    ):
+        """
+        Args:
+            db_file (str): SQLite database file. Defaults to the shared agent database.
+            table_name (str): Table holding the cache entries.
+            ttl (int): Time-to-live of an entry in seconds. Defaults to 3600.
+            embedder (Embedder, optional): Embedder used for near-match lookups.
+            semantic_threshold (float, optional): Minimum cosine similarity for a near match, e.g. 0.95.
+        """
+        self.table_name = table_name
+        self.ttl = ttl
+        self.embedder = embedder
+        self.semantic_threshold = semantic_threshold
+
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name} (
+                key TEXT PRIMARY KEY,
+                config_hash TEXT NOT NULL,
+                message TEXT NOT NULL,
+                embedding TEXT,
+                content TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self.connection.commit()
+
+    def config_hash(self, agent: Agent) -> str:
+        """Hash of everything besides the message that shapes the agent's answer."""
+        return _hash(
+            {
+                "model": agent.model.id if agent.model else None,
+                "instructions": _hash([agent.description, agent.instructions, agent.expected_output]),
+                "tools": _hash(_tool_names(agent)),
+                "history": _hash(_history(agent)),
+            }
+        )
+
+    def _use_semantic(self) -> bool:
+        return self.embedder is not None and self.semantic_threshold is not None
+
+    def get(self, agent: Agent, message: Union[str, BaseModel]) -> Optional[str]:
+        """
+        Look up a cached response for the message.
+
+        Args:
+            agent (Agent): The agent that would answer the message.
+            message (str | BaseModel): The user message.
+
+        Returns:
+            Optional[str]: The cached response content, or None on a miss.
+        """
+        config_hash = self.config_hash(agent)
+        text = _message_text(message)
+        now = time.time()
+
+        row = self.connection.execute(
+            f"SELECT content FROM {self.table_name} WHERE key = ? AND expires_at > ?",
+            (_hash([config_hash, text]), now),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        if not self._use_semantic():
+            return None
+
+        query, entities = self.embedder.get_embedding(text), _entities(text)
+        best_content, best_score = None, self.semantic_threshold
+        rows = self.connection.execute(
+            f"SELECT message, embedding, content FROM {self.table_name} WHERE config_hash = ? AND expires_at > ?",
+            (config_hash, now),
+        )
+        for cached_message, embedding, content in rows:
+            if embedding is None or _entities(cached_message) != entities:
+                continue
+            score = cosine_similarity(query, json.loads(embedding))
+            if score >= best_score:
+                best_content, best_score = content, score
+        return best_content
+
+    def set(self, agent: Agent, message: Union[str, BaseModel], content: str, ttl: Optional[int] = None) -> None:
+        """
+        Store the response for the message.
+
+        Args:
+            agent (Agent): The agent that answered the message.
+            message (str | BaseModel): The user message.
+            content (str): The final response content.
+            ttl (int, optional): Overrides the default time-to-live in seconds.
+        """
+        config_hash = self.config_hash(agent)
+        text = _message_text(message)
+        embedding = json.dumps(self.embedder.get_embedding(text)) if self._use_semantic() else None
+        self.connection.execute(
+            f"INSERT OR REPLACE INTO {self.table_name} VALUES (?, ?, ?, ?, ?, ?)",
+            (_hash([config_hash, text]), config_hash, text, embedding, content, time.time() + (ttl or self.ttl)),
+        )
+        self.connection.commit()
+
+    def invalidate(self, agent: Optional[Agent] = None, message: Optional[Union[str, BaseModel]] = None) -> int:
+        """
+        Remove cache entries, plus every expired entry.
+
+        Args:
+            agent (Agent, optional): Only remove entries for this agent's configuration.
+            message (str | BaseModel, optional): Only remove the entry for this message (requires `agent`).
+
+        Returns:
+            int: Number of removed entries.
+        """
+        if agent is not None and message is not None:
+            where, params = "key = ?", (_hash([self.config_hash(agent), _message_text(message)]),)
+        elif agent is not None:
+            where, params = "config_hash = ?", (self.config_hash(agent),)
+        else:
+            where, params = "1 = 1", ()
+        cursor = self.connection.execute(
+            f"DELETE FROM {self.table_name} WHERE {where} OR expires_at <= ?", (*params, time.time())
+        )
+        self.connection.commit()
+        return cursor.rowcount
+
+    def _replay(self, agent: Agent, content: str, stream_intermediate_steps: bool = False) -> Iterator[RunResponseEvent]:
+        # Replays a cached response with the same events a streamed run emits
+        agent_id, agent_name = agent.agent_id or "", agent.name or ""
+        if stream_intermediate_steps:
+            yield RunResponseStartedEvent(
+                agent_id=agent_id,
+                agent_name=agent_name,
+                model=agent.model.id if agent.model else "",
+                model_provider=agent.model.provider if agent.model else "",
+            )
+        for line in content.splitlines(keepends=True):
+            yield RunResponseContentEvent(agent_id=agent_id, agent_name=agent_name, content=line)
+        if stream_intermediate_steps:
+            yield RunResponseCompletedEvent(agent_id=agent_id, agent_name=agent_name, content=content)
+
+    def _run_and_store(self, agent: Agent, message: Union[str, BaseModel], **kwargs: Any) -> Iterator[RunResponseEvent]:
+        content = ""
+        for event in agent.run(message, stream=True, **kwargs):
+            if isinstance(event, RunResponseContentEvent) and isinstance(event.content, str):
+                content += event.content
+            yield event
+        if content:
+            self.set(agent, message, content)
+
+    def run(
+        self, agent: Agent, message: Union[str, BaseModel], stream: bool = False, **kwargs: Any
+    ) -> Union[RunResponse, Iterator[RunResponseEvent]]:
+        """
+        Drop-in replacement for `agent.run(...)` that serves repeated messages from the cache.
+
+        Args:
+            agent (Agent): The agent to run on a cache miss.
+            message (str | BaseModel): The user message.
+            stream (bool): Stream the response as run events. Defaults to False.
+            **kwargs: Passed through to `agent.run`.
+
+        Returns:
+            RunResponse | Iterator[RunResponseEvent]: Same as `agent.run`.
+        """
+        cached = self.get(agent, message)
+        if stream:
+            if cached is None:
+                return self._run_and_store(agent, message, **kwargs)
+            stream_intermediate_steps = kwargs.get("stream_intermediate_steps", agent.stream_intermediate_steps)
+            return self._replay(agent, cached, stream_intermediate_steps=stream_intermediate_steps)
+
+        if cached is not None:
+            return RunResponse(
+                content=cached,
+                agent_id=agent.agent_id,
+                agent_name=agent.name,
+                model=agent.model.id if agent.model else None,
+                model_provider=agent.model.provider if agent.model else None,
+            )
+        response = agent.run(message, stream=False, **kwargs)
+        if isinstance(response.content, str):
+            self.set(agent, message, response.content)
+        return response
+
+    def print_response(self, agent: Agent, message: Union[str, BaseModel], stream: bool = False, **kwargs: Any) -> None:
+        """
+        Drop-in replacement for `agent.print_response(...)` that serves repeated messages from the cache.
+
+        Args:
+            agent (Agent): The agent to run on a cache miss.
+            message (str | BaseModel): The user message.
+            stream (bool): Stream the response. Defaults to False.
+            **kwargs: Passed through to `agent.print_response`.
+        """
+        cached = self.get(agent, message)
+        if cached is not None:
+            response = self._replay(agent, cached) if stream else RunResponse(content=cached)
+            pprint_run_response(response, markdown=kwargs.get("markdown", agent.markdown))
+            return
+
+        agent.print_response(message, stream=stream, **kwargs)
+        if agent.run_response is not None and isinstance(agent.run_response.content, str):
+            self.set(agent, message, agent.run_response.content)
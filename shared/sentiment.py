@@ -0,0 +1,199 @@
+import json
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from agno.utils.log import log_warning
+
+# Small social media lexicon, weights in [-3, 3]
+LEXICON: Dict[str, float] = {
+    # Positive
+    "love": 3, "loving": 3, "loved": 3, "awesome": 3, "amazing": 3, "excellent": 3, "fantastic": 3,
+    "incredible": 3, "brilliant": 3, "outstanding": 3, "perfect": 3, "best": 3, "wow": 2, "great": 2,
+    "good": 2, "nice": 2, "cool": 2, "impressive": 2, "impressed": 2, "beautiful": 2, "clean": 1,
+    "fast": 2, "faster": 2, "easy": 2, "easier": 2, "simple": 1, "powerful": 2, "smooth": 2,
+    "recommend": 2, "recommended": 2, "thanks": 2, "thank": 2, "helpful": 2, "useful": 2, "solid": 2,
+    "reliable": 2, "stable": 1, "happy": 2, "excited": 2, "exciting": 2, "fun": 2, "win": 2, "wins": 2,
+    "works": 1, "worked": 1, "favorite": 2, "elegant": 2, "underrated": 1, "game-changer": 3,
+    "gamechanger": 3, "kudos": 2, "congrats": 2, "🔥": 2, "🚀": 2, "❤️": 3, "😍": 3, "👏": 2, "🙌": 2,
+    # Negative
+    "hate": -3, "hated": -3, "awful": -3, "terrible": -3, "horrible": -3, "worst": -3, "useless": -3,
+    "garbage": -3, "trash": -3, "scam": -3, "bad": -2, "poor": -2, "slow": -2, "slower": -2,
+    "broken": -2, "bug": -2, "bugs": -2, "buggy": -2, "crash": -2, "crashes": -2, "crashed": -2,
+    "error": -1, "errors": -1, "fail": -2, "fails": -2, "failed": -2, "failing": -2, "issue": -1,
+    "issues": -1, "problem": -1, "problems": -1, "annoying": -2, "frustrating": -2, "frustrated": -2,
+    "disappointed": -2, "disappointing": -2, "confusing": -2, "confused": -1, "expensive": -1,
+    "overpriced": -2, "hard": -1, "difficult": -1, "complicated": -1, "unstable": -2, "unusable": -3,
+    "sucks": -3, "meh": -1, "outage": -2, "down": -1, "lag": -1, "laggy": -2, "waste": -2, "😡": -3,
+    "😠": -2, "👎": -2, "😞": -2, "🤮": -3,
+}
+NEGATORS = {"not", "no", "never", "isn't", "isnt", "doesn't", "doesnt", "don't", "dont", "can't", "cant", "won't", "wont", "wasn't", "wasnt", "hardly"}
+INTENSIFIERS = {"very": 1.5, "really": 1.5, "so": 1.3, "super": 1.5, "extremely": 1.8, "totally": 1.3, "absolutely": 1.5}
+
+TOKEN_PATTERN = r"[a-z][a-z'\-]*|[\U0001F300-\U0001FAFF❤️]+"
+
+
+def lexicon_scores(texts: pd.Series) -> pd.DataFrame:
+    """
+    Score a batch of texts against the lexicon, vectorized over all the tokens of the batch.
+
+    A sentiment word right after a negator is flipped and right after an intensifier is boosted.
+
+    Args:
+        texts (pd.Series): The texts to score.
+
+    Returns:
+        pd.DataFrame: For every text, the normalized `score` in [-1, 1] and its `positive` and `negative` hits.
+    """
+    tokens = texts.fillna("").str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    previous = tokens.groupby(level=0).shift(1)
+
+    weights = tokens.map(LEXICON).astype(float)
+    weights = weights.where(~previous.isin(NEGATORS), -weights)
+    weights = weights * previous.map(INTENSIFIERS).fillna(1.0)
+
+    hits = pd.DataFrame({"weight": weights.dropna()})
+    grouped = hits.groupby(level=0)["weight"]
+    result = pd.DataFrame(index=texts.index)
+    result["positive"] = (hits["weight"] > 0).groupby(level=0).sum().reindex(texts.index, fill_value=0).astype(int)
+    result["negative"] = (hits["weight"] < 0).groupby(level=0).sum().reindex(texts.index, fill_value=0).astype(int)
+    total = grouped.sum().reindex(texts.index, fill_value=0.0)
+    # Same normalization as VADER, so the score saturates instead of growing with the text length
+    result["score"] = total / np.sqrt(total**2 + 15)
+    return result
+
+
+def prescore(
+    posts: pd.DataFrame,
+    threshold: float = 0.35,
+    engagement_quantile: float = 0.9,
+    max_review: int = 25,
+) -> pd.DataFrame:
+    """
+    Label clear-cut posts locally and pick the few that need the model's judgement.
+
+    Posts with hits on one side only and a score beyond the threshold are labeled Positive or
+    Negative, posts without any sentiment words Neutral. Posts with both positive and negative
+    hits or a weak score are ambiguous. Ambiguous and high-engagement posts are routed to the
+    model, at most `max_review` of them by engagement, so the model's share shrinks as the
+    volume grows. Ambiguous posts beyond `max_review` stay unresolved and are flagged `unreviewed`.
+
+    Args:
+        posts (pd.DataFrame): Posts with a `text` column, and an `engagement` column to prioritize the review.
+        threshold (float): Minimum absolute score for a local label. Defaults to 0.35.
+        engagement_quantile (float): Posts with engagement at or above this quantile are always reviewed.
+            Defaults to 0.9.
+        max_review (int): Maximum number of posts routed to the model. Defaults to 25.
+
+    Returns:
+        pd.DataFrame: The posts with `sentiment_score`, `sentiment` (None when unresolved), `review` and
+            `unreviewed` columns.
+    """
+    scores = lexicon_scores(posts["text"])
+    mixed = (scores["positive"] > 0) & (scores["negative"] > 0)
+    no_hits = (scores["positive"] == 0) & (scores["negative"] == 0)
+    clear = ~mixed & (scores["score"].abs() >= threshold)
+
+    sentiment = pd.Series(None, index=posts.index, dtype=object)
+    sentiment[clear & (scores["score"] > 0)] = "Positive"
+    sentiment[clear & (scores["score"] < 0)] = "Negative"
+    sentiment[no_hits] = "Neutral"
+
+    engagement = posts["engagement"] if "engagement" in posts else pd.Series(0, index=posts.index)
+    # Without any engagement the quantile is 0, which would make every post high-engagement
+    high_engagement = (engagement > 0) & (engagement >= engagement.quantile(engagement_quantile))
+    candidates = sentiment.isna() | high_engagement
+    review = pd.Series(False, index=posts.index)
+    review[engagement[candidates].sort_values(ascending=False).head(max_review).index] = True
+
+    unreviewed = sentiment.isna() & ~review
+    if unreviewed.any():
+        log_warning(f"{int(unreviewed.sum())} ambiguous posts left unresolved beyond max_review={max_review}")
+    return posts.assign(
+        sentiment_score=scores["score"].round(3), sentiment=sentiment, review=review, unreviewed=unreviewed
+    )
+
+
+def sentiment_summary(scored: pd.DataFrame, max_text: int = 280) -> Dict[str, object]:
+    """
+    Summarize prescored posts for the model.
+
+    Args:
+        scored (pd.DataFrame): The output of `prescore`.
+        max_text (int): Maximum characters of text per reviewed post. Defaults to 280.
+
+    Returns:
+        Dict[str, object]: Label counts, the routed share, the unresolved posts left unreviewed and the posts
+            to classify.
+    """
+    counts = scored["sentiment"].fillna("Unresolved").value_counts().to_dict()
+    columns = [column for column in ("id", "url", "text", "engagement", "sentiment_score", "sentiment") if column in scored]
+    to_review = scored[scored["review"]][columns].rename(columns={"sentiment": "local_label"})
+    to_review = to_review.assign(text=to_review["text"].str.slice(0, max_text))
+    return {
+        "local_labels": {label: int(count) for label, count in counts.items()},
+        "routed_to_model": int(scored["review"].sum()),
+        "routed_share": round(float(scored["review"].mean()), 4) if len(scored) else 0.0,
+        # Ambiguous posts beyond max_review, neither labeled locally nor classified by the model
+        "unresolved_unreviewed": int(scored["unreviewed"].sum()) if "unreviewed" in scored else 0,
+        "posts_to_classify": json.loads(to_review.to_json(orient="records")),
+    }
+
+
+def benchmark(sizes=(1_000, 10_000, 100_000), max_review: int = 25, seed: Optional[int] = 0) -> pd.DataFrame:
+    """
+    Measure the prescoring throughput, its agreement with gold labels and the share of posts routed to the model
+    on synthetic posts.
+
+    Args:
+        sizes (tuple): Numbers of posts per run.
+        max_review (int): Maximum number of posts routed to the model. Defaults to 25.
+        seed (int, optional): Random seed of the synthetic posts.
+
+    Returns:
+        pd.DataFrame: Per size, the locally labeled posts per second, the share of local labels agreeing with
+            the gold label of their template, the routed share and the share left neither labeled nor reviewed.
+    """
+    rng = np.random.default_rng(seed)
+    # Synthetic posts and their gold labels, mixed posts are Neutral
+    templates = [
+        ("I love how fast agno is, really impressive", "Positive"),
+        ("Agno keeps crashing, this is so frustrating", "Negative"),
+        ("Just tried agno for a new project", "Neutral"),
+        ("agno is great but the docs are confusing", "Neutral"),
+        ("not bad at all, the new release works", "Positive"),
+        ("worst onboarding ever, totally broken", "Negative"),
+        ("Anyone using agno with Gemini?", "Neutral"),
+        ("the agent api is amazing 🚀", "Positive"),
+    ]
+    texts = np.array([text for text, _ in templates])
+    gold_labels = np.array([label for _, label in templates], dtype=object)
+    rows = []
+    for size in sizes:
+        picks = rng.integers(0, len(templates), size)
+        posts = pd.DataFrame({"text": texts[picks], "engagement": rng.pareto(1.5, size) * 10})
+        gold = pd.Series(gold_labels[picks], index=posts.index)
+        start = time.perf_counter()
+        scored = prescore(posts, max_review=max_review)
+        elapsed = time.perf_counter() - start
+        labeled = int(scored["sentiment"].notna().sum())
+        agreed = int((scored["sentiment"] == gold).sum())
+        rows.append(
+            {
+                "posts": size,
+                "seconds": round(elapsed, 4),
+                "labels_per_second": round(labeled / elapsed),
+                "agreed_labels_per_second": round(agreed / elapsed),
+                "agreement": round(agreed / labeled, 4) if labeled else 0.0,
+                "locally_labeled_share": round(labeled / size, 4),
+                "routed_to_model": int(scored["review"].sum()),
+                "routed_share": round(float(scored["review"].mean()), 5),
+                "unresolved_unreviewed_share": round(float(scored["unreviewed"].mean()), 4),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string(index=False))
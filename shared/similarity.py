@@ -0,0 +1,9 @@
+import math
+from typing import List
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    """Cosine similarity of two embeddings, 0.0 if either of them is empty."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
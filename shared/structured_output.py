@@ -0,0 +1,271 @@
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+import pydantic_core
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+from agno.utils.log import log_debug, log_warning
+from google.genai.types import Candidate, Content, GenerateContentResponse, Part
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
+
+from shared.model_clients import PooledGemini
+
+REPAIR_PROMPT = """The JSON below was generated for the `{model}` schema, but these fields are invalid:
+{errors}
+
+Return only the corrected fields ({fields}), consistent with the rest of the JSON and the request.
+
+{content}"""
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+# Models of the fields re-asked by a repair, whose responses are not partial results of the response
+_fields_models: Set[Type[BaseModel]] = set()
+
+
+@lru_cache(maxsize=None)
+def validator(response_model: Type[BaseModel]) -> TypeAdapter:
+    """Validator of a response model, compiled once per class."""
+    return TypeAdapter(response_model)
+
+
+@lru_cache(maxsize=None)
+def fields_model(response_model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Model with only some top-level fields of a response model, built once per class and set of fields."""
+    definitions = {
+        name: (info.annotation, info) for name, info in response_model.model_fields.items() if name in fields
+    }
+    model = create_model(f"{response_model.__name__}Fields", __doc__=response_model.__doc__, **definitions)
+    _fields_models.add(model)
+    return model
+
+
+def parse_partial(text: str) -> Any:
+    """
+    Parse JSON that may be incomplete, e.g. a response being streamed: unclosed strings, objects and
+    arrays are closed and unfinished values dropped. Returns None when nothing can be parsed yet.
+    """
+    try:
+        return pydantic_core.from_json(_FENCE.sub("", text), allow_partial="trailing-strings")
+    except ValueError:
+        return None
+
+
+def parse_complete(text: str) -> Any:
+    """Parse a finished JSON response, None when it is not valid JSON (e.g. cut off)."""
+    try:
+        return json.loads(_FENCE.sub("", text))
+    except ValueError:
+        return None
+
+
+def field_errors(response_model: Type[BaseModel], content: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Validate a finished JSON response against its model.
+
+    A response that is not valid JSON, e.g. cut off by the output limit, is parsed as far as it goes: its last
+    value may be unfinished and the fields after it are missing, so those fields are invalid.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, str]]: The parsed valid fields, and the error of each invalid top-level field.
+    """
+    errors: Dict[str, str] = {}
+    cut_off: List[str] = []
+    data = parse_complete(content)
+    if data is None:
+        data = parse_partial(content)
+        data = data if isinstance(data, dict) else {}
+        cut_off = [*list(data)[-1:], *(name for name in response_model.model_fields if name not in data)]
+        errors = dict.fromkeys(cut_off, "unfinished or missing, the JSON response was cut off")
+        data = {name: value for name, value in data.items() if name not in errors}
+    elif not isinstance(data, dict):
+        data = {}
+    try:
+        validator(response_model).validate_python(data)
+    except ValidationError as e:
+        for error in e.errors():
+            location = error["loc"]
+            # Errors of the whole object (e.g. not an object) concern every field
+            names = [str(location[0])] if location else list(response_model.model_fields)
+            # Errors of nested values keep their path within the field
+            message = f"{'.'.join(map(str, location[1:]))}: {error['msg']}" if location[1:] else error["msg"]
+            for name in names:
+                if name in cut_off:
+                    continue
+                errors[name] = f"{errors[name]}; {message}" if name in errors else message
+    return data, errors
+
+
+@dataclass
+class StructuredGemini(PooledGemini):
+    """
+    Gemini for schema-constrained responses (`Agent(response_model=...)`, as the model or `parser_model`).
+
+    The response schema is sent natively. A response with invalid fields, or cut off, is not retried in full:
+    the model is asked again for the invalid, unfinished or missing top-level fields only, constrained to a
+    schema of just those fields, and the answers are merged, up to `max_repairs` times. With `on_partial`,
+    the response is streamed and its JSON parsed incrementally, `on_partial` receiving the object each time
+    it gains a value. Only `on_partial` sees partial JSON, finished responses are validated strictly.
+    """
+
+    max_repairs: int = 2
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    @staticmethod
+    def _structured(response_format: Any, tools: Any) -> bool:
+        # Gemini does not combine function calling with a response schema, so only tool-less calls are repaired
+        return isinstance(response_format, type) and issubclass(response_format, BaseModel) and not tools
+
+    def _streams_partials(self, response_format: Any, tools: Any) -> bool:
+        return (
+            self.on_partial is not None
+            and self._structured(response_format, tools)
+            and response_format not in _fields_models
+        )
+
+    def _repair_messages(
+        self, messages: List[Message], response_format: Type[BaseModel], content: str, errors: Dict[str, str]
+    ) -> List[Message]:
+        prompt = REPAIR_PROMPT.format(
+            model=response_format.__name__,
+            errors="\n".join(f"- {name}: {error}" for name, error in errors.items()),
+            fields=", ".join(errors),
+            content=content,
+        )
+        history = [message for message in messages if message.role != "assistant"]
+        return [*history, Message(role="assistant", content=content), Message(role="user", content=prompt)]
+
+    def _merge(self, data: Dict[str, Any], repaired: Any) -> Dict[str, Any]:
+        if isinstance(repaired, BaseModel):
+            repaired = repaired.model_dump(exclude_unset=True)
+        elif isinstance(repaired, str):
+            # A repair cut off is not merged, its fields stay invalid and are asked for again
+            repaired = parse_complete(repaired)
+        return {**data, **repaired} if isinstance(repaired, dict) else data
+
+    def repair(
+        self, messages: List[Message], response_format: Type[BaseModel], content: Optional[str]
+    ) -> Optional[str]:
+        """Re-ask for the invalid fields of a response until it validates, and return the merged JSON."""
+        if not isinstance(content, str):
+            return content
+        data, errors = field_errors(response_format, content)
+        for _ in range(self.max_repairs):
+            if not errors:
+                break
+            log_debug(f"Re-asking for the invalid fields of {response_format.__name__}: {list(errors)}")
+            repair_format = fields_model(response_format, tuple(sorted(errors)))
+            repaired = super().response(
+                messages=self._repair_messages(messages, response_format, content, errors),
+                response_format=repair_format,
+            )
+            data = self._merge(data, repaired.parsed or repaired.content)
+            content = json.dumps(data)
+            data, errors = field_errors(response_format, content)
+        if errors:
+            log_warning(f"{response_format.__name__} still has invalid fields: {errors}")
+        return content
+
+    async def arepair(
+        self, messages: List[Message], response_format: Type[BaseModel], content: Optional[str]
+    ) -> Optional[str]:
+        if not isinstance(content, str):
+            return content
+        data, errors = field_errors(response_format, content)
+        for _ in range(self.max_repairs):
+            if not errors:
+                break
+            log_debug(f"Re-asking for the invalid fields of {response_format.__name__}: {list(errors)}")
+            repair_format = fields_model(response_format, tuple(sorted(errors)))
+            repaired = await super().aresponse(
+                messages=self._repair_messages(messages, response_format, content, errors),
+                response_format=repair_format,
+            )
+            data = self._merge(data, repaired.parsed or repaired.content)
+            content = json.dumps(data)
+            data, errors = field_errors(response_format, content)
+        if errors:
+            log_warning(f"{response_format.__name__} still has invalid fields: {errors}")
+        return content
+
+    def _set_content(self, messages: List[Message], model_response: ModelResponse, content: Optional[str]) -> None:
+        if content != model_response.content:
+            model_response.content = content
+            model_response.parsed = None
+            # The assistant message of the response is kept in the history, it gets the repaired content too
+            if messages and messages[-1].role == "assistant":
+                messages[-1].content = content
+
+    def response(self, messages: List[Message], response_format: Any = None, tools: Any = None, **kwargs: Any):
+        model_response = super().response(messages, response_format=response_format, tools=tools, **kwargs)
+        if self._structured(response_format, tools):
+            self._set_content(messages, model_response, self.repair(messages, response_format, model_response.content))
+        return model_response
+
+    async def aresponse(self, messages: List[Message], response_format: Any = None, tools: Any = None, **kwargs: Any):
+        model_response = await super().aresponse(messages, response_format=response_format, tools=tools, **kwargs)
+        if self._structured(response_format, tools):
+            content = await self.arepair(messages, response_format, model_response.content)
+            self._set_content(messages, model_response, content)
+        return model_response
+
+    def response_stream(
+        self, messages: List[Message], response_format: Any = None, tools: Any = None, **kwargs: Any
+    ) -> Iterator[Any]:
+        # Responses are only whole, and so repairable, when agno does not stream the model response
+        whole = self._structured(response_format, tools) and kwargs.get("stream_model_response") is False
+        for event in super().response_stream(messages, response_format=response_format, tools=tools, **kwargs):
+            if whole and isinstance(event, ModelResponse) and isinstance(event.content, str) and event.content:
+                self._set_content(messages, event, self.repair(messages, response_format, event.content))
+            yield event
+
+    async def aresponse_stream(
+        self, messages: List[Message], response_format: Any = None, tools: Any = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        whole = self._structured(response_format, tools) and kwargs.get("stream_model_response") is False
+        async for event in super().aresponse_stream(
+            messages, response_format=response_format, tools=tools, **kwargs
+        ):
+            if whole and isinstance(event, ModelResponse) and isinstance(event.content, str) and event.content:
+                self._set_content(messages, event, await self.arepair(messages, response_format, event.content))
+            yield event
+
+    def _partial(self, text: str, previous: Any) -> Any:
+        partial = parse_partial(text)
+        if isinstance(partial, dict) and partial and partial != previous:
+            self.on_partial(partial)
+            return partial
+        return previous
+
+    def _combine(self, last_chunk: Any, text: str) -> Any:
+        # One response with the whole text and the usage of the last chunk, as a non-streamed call returns it
+        if last_chunk is None:
+            return GenerateContentResponse()
+        response = last_chunk.model_copy(deep=True)
+        content = Content(role="model", parts=[Part(text=text)])
+        if response.candidates:
+            response.candidates[0].content = content
+        else:
+            response.candidates = [Candidate(content=content)]
+        return response
+
+    def invoke(self, *args: Any, **kwargs: Any):
+        if not self._streams_partials(kwargs.get("response_format"), kwargs.get("tools")):
+            return super().invoke(*args, **kwargs)
+        text, last_chunk, previous = "", None, None
+        for chunk in super().invoke_stream(*args, **kwargs):
+            text, last_chunk = text + (chunk.text or ""), chunk
+            previous = self._partial(text, previous)
+        return self._combine(last_chunk, text)
+
+    async def ainvoke(self, *args: Any, **kwargs: Any):
+        if not self._streams_partials(kwargs.get("response_format"), kwargs.get("tools")):
+            return await super().ainvoke(*args, **kwargs)
+        text, last_chunk, previous = "", None, None
+        async for chunk in super().ainvoke_stream(*args, **kwargs):
+            text, last_chunk = text + (chunk.text or ""), chunk
+            previous = self._partial(text, previous)
+        return self._combine(last_chunk, text)
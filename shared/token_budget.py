@@ -0,0 +1,359 @@
+"""
+Token accounting per run, session and agent, stored in SQLite, and enforceable token budgets.
+
+    from shared.token_budget import TokenBudget, track
+    track(agent, TokenBudget(max_run_tokens=50_000, max_tool_result_tokens=2_000))
+
+    python -m shared.token_budget                 # tokens per agent, most expensive first
+    python -m shared.token_budget --session <id>  # tokens per agent in one session
+"""
+
+import argparse
+import functools
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from agno.exceptions import StopAgentRun
+from agno.models.message import Message
+from agno.utils.log import agent_logger, log_debug, log_warning, team_logger, workflow_logger
+
+from shared.history import estimate_tokens
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "tool_result_tokens", "history_tokens")
+
+
+class _SkippedAsyncHookFilter(logging.Filter):
+    # Sync runs skip the async budget hook by design, agno would warn about it on every tool call
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not record.getMessage().endswith("Skipping hook: ahook")
+
+
+for _logger in (agent_logger, team_logger, workflow_logger):
+    _logger.addFilter(_SkippedAsyncHookFilter())
+
+
+def run_usage(messages: List[Message]) -> Dict[str, int]:
+    """
+    Tokens of a run, from its messages.
+
+    Prompt and completion tokens are the ones reported by the model for each call of the run. Tool
+    result and history tokens estimate how much of the prompts the tool results of the run and the
+    replayed history take; each is counted once, though every later model call of the run resends them.
+    """
+    usage = dict.fromkeys(USAGE_FIELDS, 0)
+    for message in messages:
+        if message.from_history:
+            usage["history_tokens"] += estimate_tokens(message.get_content_string())
+        elif message.role == "assistant" and message.metrics is not None:
+            usage["prompt_tokens"] += message.metrics.input_tokens or 0
+            usage["completion_tokens"] += message.metrics.output_tokens or 0
+        elif message.role == "tool":
+            usage["tool_result_tokens"] += estimate_tokens(message.get_content_string())
+    return usage
+
+
+class TokenLedger:
+    """
+    SQLite table of the token usage of every run, with totals per session and per agent.
+
+    Args:
+        db_file (str): SQLite database file. Defaults to the shared agent database.
+        table_name (str): Table holding the usage. Defaults to "token_usage".
+    """
+
+    def __init__(self, db_file: str = "tmp/agent.db", table_name: str = "token_usage"):
+        self.db_file = db_file
+        self.table_name = table_name
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Opened on first use, so importing the module does not create the database
+        if self._connection is None:
+            Path(self.db_file).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._connection.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table_name} (
+                    run_id TEXT,
+                    session_id TEXT,
+                    user_id TEXT,
+                    agent TEXT NOT NULL,
+                    team TEXT,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    tool_result_tokens INTEGER NOT NULL,
+                    history_tokens INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table_name}_session ON {self.table_name} (session_id)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def record(
+        self,
+        agent: str,
+        usage: Dict[str, int],
+        run_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        team: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self.connection.execute(
+                f"INSERT INTO {self.table_name} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, session_id, user_id, agent, team, *(usage[name] for name in USAGE_FIELDS), time.time()),
+            )
+            self.connection.commit()
+
+    def session_tokens(self, session_id: str, agent: Optional[str] = None) -> int:
+        """Prompt and completion tokens of the recorded runs of a session, optionally of one agent."""
+        query = f"SELECT SUM(prompt_tokens + completion_tokens) FROM {self.table_name} WHERE session_id = ?"
+        params: List[Any] = [session_id]
+        if agent is not None:
+            query += " AND agent = ?"
+            params.append(agent)
+        with self._lock:
+            (total,) = self.connection.execute(query, params).fetchone()
+        return total or 0
+
+    def report(self, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Runs and tokens per agent (and team), optionally for one session, most expensive first."""
+        columns = ", ".join(f"SUM({name})" for name in USAGE_FIELDS)
+        query = f"SELECT agent, team, COUNT(*), {columns} FROM {self.table_name}"
+        params: List[Any] = []
+        if session_id is not None:
+            query += " WHERE session_id = ?"
+            params.append(session_id)
+        query += " GROUP BY agent, team ORDER BY SUM(prompt_tokens + completion_tokens) DESC"
+        with self._lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [dict(zip(("agent", "team", "runs", *USAGE_FIELDS), row)) for row in rows]
+
+
+token_ledger = TokenLedger()
+
+
+class TokenBudget:
+    """
+    Token budget of an agent, enforced by a tool hook on every tool call.
+
+    A tool call made once the run or the session has used up its tokens stops the run instead of
+    calling the tool, which ends the tool-calling loop. Tool results above `max_tool_result_tokens`
+    are truncated before they reach the model.
+
+    Args:
+        max_run_tokens (int, optional): Prompt and completion tokens allowed per run.
+        max_session_tokens (int, optional): Prompt and completion tokens allowed per session, runs of the
+            agent recorded in the ledger included.
+        max_tool_result_tokens (int, optional): Tokens kept of each tool result.
+        ledger (TokenLedger): Ledger of the recorded runs. Defaults to the shared ledger.
+    """
+
+    def __init__(
+        self,
+        max_run_tokens: Optional[int] = None,
+        max_session_tokens: Optional[int] = None,
+        max_tool_result_tokens: Optional[int] = None,
+        ledger: TokenLedger = token_ledger,
+    ):
+        self.max_run_tokens = max_run_tokens
+        self.max_session_tokens = max_session_tokens
+        self.max_tool_result_tokens = max_tool_result_tokens
+        self.ledger = ledger
+
+    def check(self, owner: Any) -> None:
+        """Raise StopAgentRun when the current run of the agent or team is over budget."""
+        run_messages = getattr(owner, "run_messages", None)
+        usage = run_usage(run_messages.messages if run_messages is not None else [])
+        used = usage["prompt_tokens"] + usage["completion_tokens"]
+        exceeded = None
+        if self.max_run_tokens is not None and used >= self.max_run_tokens:
+            exceeded = f"{used} tokens used in this run, the budget is {self.max_run_tokens}"
+        elif self.max_session_tokens is not None and owner.session_id is not None:
+            used += self.ledger.session_tokens(owner.session_id, agent=owner.name)
+            if used >= self.max_session_tokens:
+                exceeded = f"{used} tokens used in this session, the budget is {self.max_session_tokens}"
+        if exceeded:
+            log_warning(f"Token budget of {owner.name} exhausted: {exceeded}")
+            raise StopAgentRun(
+                f"Token budget exhausted: {exceeded}",
+                agent_message=f"I stopped here because my token budget is exhausted ({exceeded}).",
+            )
+
+    def truncate(self, function_name: str, result: Any) -> Any:
+        if self.max_tool_result_tokens is None or not isinstance(result, (str, dict, list)):
+            return result
+        text = result if isinstance(result, str) else json.dumps(result, default=str)
+        tokens = estimate_tokens(text)
+        if tokens <= self.max_tool_result_tokens:
+            return result
+        log_debug(f"Truncating the result of {function_name} from {tokens} to {self.max_tool_result_tokens} tokens")
+        # About 4 characters per token, as in estimate_tokens
+        kept = text[: self.max_tool_result_tokens * 4]
+        return f"{kept}\n[Truncated by the token budget: {self.max_tool_result_tokens} of {tokens} tokens shown]"
+
+    def hook(
+        self,
+        function_name: str,
+        function_call: Callable,
+        arguments: Dict[str, Any],
+        agent: Any = None,
+        team: Any = None,
+    ) -> Any:
+        """Tool hook of sync runs. In async runs it passes the call through, `ahook` enforces the budget."""
+        if inspect.iscoroutinefunction(function_call):
+            return function_call(**arguments)
+        owner = agent if agent is not None else team
+        if owner is not None:
+            self.check(owner)
+        return self.truncate(function_name, function_call(**arguments))
+
+    async def ahook(
+        self,
+        function_name: str,
+        function_call: Callable,
+        arguments: Dict[str, Any],
+        agent: Any = None,
+        team: Any = None,
+    ) -> Any:
+        """Tool hook of async runs, sync runs skip it."""
+        owner = agent if agent is not None else team
+        if owner is not None:
+            self.check(owner)
+        result = function_call(**arguments)
+        # In async runs, sync hooks further down the chain return their result unawaited
+        while inspect.isawaitable(result):
+            result = await result
+        return self.truncate(function_name, result)
+
+
+def _unnamed(owner: Any) -> List[Any]:
+    return ([] if owner.name else [owner]) + [
+        unnamed for member in getattr(owner, "members", None) or [] for unnamed in _unnamed(member)
+    ]
+
+
+def track(
+    owner: Any, budget: Optional[TokenBudget] = None, ledger: TokenLedger = token_ledger, team: Optional[str] = None
+) -> Any:
+    """
+    Record the token usage of every run of an agent or team in the ledger, and enforce a budget.
+    Team members are tracked too, each under its own name and with its own budget of the same size.
+    Usage is recorded per name, so the agent, the team and its members must all have one.
+
+    Args:
+        owner (Agent | Team): The agent or team to track.
+        budget (TokenBudget, optional): Budget enforced on the tool calls of each run.
+        ledger (TokenLedger): Ledger recording the runs. Defaults to the shared ledger.
+        team (str, optional): Name of the team the agent is a member of.
+
+    Returns:
+        Agent | Team: The tracked agent or team.
+
+    Raises:
+        ValueError: When the agent, the team or one of its members has no name.
+    """
+    unnamed = _unnamed(owner)
+    if unnamed:
+        # Generated ids change with every process, the usage of unnamed agents could not be added up
+        roles = ", ".join(repr((getattr(agent, "role", None) or type(agent).__name__)[:40]) for agent in unnamed)
+        raise ValueError(f"Tracked agents and teams need a name, missing for: {roles}")
+
+    def record(response: Any) -> None:
+        # The response the run returned, `owner.run_response` belongs to whichever run of the owner ended last
+        if response is None or not hasattr(response, "messages"):
+            return
+        usage = run_usage(response.messages or [])
+        ledger.record(owner.name, usage, response.run_id, response.session_id, getattr(owner, "user_id", None), team)
+        log_debug(f"Tokens of {owner.name} in run {response.run_id}: {usage}")
+
+    def streamed_response(event: Any) -> Any:
+        # Stream events carry no messages, the response of the run is kept in the owner's memory
+        if event is None:
+            return None
+        memory = getattr(owner, "memory", None)
+        if hasattr(memory, "get_runs"):
+            runs = memory.get_runs(event.session_id)
+        else:
+            runs = [getattr(run, "response", None) for run in getattr(memory, "runs", None) or []]
+        return next((run for run in reversed(runs) if run is not None and run.run_id == event.run_id), None)
+
+    def recorded_generator(generator: Any) -> Any:
+        last = None
+        for item in generator:
+            last = item if getattr(item, "run_id", None) else last
+            yield item
+        record(streamed_response(last))
+
+    async def recorded_async_generator(generator: Any) -> Any:
+        last = None
+        async for item in generator:
+            last = item if getattr(item, "run_id", None) else last
+            yield item
+        record(streamed_response(last))
+
+    # Streaming runs are recorded once their events are consumed
+    def wrap(run: Callable) -> Callable:
+        if inspect.iscoroutinefunction(run):
+
+            @functools.wraps(run)
+            async def arun(*args: Any, **kwargs: Any) -> Any:
+                result = await run(*args, **kwargs)
+                if inspect.isasyncgen(result):
+                    return recorded_async_generator(result)
+                record(result)
+                return result
+
+            return arun
+
+        @functools.wraps(run)
+        def sync_run(*args: Any, **kwargs: Any) -> Any:
+            result = run(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return recorded_generator(result)
+            record(result)
+            return result
+
+        return sync_run
+
+    owner.run = wrap(owner.run)
+    owner.arun = wrap(owner.arun)
+    if budget is not None:
+        # First hooks, so they also truncate what the other hooks return. agno skips the async one in sync
+        # runs and the sync one passes async calls through, so the hooks never change between runs
+        others = [hook for hook in owner.tool_hooks or [] if hook not in (budget.hook, budget.ahook)]
+        owner.tool_hooks = [budget.ahook, budget.hook, *others]
+    for member in getattr(owner, "members", None) or []:
+        track(member, budget, ledger, team=owner.name)
+    return owner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--session", help="Only the runs of this session")
+    parser.add_argument("--db-file", default="tmp/agent.db")
+    args = parser.parse_args()
+    rows = TokenLedger(args.db_file).report(args.session)
+    if not rows:
+        print("No runs recorded")
+        return
+    print(f"{'agent':<32}{'team':<24}{'runs':>6}{'prompt':>12}{'completion':>12}{'tool results':>14}{'history':>10}")
+    for row in rows:
+        print(
+            f"{row['agent'][:31]:<32}{(row['team'] or '')[:23]:<24}{row['runs']:>6}{row['prompt_tokens']:>12}"
+            f"{row['completion_tokens']:>12}{row['tool_result_tokens']:>14}{row['history_tokens']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
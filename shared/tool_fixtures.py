@@ -0,0 +1,59 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from agno.utils.log import log_debug
+
+from shared.fake_gemini import fake_text
+
+
+class ToolFixtures:
+    """
+    Recorded tool results, stored as one JSON file per tool and keyed by the call arguments.
+
+    In "record" mode the tools run and their results are saved; in "replay" mode the recorded
+    result is returned without running the tool, so agents can run offline and deterministically.
+    A call that was never recorded replays a deterministic placeholder of `missing_tokens` tokens.
+
+    Args:
+        fixtures_dir (str): Directory of the fixture files. Defaults to "tmp/tool_fixtures".
+        mode (str): "record" or "replay". Defaults to "replay".
+        missing_tokens (int): Size of the placeholder of unrecorded calls, in tokens. Defaults to 400.
+    """
+
+    def __init__(self, fixtures_dir: str = "tmp/tool_fixtures", mode: str = "replay", missing_tokens: int = 400):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        self.fixtures_dir = Path(fixtures_dir)
+        self.mode = mode
+        self.missing_tokens = missing_tokens
+        self._fixtures: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, function_name: str) -> Dict[str, str]:
+        if function_name not in self._fixtures:
+            path = self.fixtures_dir / f"{function_name}.json"
+            self._fixtures[function_name] = json.loads(path.read_text()) if path.exists() else {}
+        return self._fixtures[function_name]
+
+    def hook(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        """Tool hook to pass to `Agent(tool_hooks=[...])`."""
+        key = hashlib.sha256(json.dumps(arguments, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        with self._lock:
+            recorded: Optional[str] = self._load(function_name).get(key)
+        if self.mode == "replay":
+            if recorded is not None:
+                return recorded
+            log_debug(f"No fixture for {function_name}({arguments}), replaying a placeholder")
+            placeholder = {"fixture": "missing", "tool": function_name, "result": fake_text(self.missing_tokens, key)}
+            return json.dumps(placeholder)
+
+        result = function_call(**arguments)
+        with self._lock:
+            fixtures = self._load(function_name)
+            fixtures[key] = result if isinstance(result, str) else json.dumps(result, default=str)
+            self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+            (self.fixtures_dir / f"{function_name}.json").write_text(json.dumps(fixtures, indent=2))
+        return result
@@ -0,0 +1,36 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+# Worker threads used to enforce tool timeouts
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="tool-call")
+
+
+def tool_timeout_hook(default_timeout: float = 30, timeouts: Optional[Dict[str, float]] = None) -> Callable:
+    """
+    Build a tool hook that stops waiting for a tool call once its timeout is reached.
+
+    With `aprint_response`/`arun`, agno runs all the tool calls of a model turn concurrently
+    (sync tools in worker threads) and returns their results in order, so a single slow call
+    would otherwise hold back the whole turn.
+
+    Args:
+        default_timeout (float): Timeout in seconds for tools not listed in `timeouts`. Defaults to 30.
+        timeouts (Dict[str, float], optional): Per-tool timeouts in seconds, keyed by tool name.
+
+    Returns:
+        Callable: A hook to pass to `Agent(tool_hooks=[...])`.
+    """
+    timeouts = timeouts or {}
+
+    def hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        timeout = timeouts.get(function_name, default_timeout)
+        future = _executor.submit(function_call, **arguments)
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # The call keeps running in its worker thread, but the turn no longer waits for it
+            return json.dumps({"error": f"{function_name} timed out after {timeout} seconds."})
+
+    return hook
@@ -0,0 +1,87 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from agno.embedder.base import Embedder
+from agno.embedder.google import GeminiEmbedder
+from agno.tools.function import Function
+from agno.tools.toolkit import Toolkit
+
+from shared.similarity import cosine_similarity
+
+
+class ToolRouter:
+    """
+    Selects the tools relevant to a message so large toolsets don't bloat every prompt.
+
+    Every function of the given toolkits is serialized once into the declaration the model
+    would receive, and that declaration is embedded. The embeddings are cached on disk keyed
+    by a hash of the declaration and the embedder (class, model id and dimensions), so they are
+    only recomputed when a tool or the embedder changes.
+    """
+
+    def __init__(
+        self,
+        toolkits: List[Toolkit],
+        embedder: Optional[Embedder] = None,
+        top_k: int = 4,
+        cache_file: str = "tmp/tool_index.json",
+    ):
+        """
+        Args:
+            toolkits (List[Toolkit]): Toolkits whose functions should be routed.
+            embedder (Embedder, optional): Embedder for tool declarations and messages. Defaults to GeminiEmbedder.
+            top_k (int): Number of tools sent to the model per turn. Defaults to 4.
+            cache_file (str): JSON file holding the cached tool embeddings.
+        """
+        self.embedder = embedder or GeminiEmbedder()
+        self.top_k = top_k
+        self.cache_file = Path(cache_file)
+        self.functions: Dict[str, Function] = {}
+        self.declarations: Dict[str, str] = {}
+        self.embeddings: Dict[str, List[float]] = {}
+
+        for toolkit in toolkits:
+            for name, function in toolkit.functions.items():
+                # Parses the docstring and signature into the declaration sent to the model
+                function.process_entrypoint()
+                self.functions[name] = function
+                self.declarations[name] = json.dumps(function.to_dict(), sort_keys=True)
+
+        self._build_index()
+
+    def _build_index(self) -> None:
+        cache: Dict[str, List[float]] = {}
+        if self.cache_file.exists():
+            cache = json.loads(self.cache_file.read_text())
+
+        # Vectors of another embedding model or size must never be reused
+        embedder = [type(self.embedder).__name__, getattr(self.embedder, "id", None), self.embedder.dimensions]
+        for name, declaration in self.declarations.items():
+            key = hashlib.sha256(json.dumps([embedder, declaration]).encode()).hexdigest()
+            if key not in cache:
+                cache[key] = self.embedder.get_embedding(declaration)
+            self.embeddings[name] = cache[key]
+
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_file.write_text(json.dumps(cache))
+
+    def select(self, message: str, top_k: Optional[int] = None) -> List[Function]:
+        """
+        Return the functions whose declarations are closest to the message.
+
+        Args:
+            message (str): The user message for the upcoming turn.
+            top_k (int, optional): Overrides the number of tools to return.
+
+        Returns:
+            List[Function]: The selected functions, most relevant first.
+        """
+        query = self.embedder.get_embedding(message)
+        ranked = sorted(
+            self.functions,
+            key=lambda name: cosine_similarity(query, self.embeddings[name]),
+            reverse=True,
+        )
+        return [self.functions[name] for name in ranked[: top_k or self.top_k]]
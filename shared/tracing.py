@@ -0,0 +1,545 @@
+"""
+Per-run tracing of agents and teams, exported as OpenTelemetry (OTLP/JSON) traces.
+
+    from shared.tracing import instrument
+    instrument(team)  # every run writes tmp/traces/<trace id>.json
+
+    python -m shared.tracing                            # summarize the latest trace
+    python -m shared.tracing tmp/traces/<trace id>.json --top 15
+
+The summary shows the span tree, the critical path (the chain of spans that determined the run's
+duration, with the time each spent outside its children) and the total and self time per span name.
+"""
+
+import argparse
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from agno.utils.log import log_debug, log_warning
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            # SPAN_KIND_INTERNAL
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            # STATUS_CODE_OK or STATUS_CODE_ERROR
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Records nested spans and exports each trace when its root span ends.
+
+    The current span follows the run through threads' contexts and asyncio tasks, so spans opened while
+    another is current become its children. Spans started in threads of an executor start new traces.
+
+    Args:
+        directory (str, optional): Directory of the trace files. Defaults to "tmp/traces", None to disable them.
+        endpoint (str, optional): OTLP/HTTP traces endpoint, e.g. "http://localhost:4318/v1/traces".
+            Defaults to the OTEL_EXPORTER_OTLP_TRACES_ENDPOINT environment variable.
+        service_name (str): Service name of the exported resource. Defaults to "agno-agents".
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = "tmp/traces",
+        endpoint: Optional[str] = None,
+        service_name: str = "agno-agents",
+    ):
+        self.directory = Path(directory) if directory else None
+        self.endpoint = endpoint or os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+        self.service_name = service_name
+        self.last_trace_file: Optional[Path] = None
+        self._traces: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, name: str, **attributes: Any) -> Span:
+        """Start a span, child of the current span. End it with `end()`."""
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_span_id=parent.span_id if parent else None,
+            attributes={key: value for key, value in attributes.items() if value is not None},
+        )
+        with self._lock:
+            self._traces.setdefault(span.trace_id, []).append(span)
+        return span
+
+    def end(self, span: Span, error: Optional[BaseException] = None) -> None:
+        if error is not None and not isinstance(error, GeneratorExit):
+            span.error = f"{type(error).__name__}: {error}"
+        span.end_ns = time.time_ns()
+        if span.parent_span_id is None:
+            with self._lock:
+                spans = self._traces.pop(span.trace_id, [])
+            self.export(spans)
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        """Make a started span the current one."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Context manager recording a span around its block."""
+        span = self.start(name, **attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except BaseException as e:
+            self.end(span, e)
+            raise
+        self.end(span)
+
+    def trace_generator(self, span: Span, generator: Iterator, on_item: Optional[Callable] = None) -> Iterator:
+        """Keep `span` open until the generator is exhausted, current while the generator runs."""
+        error = None
+        try:
+            while True:
+                with self.activate(span):
+                    try:
+                        item = next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                if on_item is not None:
+                    on_item(span, item)
+                yield item
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # Closes a generator left unfinished by its consumer
+            generator.close()
+            self.end(span, error)
+
+    async def trace_async_generator(
+        self, span: Span, generator: AsyncIterator, on_item: Optional[Callable] = None
+    ) -> AsyncIterator:
+        error = None
+        try:
+            while True:
+                with self.activate(span):
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                if on_item is not None:
+                    on_item(span, item)
+                yield item
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if hasattr(generator, "aclose"):
+                await generator.aclose()
+            self.end(span, error)
+
+    def traced(
+        self,
+        name: str,
+        function: Callable,
+        attributes: Optional[Callable[..., Dict[str, Any]]] = None,
+        on_item: Optional[Callable[[Span, Any], None]] = None,
+    ) -> Callable:
+        """
+        Wrap a function in a span, for plain, generator, async and async generator functions and for
+        functions returning a generator (e.g. `Agent.run(stream=True)`), which keep the span open until
+        the generator is exhausted.
+
+        Args:
+            name (str): Span name.
+            function (Callable): The function to trace.
+            attributes (Callable, optional): Span attributes from the call arguments.
+            on_item (Callable, optional): Called with the span and each item of a generator or the result.
+
+        Returns:
+            Callable: The traced function.
+        """
+        tracer = self
+
+        def start(args: Any, kwargs: Any) -> Span:
+            return tracer.start(name, **(attributes(*args, **kwargs) if attributes else {}))
+
+        def finish(span: Span, result: Any) -> Any:
+            if inspect.isgenerator(result):
+                return tracer.trace_generator(span, result, on_item)
+            if inspect.isasyncgen(result):
+                return tracer.trace_async_generator(span, result, on_item)
+            if on_item is not None:
+                on_item(span, result)
+            tracer.end(span)
+            return result
+
+        if inspect.isasyncgenfunction(function):
+
+            @functools.wraps(function)
+            def async_generator_wrapper(*args: Any, **kwargs: Any) -> AsyncIterator:
+                return tracer.trace_async_generator(start(args, kwargs), function(*args, **kwargs), on_item)
+
+            return async_generator_wrapper
+
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                span = start(args, kwargs)
+                try:
+                    with tracer.activate(span):
+                        result = await function(*args, **kwargs)
+                except BaseException as e:
+                    tracer.end(span, e)
+                    raise
+                return finish(span, result)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            span = start(args, kwargs)
+            try:
+                with tracer.activate(span):
+                    result = function(*args, **kwargs)
+            except BaseException as e:
+                tracer.end(span, e)
+                raise
+            return finish(span, result)
+
+        return wrapper
+
+    def to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        resource = {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]}
+        scope_spans = [{"scope": {"name": "shared.tracing"}, "spans": [span.to_otlp() for span in spans]}]
+        return {"resourceSpans": [{"resource": resource, "scopeSpans": scope_spans}]}
+
+    def export(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        payload = self.to_otlp(spans)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{spans[0].trace_id}.json"
+            path.write_text(json.dumps(payload))
+            self.last_trace_file = path
+            log_debug(f"Trace written to {path}, summarize it with: python -m shared.tracing {path}")
+        if self.endpoint:
+            try:
+                httpx.post(self.endpoint, json=payload, timeout=10).raise_for_status()
+            except httpx.HTTPError as e:
+                log_warning(f"Could not export trace to {self.endpoint}: {e}")
+
+
+tracer = Tracer()
+
+
+def _usage(span: Span, response: Any) -> None:
+    # Gemini responses and stream chunks carry the usage so far
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        span.set_attribute("gen_ai.usage.input_tokens", getattr(usage, "prompt_token_count", None))
+        span.set_attribute("gen_ai.usage.output_tokens", getattr(usage, "candidates_token_count", None))
+
+
+def _first_chunk(span: Span, chunk: Any) -> None:
+    if "ttft_ms" not in span.attributes:
+        span.set_attribute("ttft_ms", round((time.time_ns() - span.start_ns) / 1e6, 1))
+    _usage(span, chunk)
+
+
+def _tool_name(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    # Called with or without the model as first argument, and the function call positional or by keyword
+    function_call = kwargs.get("function_call") or next(arg for arg in args if hasattr(arg, "function"))
+    return {"tool.name": function_call.function.name}
+
+
+def _session(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    return {"session.id": kwargs.get("session_id"), "user.id": kwargs.get("user_id")}
+
+
+# Methods traced on each component: method name -> (span name, attributes from the arguments, item/result callback)
+_TRACED_METHODS: Dict[str, Dict[str, tuple]] = {
+    **{
+        kind: {
+            "run": (f"{kind}.run", _session, None),
+            "arun": (f"{kind}.run", _session, None),
+            "get_system_message": ("prompt.system_message", None, None),
+            "get_run_messages": ("prompt.build", None, None),
+        }
+        for kind in ("agent", "team")
+    },
+    "model": {
+        "invoke": ("model.request", None, _usage),
+        "ainvoke": ("model.request", None, _usage),
+        "invoke_stream": ("model.request", None, _first_chunk),
+        "ainvoke_stream": ("model.request", None, _first_chunk),
+        "run_function_call": ("tool.call", _tool_name, None),
+        "arun_function_call": ("tool.call", _tool_name, None),
+    },
+    "knowledge": {
+        "search": ("knowledge.search", None, None),
+        "async_search": ("knowledge.search", None, None),
+    },
+    "vector_db": {
+        "search": ("vectordb.search", None, None),
+        "async_search": ("vectordb.search", None, None),
+        "vector_search": ("vectordb.ann", None, None),
+        "keyword_search": ("vectordb.keyword", None, None),
+        # Embedding, ANN and keyword search, then rank fusion
+        "hybrid_search": ("vectordb.fusion", None, None),
+    },
+    "embedder": {
+        "get_embedding": ("embedder.embed", None, None),
+        "get_embedding_and_usage": ("embedder.embed", None, None),
+    },
+    "storage": {
+        "read": ("storage.read", None, None),
+        "upsert": ("storage.write", None, None),
+    },
+    "memory": {
+        "update_memory_task": ("memory.update", None, None),
+        "aupdate_memory_task": ("memory.update", None, None),
+        "create_user_memories": ("memory.update", None, None),
+        "acreate_user_memories": ("memory.update", None, None),
+        "create_session_summary": ("memory.summary", None, None),
+        "acreate_session_summary": ("memory.summary", None, None),
+        "get_messages_from_last_n_runs": ("memory.history", None, None),
+        "add_run": ("memory.add_run", None, None),
+    },
+}
+
+_traced_classes: Dict[tuple, type] = {}
+
+
+def _instrument_object(obj: Any, component: str, tracer: Tracer, **attributes: Any) -> None:
+    if obj is None or type(obj) in _traced_classes.values():
+        return
+    methods = {name: spec for name, spec in _TRACED_METHODS[component].items() if hasattr(obj, name)}
+
+    def traced(name: str, function: Callable) -> Callable:
+        span_name, arguments, on_item = methods[name]
+
+        def span_attributes(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            return {**attributes, **(arguments(*args, **kwargs) if arguments else {})}
+
+        return tracer.traced(span_name, function, span_attributes, on_item)
+
+    # Methods replaced on the instance (e.g. by memoize_system_message) are wrapped in place
+    for name in [name for name in methods if name in vars(obj)]:
+        setattr(obj, name, traced(name, vars(obj).pop(name)))
+        del methods[name]
+
+    # Others in a subclass, so copies of the object (agno deep-copies models and agents) stay traced
+    cls = type(obj)
+    key = (cls, component, tuple(sorted(attributes.items())), id(tracer))
+    if key not in _traced_classes:
+        namespace = {name: traced(name, getattr(cls, name)) for name in methods}
+        _traced_classes[key] = type(cls.__name__, (cls,), {**namespace, "__module__": cls.__module__})
+    # Pydantic models (knowledge bases) reject attribute assignment through their own __setattr__
+    object.__setattr__(obj, "__class__", _traced_classes[key])
+
+
+def instrument(owner: Any, tracer: Tracer = tracer) -> Any:
+    """
+    Trace the runs of an agent or team: prompt building, model requests with time to first token and
+    token usage, tool calls, knowledge searches (embedding, ANN, fusion), storage reads and writes and
+    memory updates. Team members are instrumented too, so a team run is one trace.
+
+    Args:
+        owner (Agent | Team): The agent or team to instrument.
+        tracer (Tracer): Tracer recording the spans. Defaults to the module tracer, writing to tmp/traces.
+
+    Returns:
+        Agent | Team: The instrumented agent or team.
+    """
+    is_team = hasattr(owner, "members")
+    kind = "team" if is_team else "agent"
+    name = owner.name or getattr(owner, "agent_id", None) or getattr(owner, "team_id", None) or kind
+    _instrument_object(owner, kind, tracer, **{f"{kind}.name": name})
+    if owner.model is not None:
+        _instrument_object(owner.model, "model", tracer, **{"model.id": owner.model.id, f"{kind}.name": name})
+    _instrument_object(getattr(owner, "storage", None), "storage", tracer)
+    _instrument_object(getattr(owner, "memory", None), "memory", tracer)
+
+    knowledge = getattr(owner, "knowledge", None)
+    if knowledge is not None:
+        _instrument_object(knowledge, "knowledge", tracer)
+        # Combined knowledge bases search through their sources' vector databases
+        for source in [knowledge, *(getattr(knowledge, "sources", None) or [])]:
+            vector_db = getattr(source, "vector_db", None)
+            _instrument_object(vector_db, "vector_db", tracer)
+            _instrument_object(getattr(vector_db, "embedder", None), "embedder", tracer)
+
+    for member in getattr(owner, "members", None) or []:
+        instrument(member, tracer)
+    return owner
+
+
+def _load_spans(path: Path) -> List[Dict[str, Any]]:
+    spans = []
+    for resource_spans in json.loads(path.read_text())["resourceSpans"]:
+        for scope_spans in resource_spans["scopeSpans"]:
+            for span in scope_spans["spans"]:
+                attributes = {item["key"]: next(iter(item["value"].values())) for item in span.get("attributes", [])}
+                spans.append(
+                    {
+                        "id": span["spanId"],
+                        "parent": span.get("parentSpanId"),
+                        "name": span["name"],
+                        "start": int(span["startTimeUnixNano"]),
+                        "end": int(span["endTimeUnixNano"]),
+                        "attributes": attributes,
+                        "error": span.get("status", {}).get("message"),
+                        "children": [],
+                    }
+                )
+    return spans
+
+
+def _label(span: Dict[str, Any]) -> str:
+    # e.g. "agent.name" and "model.id" are shown as "agent=..." and "model=..."
+    details = [
+        f"{key.split('.')[0] if key.endswith(('.name', '.id')) else key}={value}"
+        for key, value in span["attributes"].items()
+        if key.endswith(".name") or key in ("model.id", "ttft_ms")
+    ]
+    label = span["name"] + (f" ({', '.join(details)})" if details else "")
+    return label + (f" ERROR {span['error']}" if span["error"] else "")
+
+
+def _ms(nanoseconds: int) -> str:
+    return f"{nanoseconds / 1e6:10.1f} ms"
+
+
+def critical_path(span: Dict[str, Any], depth: int = 0) -> List[tuple]:
+    """
+    The spans that determined the duration of `span`: walking back from its end, the child ending last,
+    then the child ending last before that one started, and so on, recursively.
+
+    Returns:
+        List[tuple]: (span, depth, self time in ns) in start order.
+    """
+    chain = []
+    cursor = span["end"]
+    remaining = sorted(span["children"], key=lambda child: child["end"])
+    while remaining:
+        candidates = [child for child in remaining if child["end"] <= cursor]
+        if not candidates:
+            break
+        child = candidates[-1]
+        chain.append(child)
+        cursor = child["start"]
+        remaining = [other for other in remaining if other["end"] <= cursor]
+    chain.reverse()
+    self_time = (span["end"] - span["start"]) - sum(child["end"] - child["start"] for child in chain)
+    path = [(span, depth, max(self_time, 0))]
+    for child in chain:
+        path.extend(critical_path(child, depth + 1))
+    return path
+
+
+def summarize(path: Path, top: int = 10) -> None:
+    """Print the span tree, the critical path and the time per span name of a trace file."""
+    spans = _load_spans(path)
+    by_id = {span["id"]: span for span in spans}
+    roots = []
+    for span in sorted(spans, key=lambda span: span["start"]):
+        parent = by_id.get(span["parent"])
+        (parent["children"] if parent else roots).append(span)
+
+    def print_tree(span: Dict[str, Any], depth: int) -> None:
+        print(f"{_ms(span['end'] - span['start'])}  {'  ' * depth}{_label(span)}")
+        for child in span["children"]:
+            print_tree(child, depth + 1)
+
+    for root in roots:
+        print(f"Trace {path.stem}\n")
+        print_tree(root, 0)
+
+        print("\nCritical path (self time: time outside the spans below it on the path)\n")
+        for span, depth, self_time in critical_path(root):
+            print(f"{_ms(span['end'] - span['start'])}  self {_ms(self_time)}  {'  ' * depth}{_label(span)}")
+
+    totals: Dict[str, List[int]] = {}
+    for span in spans:
+        duration = span["end"] - span["start"]
+        self_time = duration - sum(child["end"] - child["start"] for child in span["children"])
+        total = totals.setdefault(span["name"], [0, 0, 0])
+        total[0] += 1
+        total[1] += duration
+        total[2] += max(self_time, 0)
+    print(f"\nTop {top} span names by self time\n")
+    print(f"{'span':<24}{'count':>6}{'total':>16}{'self':>16}")
+    for name, (count, duration, self_time) in sorted(totals.items(), key=lambda item: -item[1][2])[:top]:
+        print(f"{name:<24}{count:>6}  {_ms(duration)}  {_ms(self_time)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", nargs="?", help="Trace file, defaults to the latest one in tmp/traces")
+    parser.add_argument("--top", type=int, default=10, help="Number of span names in the time breakdown")
+    args = parser.parse_args()
+    if args.trace:
+        path = Path(args.trace)
+    else:
+        traces = sorted(Path("tmp/traces").glob("*.json"), key=lambda trace: trace.stat().st_mtime)
+        if not traces:
+            parser.error("No trace in tmp/traces, instrument an agent or team and run it first")
+        path = traces[-1]
+    summarize(path, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from agno.document import Document
+from agno.knowledge.wikipedia import WikipediaKnowledgeBase
+from agno.tools.wikipedia import WikipediaTools
+from agno.utils.log import log_debug, log_info
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://en.wikipedia.org/w/api.php"
+# The API returns intro extracts for at most 20 pages per request
+BATCH_SIZE = 20
+
+
+def _normalize(title: str) -> str:
+    return " ".join(title.lower().replace("_", " ").split())
+
+
+class WikipediaPageCache:
+    """
+    On-disk cache of Wikipedia page summaries, keyed by title and revision.
+
+    Pages are fetched in bulk over a pooled session, up to 20 titles per request. A cached page
+    is served without any request for `max_age` seconds. After that its latest revision id is
+    checked (in bulk as well) and the summary is only downloaded again when the page changed.
+    """
+
+    def __init__(self, cache_dir: str = "tmp/wikipedia_cache", max_age: int = 7 * 24 * 60 * 60):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached pages.
+            max_age (int): Seconds during which a cached page is served without revalidation. Defaults to a week.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.index_file = self.cache_dir / "index.json"
+        # Requested title (normalized) -> {"title", "revid", "checked_at"}
+        self.index: Dict[str, Dict[str, Any]] = json.loads(self.index_file.read_text()) if self.index_file.exists() else {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "agno-agent-practice (https://github.com/benghita/agno-agent-practice)"
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+    def _page_file(self, title: str, revid: int) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(title.encode()).hexdigest()[:16]}_{revid}.json"
+
+    def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.session.get(API_URL, params={"format": "json", "action": "query", **params}, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def _query_pages(self, titles: List[str], with_extracts: bool) -> Dict[str, Dict[str, Any]]:
+        """Query a batch of titles, returning the pages by requested title."""
+        params: Dict[str, Any] = {"titles": "|".join(titles), "redirects": 1, "prop": "info"}
+        if with_extracts:
+            params.update({"prop": "info|extracts", "exintro": 1, "explaintext": 1, "exlimit": "max"})
+        data = self._request(params).get("query", {})
+
+        # Map every requested title through the API's normalizations and redirects
+        aliases = {title: title for title in titles}
+        for step in ("normalized", "redirects"):
+            for item in data.get(step, []):
+                for requested, current in aliases.items():
+                    if current == item["from"]:
+                        aliases[requested] = item["to"]
+        pages = {page["title"]: page for page in data.get("pages", {}).values() if "missing" not in page}
+        return {requested: pages[title] for requested, title in aliases.items() if title in pages}
+
+    def _search_title(self, query: str) -> Optional[str]:
+        results = self._request({"list": "search", "srsearch": query, "srlimit": 1}).get("query", {}).get("search", [])
+        return results[0]["title"] if results else None
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        page_file = self._page_file(entry["title"], entry["revid"])
+        return json.loads(page_file.read_text()) if page_file.exists() else None
+
+    def _write(self, key: str, page: Dict[str, Any]) -> None:
+        title, revid = page["title"], page["lastrevid"]
+        self._page_file(title, revid).write_text(
+            json.dumps({"title": title, "revid": revid, "summary": page.get("extract", "")})
+        )
+        self.index[key] = {"title": title, "revid": revid, "checked_at": time.time()}
+
+    def get_pages(self, titles: List[str], search: bool = True) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get the summaries of several pages, fetching only what isn't cached or has changed.
+
+        Args:
+            titles (List[str]): Page titles or topics.
+            search (bool): Fall back to a Wikipedia search for titles that don't match a page. Defaults to True.
+
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: For every title, a dict with "title", "revid" and "summary", or None if not found.
+        """
+        with self._lock:
+            now = time.time()
+            keys = {title: _normalize(title) for title in titles}
+            results: Dict[str, Optional[Dict[str, Any]]] = {}
+            stale: List[str] = []
+            missing: List[str] = []
+            for title, key in keys.items():
+                entry, page = self.index.get(key), self._read(key)
+                if page is None:
+                    missing.append(title)
+                elif now - entry["checked_at"] > self.max_age:
+                    stale.append(title)
+                else:
+                    results[title] = page
+
+            # Revalidate stale pages by revision id, only changed pages are downloaded again
+            for start in range(0, len(stale), 50):
+                batch = stale[start : start + 50]
+                current = self._query_pages([self.index[keys[title]]["title"] for title in batch], with_extracts=False)
+                for title in batch:
+                    entry = self.index[keys[title]]
+                    info = current.get(entry["title"])
+                    if info is not None and info["lastrevid"] == entry["revid"]:
+                        entry["checked_at"] = now
+                        results[title] = self._read(keys[title])
+                    else:
+                        missing.append(title)
+
+            for start in range(0, len(missing), BATCH_SIZE):
+                batch = missing[start : start + BATCH_SIZE]
+                log_debug(f"Fetching {len(batch)} Wikipedia pages")
+                pages = self._query_pages(batch, with_extracts=True)
+                for title in batch:
+                    page = pages.get(title)
+                    if page is None and search:
+                        found = self._search_title(title)
+                        page = self._query_pages([found], with_extracts=True).get(found) if found else None
+                    if page is None:
+                        results[title] = None
+                        continue
+                    self._write(keys[title], page)
+                    # The canonical title is an alias as well, e.g. for tool lookups of a KB topic
+                    self.index[_normalize(page["title"])] = self.index[keys[title]]
+                    results[title] = self._read(keys[title])
+
+            self.index_file.write_text(json.dumps(self.index))
+            return results
+
+
+# Shared by the Wikipedia tools and knowledge bases of every agent in the process
+page_cache = WikipediaPageCache()
+
+
+class CachedWikipediaKnowledgeBase(WikipediaKnowledgeBase):
+    """WikipediaKnowledgeBase that loads all its topics in bulk through the shared page cache."""
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        """Iterate over topics and yield lists of documents.
+        Each object yielded by the iterator is a list of documents.
+
+        Returns:
+            Iterator[List[Document]]: Iterator yielding list of documents
+        """
+        pages = page_cache.get_pages(self.topics, search=self.auto_suggest)
+        for topic in self.topics:
+            page = pages[topic]
+            if page is None:
+                continue
+            yield [
+                Document(
+                    name=topic,
+                    meta_data={"topic": topic, "title": page["title"], "revid": page["revid"]},
+                    content=page["summary"],
+                )
+            ]
+
+
+class CachedWikipediaTools(WikipediaTools):
+    """WikipediaTools that look pages up through the shared page cache, so pages loaded into a knowledge base are reused."""
+
+    def search_wikipedia(self, query: str) -> str:
+        """Searches Wikipedia for a query.
+
+        :param query: The query to search for.
+        :return: Relevant documents from wikipedia.
+        """
+        log_info(f"Searching wikipedia for: {query}")
+        page = page_cache.get_pages([query])[query]
+        if page is None:
+            return json.dumps({"error": f"No Wikipedia page found for: {query}"})
+        return json.dumps(Document(name=query, content=page["summary"]).to_dict())
@@ -0,0 +1,327 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+import tweepy
+from agno.tools.x import XTools
+from agno.utils.log import log_debug, logger
+
+from shared.sentiment import prescore, sentiment_summary
+
+METRICS = ["like_count", "retweet_count", "reply_count", "quote_count"]
+
+
+class TweetStore:
+    """
+    SQLite store of the posts already seen per search query.
+
+    It keeps the newest post id of every query, so a refresh only asks X for the posts it has not seen.
+    Posts stored again get their engagement metrics updated, and `update_metrics` refreshes them alone.
+    """
+
+    def __init__(self, db_file: str = "tmp/agent.db", table_name: str = "x_posts"):
+        """
+        Args:
+            db_file (str): SQLite database file. Defaults to the shared agent database.
+            table_name (str): Table holding the posts.
+        """
+        self.table_name = table_name
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table_name} (
+                query TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                created_at TEXT,
+                text TEXT,
+                author TEXT,
+                url TEXT,
+                like_count INTEGER,
+                retweet_count INTEGER,
+                reply_count INTEGER,
+                quote_count INTEGER,
+                PRIMARY KEY (query, id)
+            )"""
+        )
+        self.connection.commit()
+
+    def newest_id(self, query: str) -> Optional[int]:
+        """Id of the newest stored post for the query."""
+        with self._lock:
+            row = self.connection.execute(f"SELECT MAX(id) FROM {self.table_name} WHERE query = ?", (query,)).fetchone()
+        return row[0]
+
+    def ids(self, query: str, since: str) -> List[int]:
+        """Ids of the stored posts for the query created from an ISO time."""
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT id FROM {self.table_name} WHERE query = ? AND created_at >= ? ORDER BY id", (query, since)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def update_metrics(self, query: str, metrics: Dict[int, Dict[str, int]]) -> None:
+        """Update the engagement metrics of stored posts for the query, given by post id."""
+        assignments = ", ".join(f"{metric} = ?" for metric in METRICS)
+        rows = [(*(values[metric] for metric in METRICS), query, post_id) for post_id, values in metrics.items()]
+        with self._lock:
+            self.connection.executemany(
+                f"UPDATE {self.table_name} SET {assignments} WHERE query = ? AND id = ?", rows
+            )
+            self.connection.commit()
+
+    def add(self, query: str, posts: List[Dict[str, Any]]) -> int:
+        """Store posts for the query, or update the metrics of the ones already stored, returning how many were new."""
+        rows = [
+            (
+                query,
+                post["id"],
+                post["created_at"],
+                post["text"],
+                json.dumps(post["author"]),
+                post["url"],
+                *(post["metrics"][metric] for metric in METRICS),
+            )
+            for post in posts
+        ]
+        count = f"SELECT COUNT(*) FROM {self.table_name} WHERE query = ?"
+        updates = ", ".join(f"{metric} = excluded.{metric}" for metric in METRICS)
+        with self._lock:
+            (before,) = self.connection.execute(count, (query,)).fetchone()
+            self.connection.executemany(
+                f"""INSERT INTO {self.table_name} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (query, id) DO UPDATE SET {updates}""",
+                rows,
+            )
+            self.connection.commit()
+            (after,) = self.connection.execute(count, (query,)).fetchone()
+        return after - before
+
+    def to_dataframe(self, query: str, since: Optional[str] = None) -> pd.DataFrame:
+        """Stored posts for the query, optionally only the ones created from an ISO time."""
+        sql, params = f"SELECT * FROM {self.table_name} WHERE query = ?", [query]
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        with self._lock:
+            df = pd.read_sql_query(f"{sql} ORDER BY id", self.connection, params=params)
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+        df["author"] = df["author"].map(json.loads)
+        return df
+
+
+def engagement_summary(df: pd.DataFrame, now: Optional[pd.Timestamp] = None, top_n: int = 10) -> Dict[str, Any]:
+    """
+    Aggregate engagement metrics of a set of posts into a compact summary.
+
+    Args:
+        df (pd.DataFrame): Posts with `created_at`, `text`, `author`, `url` and the engagement count columns.
+        now (pd.Timestamp, optional): Reference time for velocities. Defaults to the current time.
+        top_n (int): Number of top posts and authors to include. Defaults to 10.
+
+    Returns:
+        Dict[str, Any]: Distributions, velocities, engagement patterns and the top posts.
+    """
+    if df.empty:
+        return {"posts": 0}
+
+    now = now or pd.Timestamp.now(tz="UTC")
+    df = df.assign(
+        engagement=df[METRICS].sum(axis=1),
+        age_hours=((now - df["created_at"]).dt.total_seconds() / 3600).clip(lower=1 / 60),
+        username=df["author"].map(lambda author: author.get("username", "unknown")),
+    )
+    df["velocity"] = df["engagement"] / df["age_hours"]
+
+    # Engagement patterns from the analyst instructions, relative to the medians of this run
+    likes_median = df["like_count"].median()
+    viral = (df["like_count"] + df["retweet_count"] > 2 * (likes_median + df["retweet_count"].median())) & (
+        df["reply_count"] <= df["reply_count"].median()
+    )
+    controversial = (df["reply_count"] > df["like_count"]) & (df["reply_count"] > df["reply_count"].median())
+
+    span_hours = max((df["created_at"].max() - df["created_at"].min()).total_seconds() / 3600, 1 / 60)
+    authors = (
+        df.groupby("username")
+        .agg(posts=("id", "size"), engagement=("engagement", "sum"))
+        .sort_values("engagement", ascending=False)
+        .head(top_n)
+    )
+    columns = ["url", "username", "created_at", "text", *METRICS, "velocity"]
+    top_posts = df.sort_values("engagement", ascending=False).head(top_n)[columns]
+
+    return {
+        "posts": int(len(df)),
+        "period": {"from": df["created_at"].min().isoformat(), "to": df["created_at"].max().isoformat()},
+        "posts_per_hour": round(len(df) / span_hours, 2),
+        "distributions": {
+            metric: {
+                "mean": round(float(df[metric].mean()), 2),
+                "median": float(df[metric].median()),
+                "p90": float(df[metric].quantile(0.9)),
+                "max": int(df[metric].max()),
+                "total": int(df[metric].sum()),
+            }
+            for metric in METRICS
+        },
+        "engagement_velocity_per_hour": {
+            "median": round(float(df["velocity"].median()), 2),
+            "p90": round(float(df["velocity"].quantile(0.9)), 2),
+        },
+        "patterns": {"viral_advocacy": int(viral.sum()), "controversy": int(controversial.sum())},
+        "top_authors": authors.reset_index().to_dict(orient="records"),
+        "top_posts": json.loads(top_posts.to_json(orient="records", date_format="iso")),
+    }
+
+
+class XMonitoringTools(XTools):
+    """
+    XTools with a streaming, incremental search for brand monitoring.
+
+    `monitor_posts` pages through the search results 100 posts at a time and only asks for the posts
+    of the last `window_hours` that are newer than the stored ones. The metrics of the posts already
+    stored in the window are refreshed by id, 100 posts per request. It returns engagement aggregates of
+    that window computed in pandas instead of the raw posts. Clear-cut posts get a local sentiment label,
+    only ambiguous and high-engagement posts are passed on for the model to classify.
+
+    Args:
+        store (TweetStore, optional): Store of the seen posts. Defaults to a TweetStore in the shared agent database.
+        max_review (int): Maximum number of posts passed on for the model to classify. Defaults to 25.
+        window_hours (float): Age of the posts collected and summarized, in hours. Defaults to 24.
+        refresh_metrics (bool): Refresh the metrics of the stored posts of the window. Defaults to True.
+        **kwargs: Passed through to XTools.
+    """
+
+    def __init__(
+        self,
+        store: Optional[TweetStore] = None,
+        max_review: int = 25,
+        window_hours: float = 24,
+        refresh_metrics: bool = True,
+        **kwargs,
+    ):
+        kwargs.setdefault("include_post_metrics", True)
+        super().__init__(**kwargs)
+        self.store = store or TweetStore()
+        self.max_review = max_review
+        self.window_hours = window_hours
+        self.refresh_metrics = refresh_metrics
+        self.register(self.monitor_posts)
+
+    def iter_posts(
+        self,
+        query: str,
+        max_posts: int = 500,
+        since_id: Optional[int] = None,
+        start_time: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Page through the recent posts matching the query, newest first.
+
+        Args:
+            query (str): The search query.
+            max_posts (int): Maximum number of posts to yield. Defaults to 500.
+            since_id (int, optional): Only yield posts newer than this id.
+            start_time (datetime, optional): Only yield posts created from this time.
+
+        Returns:
+            Iterator[Dict[str, Any]]: Posts with their author, url and metrics.
+        """
+        paginator = tweepy.Paginator(
+            self.client.search_recent_tweets,
+            query=query,
+            since_id=since_id,
+            start_time=start_time,
+            max_results=100,
+            tweet_fields=["author_id", "created_at", "public_metrics", "text"],
+            expansions=["author_id"],
+            user_fields=["name", "username", "verified"],
+        )
+        count = 0
+        for page in paginator:
+            users = {user.id: user for user in (page.includes or {}).get("users", [])}
+            for tweet in page.data or []:
+                user = users.get(tweet.author_id)
+                author = {
+                    "id": tweet.author_id,
+                    "name": user.name if user else "Unknown",
+                    "username": user.username if user else "unknown",
+                    "verified": getattr(user, "verified", False) if user else False,
+                }
+                metrics = tweet.public_metrics or {}
+                yield {
+                    "id": tweet.id,
+                    "text": tweet.text,
+                    "created_at": tweet.created_at.isoformat() if tweet.created_at else None,
+                    "author": author,
+                    "url": f"https://x.com/{author['username']}/status/{tweet.id}",
+                    "metrics": {metric: metrics.get(metric, 0) for metric in METRICS},
+                }
+                count += 1
+                if count >= max_posts:
+                    return
+
+    def update_metrics(self, query: str, ids: List[int]) -> None:
+        """
+        Refresh the engagement metrics of stored posts, looking them up by id 100 at a time.
+
+        Args:
+            query (str): The search query the posts are stored for.
+            ids (List[int]): The ids of the posts.
+        """
+        for start in range(0, len(ids), 100):
+            response = self.client.get_tweets(ids=ids[start : start + 100], tweet_fields=["public_metrics"])
+            # Deleted or protected posts are left out of the response and keep their last metrics
+            metrics = {
+                tweet.id: {metric: (tweet.public_metrics or {}).get(metric, 0) for metric in METRICS}
+                for tweet in response.data or []
+            }
+            self.store.update_metrics(query, metrics)
+
+    def monitor_posts(self, query: str, max_posts: int = 500) -> str:
+        """
+        Collect the posts matching a search query and summarize their engagement.
+
+        Use this function for sentiment and engagement analysis: it refreshes the recent posts for the
+        query and returns engagement distributions, velocities, patterns, top authors
+        and the top posts instead of every raw post. Its `sentiment` section holds the local sentiment labels
+        and the `posts_to_classify`, the only posts that need your own classification.
+
+        Args:
+            query (str): The search query, e.g. "Agno OR AgnoAGI".
+            max_posts (int): Maximum number of posts newer than the stored ones to collect. Defaults to 500.
+
+        Returns:
+            str: A JSON summary of the engagement of the recent posts for the query.
+        """
+        try:
+            start_time = datetime.now(timezone.utc) - timedelta(hours=self.window_hours)
+            window_start = start_time.isoformat()
+            stored = self.store.ids(query, since=window_start) if self.refresh_metrics else []
+            since_id = self.store.newest_id(query)
+            log_debug(f"Monitoring posts for query: {query}, since id: {since_id}")
+            new_posts = 0
+            batch: List[Dict[str, Any]] = []
+            for post in self.iter_posts(query, max_posts=max_posts, since_id=since_id, start_time=start_time):
+                batch.append(post)
+                if len(batch) == 100:
+                    new_posts += self.store.add(query, batch)
+                    batch = []
+            new_posts += self.store.add(query, batch)
+            # Only the posts stored by earlier runs have stale metrics, the new ones were just fetched
+            self.update_metrics(query, stored)
+
+            df = self.store.to_dataframe(query, since=window_start)
+            summary = engagement_summary(df)
+            if not df.empty:
+                scored = prescore(df.assign(engagement=df[METRICS].sum(axis=1)), max_review=self.max_review)
+                summary["sentiment"] = sentiment_summary(scored)
+            result = {"query": query, "window_hours": self.window_hours, "new_posts": new_posts, **summary}
+            return json.dumps(result, indent=2, default=str)
+        except tweepy.TweepyException as e:
+            logger.error(f"Error monitoring posts: {e}")
+            return json.dumps({"error": str(e)})
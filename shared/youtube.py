@@ -0,0 +1,270 @@
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.tools.youtube import YouTubeTools
+from agno.utils.log import log_debug, logger
+from youtube_transcript_api import YouTubeTranscriptApi
+
+YOUTUBE_CACHE_DIR = Path("tmp/youtube_cache")
+
+SUMMARY_PROMPT = """Summarize this part of a video transcript ({start} to {end}) in at most {words} words.
+Name the topics it covers and any key definitions, examples or conclusions. Reply with the summary only.
+
+{text}"""
+
+
+def format_timestamp(seconds: float) -> str:
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def chunk_captions(captions: List[Dict[str, Any]], chunk_seconds: float) -> List[Dict[str, Any]]:
+    """
+    Split captions into consecutive chunks of about `chunk_seconds` each.
+
+    Args:
+        captions (List[Dict[str, Any]]): Caption lines with "text", "start" and "duration".
+        chunk_seconds (float): Target length of a chunk in seconds.
+
+    Returns:
+        List[Dict[str, Any]]: Chunks with their "index", "start", "end" and "text".
+    """
+    chunks: List[Dict[str, Any]] = []
+    for line in captions:
+        end = line["start"] + line.get("duration", 0)
+        if not chunks or line["start"] - chunks[-1]["start"] >= chunk_seconds:
+            chunks.append({"index": len(chunks), "start": line["start"], "end": end, "lines": []})
+        chunks[-1]["lines"].append(line["text"])
+        chunks[-1]["end"] = end
+    return [
+        {"index": chunk["index"], "start": chunk["start"], "end": chunk["end"], "text": " ".join(chunk["lines"])}
+        for chunk in chunks
+    ]
+
+
+class ChunkedYouTubeTools(YouTubeTools):
+    """
+    YouTubeTools that cache captions and hand long transcripts to the agent as an outline.
+
+    Captions are stored on disk by video id and language. `get_video_outline` splits the
+    transcript into at most `max_chunks` timestamped chunks, summarizes them concurrently with
+    the summarizer model (map) and returns the outline of all the summaries (reduce), which is
+    cached as well. `get_transcript_chunks` then returns the full text of just the chunks the
+    agent needs, so the tokens spent on a video stay bounded whatever its length.
+
+    Args:
+        summarizer (Model): Model used to summarize the chunks, ideally a small and fast one.
+        max_chunks (int): Maximum number of chunks per video. Defaults to 24.
+        min_chunk_seconds (int): Minimum length of a chunk in seconds. Defaults to 300.
+        summary_words (int): Maximum length of a chunk summary in words. Defaults to 80.
+        max_chunks_per_call (int): Maximum number of chunks `get_transcript_chunks` returns at once. Defaults to 3.
+        max_workers (int): Number of concurrent summarizer calls. Defaults to 8.
+        **kwargs: Passed through to YouTubeTools.
+    """
+
+    def __init__(
+        self,
+        summarizer: Model,
+        max_chunks: int = 24,
+        min_chunk_seconds: int = 300,
+        summary_words: int = 80,
+        max_chunks_per_call: int = 3,
+        max_workers: int = 8,
+        **kwargs,
+    ):
+        # The whole transcript is exactly what this toolkit keeps out of the prompt
+        kwargs.setdefault("get_video_captions", False)
+        kwargs.setdefault("get_video_timestamps", False)
+        super().__init__(**kwargs)
+        self.summarizer = summarizer
+        self.max_chunks = max_chunks
+        self.min_chunk_seconds = min_chunk_seconds
+        self.summary_words = summary_words
+        self.max_chunks_per_call = max_chunks_per_call
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        YOUTUBE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.register(self.get_video_outline)
+        self.register(self.get_transcript_chunks)
+
+    def _cache_file(self, video_id: str, kind: str) -> Path:
+        languages = "-".join(self.languages) if self.languages else "default"
+        return YOUTUBE_CACHE_DIR / f"{video_id}.{languages}.{kind}.json"
+
+    def get_captions(self, video_id: str) -> List[Dict[str, Any]]:
+        """Captions of the video, downloaded once per video id and language."""
+        captions_file = self._cache_file(video_id, "captions")
+        if captions_file.exists():
+            return json.loads(captions_file.read_text())
+
+        kwargs: Dict[str, Any] = {}
+        if self.languages:
+            kwargs["languages"] = self.languages
+        if self.proxies:
+            kwargs["proxies"] = self.proxies
+        log_debug(f"Downloading captions for youtube video: {video_id}")
+        captions = [
+            {"text": line["text"], "start": line["start"], "duration": line.get("duration", 0)}
+            for line in YouTubeTranscriptApi.get_transcript(video_id, **kwargs)
+        ]
+        captions_file.write_text(json.dumps(captions))
+        return captions
+
+    def get_chunks(self, video_id: str) -> List[Dict[str, Any]]:
+        captions = self.get_captions(video_id)
+        if not captions:
+            return []
+        duration = captions[-1]["start"] + captions[-1].get("duration", 0)
+        # Longer videos get longer chunks rather than more of them, keeping the outline size fixed
+        chunk_seconds = max(self.min_chunk_seconds, math.ceil(duration / self.max_chunks))
+        return chunk_captions(captions, chunk_seconds)
+
+    def _summarize(self, chunk: Dict[str, Any]) -> str:
+        prompt = SUMMARY_PROMPT.format(
+            start=format_timestamp(chunk["start"]),
+            end=format_timestamp(chunk["end"]),
+            words=self.summary_words,
+            text=chunk["text"],
+        )
+        try:
+            response = self.summarizer.response(messages=[Message(role="user", content=prompt)])
+            return (response.content or "").strip()
+        except Exception as e:
+            logger.warning(f"Error summarizing transcript chunk {chunk['index']}: {e}")
+            # Fall back to the beginning of the chunk, the outline stays complete
+            return " ".join(chunk["text"].split()[: self.summary_words]) + " ..."
+
+    def get_outline(self, video_id: str) -> List[Dict[str, Any]]:
+        outline_file = self._cache_file(video_id, f"outline.{self.summarizer.id}.{self.max_chunks}")
+        with self._lock:
+            if outline_file.exists():
+                return json.loads(outline_file.read_text())
+
+            chunks = self.get_chunks(video_id)
+            log_debug(f"Summarizing {len(chunks)} transcript chunks for youtube video: {video_id}")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                summaries = list(executor.map(self._summarize, chunks))
+            outline = [
+                {
+                    "chunk": chunk["index"],
+                    "start": format_timestamp(chunk["start"]),
+                    "end": format_timestamp(chunk["end"]),
+                    "summary": summary,
+                }
+                for chunk, summary in zip(chunks, summaries)
+            ]
+            outline_file.write_text(json.dumps(outline))
+            return outline
+
+    def get_video_outline(self, url: str) -> str:
+        """Use this function to get a timestamped outline of a YouTube video from its captions.
+        The transcript is split into chunks and every chunk is summarized. Use `get_transcript_chunks`
+        to read the full captions of the chunks you need.
+
+        Args:
+            url: The URL of the YouTube video.
+
+        Returns:
+            str: JSON list of the chunks with their "chunk" number, "start", "end" and "summary".
+        """
+        if not url:
+            return "No URL provided"
+
+        video_id = self.get_youtube_video_id(url)
+        if video_id is None:
+            return "Error getting video ID from URL, please provide a valid YouTube url"
+
+        try:
+            outline = self.get_outline(video_id)
+            if not outline:
+                return "No captions found for video"
+            return json.dumps(outline, indent=2)
+        except Exception as e:
+            return f"Error getting outline for video: {e}"
+
+    def get_transcript_chunks(self, url: str, chunk_numbers: List[int]) -> str:
+        """Use this function to read the full captions of some chunks of a YouTube video outline.
+
+        Args:
+            url: The URL of the YouTube video.
+            chunk_numbers: The "chunk" numbers from the outline, at most 3 per call.
+
+        Returns:
+            str: JSON list of the chunks with their "chunk" number, "start", "end" and "text".
+        """
+        if not url:
+            return "No URL provided"
+
+        video_id = self.get_youtube_video_id(url)
+        if video_id is None:
+            return "Error getting video ID from URL, please provide a valid YouTube url"
+
+        try:
+            chunks = self.get_chunks(video_id)
+            selected = [chunks[number] for number in chunk_numbers if 0 <= number < len(chunks)][: self.max_chunks_per_call]
+            return json.dumps(
+                [
+                    {
+                        "chunk": chunk["index"],
+                        "start": format_timestamp(chunk["start"]),
+                        "end": format_timestamp(chunk["end"]),
+                        "text": chunk["text"],
+                    }
+                    for chunk in selected
+                ],
+                indent=2,
+            )
+        except Exception as e:
+            return f"Error getting captions for video: {e}"
+
+    def get_youtube_video_captions(self, url: str) -> str:
+        """Use this function to get captions from a YouTube video.
+
+        Args:
+            url: The URL of the YouTube video.
+
+        Returns:
+            str: The captions of the YouTube video.
+        """
+        if not url:
+            return "No URL provided"
+
+        video_id = self.get_youtube_video_id(url)
+        if video_id is None:
+            return "Error getting video ID from URL, please provide a valid YouTube url"
+
+        try:
+            captions = self.get_captions(video_id)
+            if captions:
+                return " ".join(line["text"] for line in captions)
+            return "No captions found for video"
+        except Exception as e:
+            return f"Error getting captions for video: {e}"
+
+    def get_video_timestamps(self, url: str) -> str:
+        """Generate timestamps for a YouTube video based on captions.
+
+        Args:
+            url: The URL of the YouTube video.
+
+        Returns:
+            str: Timestamps and summaries for the video.
+        """
+        if not url:
+            return "No URL provided"
+
+        video_id = self.get_youtube_video_id(url)
+        if video_id is None:
+            return "Error getting video ID from URL, please provide a valid YouTube url"
+
+        try:
+            return "\n".join(f"{format_timestamp(line['start'])} - {line['text']}" for line in self.get_captions(video_id))
+        except Exception as e:
+            return f"Error generating timestamps: {e}"